@@ -3,16 +3,29 @@
 
 import random
 import logging
-from blackjack_cli import user_input, user_choice, label_print
+from blackjack_cli import (user_input, user_choice, label_print, say,
+                           rule_greater_equal, rule_lower_equal)
+from blackjack_cards import hand_total, is_soft
+from blackjack_hand import Hand
+from blackjack_shoe import Shoe, LazyDeck, MIN_DECKS, MAX_DECKS
 
 logging.basicConfig(level=logging.DEBUG,
                     format='%(asctime)s - %(levelname)s - %(message)s')
 logging.disable(level=logging.CRITICAL)
 
+NEW_GAME_PROMPT = ("Hi, are you up for a game of blackjack? If so just say " +
+                   "'yes' otherwise say 'no': ")
+DRAW_PROMPT = "Would you like to draw a card? Please answer yes/no: "
+
+# number of players' seats at a table
+MIN_SEATS = 1
+MAX_SEATS = 7
+
 
 def generate_cards():
-    '''Generation of all existing playing cards. Problably reading from config
-    file could be better but it doesn't matter for this moment.
+    '''Generation of all existing playing cards. Decks made of some of these
+    cards (e.g. Spanish 21) are defined in a config file, see
+    `blackjack_decks`.
 
     One playing card will be represented by dictionary {number, pip, name,
     abbr, (values,)}.
@@ -57,16 +70,50 @@ def generate_cards():
     return all_cards
 
 
-def prepare_deck(all_cards):
+# Dictionary view of compact cards (see module `blackjack_cards`). Used only
+# for displaying cards.
+CARD_VIEWS = generate_cards()
+
+
+def card_view(card):
+    '''Returns dictionary representation of a card.
+
+    Compact cards (integers) are translated to dictionaries of
+    `generate_cards`, dictionaries are returned as they are.
+
+    >>> card_view(12)['abbr']
+    'A♥'
+    '''
+    return CARD_VIEWS[card] if type(card) is int else card
+
+
+def prepare_deck(all_cards, rng=random, lazy=False):
     '''Prepare a new deck for a game and shuffle cards. Repeating generation of
     cards doesn't occur anymore.
 
-    Input: list cards for playing
-    Output: a deck of cards
+    Input: list cards for playing or compact deck (`bytearray`, see
+           `blackjack_cards.new_deck`), optionally source of randomness
+           (`random.Random`, default module `random`) and `lazy` flag
+    Output: a deck of cards (of the same type as input) or - if `lazy` is
+            set - a `blackjack_shoe.LazyDeck` shuffling only the cards
+            actually drawn. Both give the same cards from the same `rng`
+            state.
+
+    >>> deck = [{'abbr': 'a'}, {'abbr' :'b'}, {'abbr': 'c'}, {'abbr': 'd'}]
+    >>> full = prepare_deck(deck, random.Random(1))
+    >>> lazy = prepare_deck(deck, random.Random(1), lazy=True)
+    >>> [draw_card(full)['abbr'] for i in range(4)] == [
+    ...     draw_card(lazy)['abbr'] for i in range(4)]
+    True
     '''
-    deck = []
-    deck.extend(all_cards)
-    random.shuffle(deck)
+    if lazy:
+        return LazyDeck(all_cards, rng)
+    if type(all_cards) is bytearray:
+        deck = all_cards[:]
+    else:
+        deck = []
+        deck.extend(all_cards)
+    rng.shuffle(deck)
 
     return deck
 
@@ -74,8 +121,8 @@ def prepare_deck(all_cards):
 def draw_card(deck):
     '''
     Draws a card from a deck
-    Input: a deck of cards (list)
-    Output: one card from the deck (string)
+    Input: a deck of cards (list or bytearray)
+    Output: one card from the deck
 
     >>> test_deck = [{'abbr': 'a'}, {'abbr' :'b'}, {'abbr': 'c'}]
     >>> draw_card(test_deck)['abbr']
@@ -85,18 +132,49 @@ def draw_card(deck):
     '''
     # get and remove last card of a list (this has been already shuffled)
     drawn_card = deck.pop()
-    logging.debug("'{}' have been drawn and scratched from the deck".format(drawn_card['abbr']))
+    # message is built only when it is really logged - draw_card is called
+    # very often in simulations
+    if logging.root.isEnabledFor(logging.DEBUG):
+        logging.debug("'%s' have been drawn and scratched from the deck",
+                      card_view(drawn_card)['abbr'])
     return drawn_card
 
 
+def deal_cards(deck, count):
+    '''
+    Draws several cards from a deck at once
+    Input: a deck of cards (list, bytearray, `Shoe` or `LazyDeck`), number
+           of cards
+    Output: list of drawn cards - in the same order as by repeated
+            `draw_card`
+
+    >>> test_deck = [{'abbr': 'a'}, {'abbr' :'b'}, {'abbr': 'c'}]
+    >>> [card['abbr'] for card in deal_cards(test_deck, 2)]
+    ['c', 'b']
+    >>> len(test_deck)
+    1
+    '''
+    if isinstance(deck, (Shoe, LazyDeck)):
+        drawn_cards = deck.deal(count)
+    else:
+        drawn_cards = deck[:-count - 1:-1]
+        del deck[-count:]
+    if logging.root.isEnabledFor(logging.DEBUG):
+        logging.debug("%s have been drawn and scratched from the deck",
+                      [card_view(card)['abbr'] for card in drawn_cards])
+    return drawn_cards
+
+
 def hand_value(hand):
     '''Counts total value of all cards in hand.
 
     Parameters
     ----------
     hand : `list`
-        List of all cards in a hand. Every card is represented by `dict` -
-        for more details look at `generate_cards` function.
+        List of all cards in a hand. Every card is represented either by
+        `dict` - for more details look at `generate_cards` function - or by
+        compact `int` (see module `blackjack_cards`). For `Hand` its
+        maintained value is returned without counting.
 
     Returns
     -------
@@ -108,30 +186,56 @@ def hand_value(hand):
     >>> hand_value([{"values": (10,)}, {"values": (8,)}])
     18
 
+    >>> hand_value([8, 12, 25])
+    12
+
     For more examples look at related unittests.
     '''
+    if type(hand) is Hand:
+        return hand.value
+    if hand and type(hand[0]) is int:
+        return hand_total(hand)
+
+    # Every card counts its lowest value. Then at most one card (i.e. one Ace)
+    # may be counted with its highest value - two Aces counted as 11 would
+    # always bust the hand.
     sum = 0
+    bonus = 0
 
-    for card in sorted(hand, key=lambda c: len(c['values'])):
-        s_value = card['values'][0]
-        # for one-valued card result of slice is an empty tuple
-        # thus for cycle is skipped
-        for value in card['values'][1:]:
-            if sum + s_value > 21:
-                s_value = value
-        sum += s_value
+    for card in hand:
+        sum += card['values'][-1]
+        bonus = max(bonus, card['values'][0] - card['values'][-1])
+
+    if sum + bonus <= 21:
+        sum += bonus
 
     return sum
 
 
+def hand_soft(hand):
+    '''Returns `True` if the hand is soft, i.e. an Ace is counted as 11.
+
+    >>> hand_soft([{"values": (11, 1)}, {"values": (6,)}])
+    True
+    >>> hand_soft(Hand([12, 5, 8]))
+    False
+    '''
+    if type(hand) is Hand:
+        return hand.soft
+    if hand and type(hand[0]) is int:
+        return is_soft(hand)
+    return hand_value(hand) != sum(card['values'][-1] for card in hand)
+
+
 def hand_status(player={"name": "Player", "role": "player", "hand": []}):
     '''Returns a text message with cards and total points.
 
     Parameters
     ----------
     hand : list
-        hand is a list of cards. Every card is represented as a dictionary,
-        this function expect presence of 'abbr' key and 'value' consequently.
+        hand is a list of cards. Every card is represented as a dictionary
+        (this function expect presence of 'abbr' key and 'value'
+        consequently) or as a compact card.
     player: dictionary
 
     Returns
@@ -143,28 +247,58 @@ def hand_status(player={"name": "Player", "role": "player", "hand": []}):
         status = "You have {} in your hand which makes a {}-point hand."
     else:
         status = "The dealer has {} in his hand which makes a {}-point hand."
-    status = status.format([h['abbr'] for h in player['hand']],
+    status = status.format([card_view(h)['abbr'] for h in player['hand']],
                            hand_value(player['hand']))
     return status
 
 
-def show_results(players):
+def show_results(players, results=None):
     '''
-    Prints out a result of a single game of blackjack. Uses function
-    'resolve_game' in the process.
-    Input: two final hands to be resulted (lists)
-    Output: prints out value a player's and banker's hand.
+    Prints out results of a single game of blackjack - every seat against
+    the dealer.
+    Input: all players of the table (dealer is the last one), optionally
+           their results (see `resolve_table`, resolved if not given)
+    Output: prints out value of players' and dealer's hands, returns results
     '''
+    if results is None:
+        results = resolve_table(players)
 
     label_print("** GAME RESULTS **", decoration="*")
 
-    for player in players[:-1]:
-        print(hand_status(players[-1]))
-        print(hand_status(player))
-        result = resolve_game(players[0], players[1])
-        print(result[1])
+    say(hand_status(players[-1]))
+    for player, result in zip(players[:-1], results):
+        if len(results) > 1:
+            say()
+            say(player['name'] + ":")
+        say(hand_status(player))
+        say(result['message'])
 
-    print()
+    say()
+    return results
+
+
+def resolve_table(players):
+    '''Resolves all seats of a table against the dealer.
+
+    Parameters
+    ----------
+    players : `list` of `dict`
+        Players of the table, dealer is the last one.
+
+    Returns
+    -------
+    `list` of `dict`
+        Result of every seat - name of the player, result code (PW, DW or SO,
+        see `resolve_game`), result message and points of the hand.
+    '''
+    dealer = players[-1]
+    results = []
+    for player in players[:-1]:
+        code, message = resolve_game(player, dealer)
+        results.append({"name": player['name'], "result": code,
+                        "message": message,
+                        "points": hand_value(player['hand'])})
+    return results
 
 
 def resolve_game(player, dealer):
@@ -235,18 +369,16 @@ def player_turn(player, deck):
     '''
     logging.debug("This is as player turn")
 
-    print(hand_status(player))
+    say(hand_status(player))
     player_answer = ''
 
     # keep playing until player says yes or has 21 or more points
     while hand_value(player['hand']) < 21 and player_answer != "n":
-        player_answer = user_choice(
-            prompt="Would you like to draw a card? Please answer yes/no: "
-        )
+        player_answer = user_choice(prompt=DRAW_PROMPT)
 
         if player_answer == "y":  # draws a card if player says yes
             player['hand'].append(draw_card(deck))
-            print(hand_status(player))
+            say(hand_status(player))
 
 
 def dealer_turn(dealer, deck, soft17_draw=False):
@@ -254,7 +386,7 @@ def dealer_turn(dealer, deck, soft17_draw=False):
 
     Implements rules for dealer turn. When dealer has less than 17 points
     he must draw a card. When dealer has 17 and more points he mustn't
-    draw card.
+    draw card - except soft 17 when `soft17_draw` is set.
 
     Parameters
     ----------
@@ -271,69 +403,126 @@ def dealer_turn(dealer, deck, soft17_draw=False):
     -------
     `None`
     '''
-    logging.debug("This is as dealer turn")
+    # hand_status is built only when it is really logged
+    debug = logging.root.isEnabledFor(logging.DEBUG)
+    if debug:
+        logging.debug("This is as dealer turn")
+
+    hand = dealer['hand']
+    while True:
+        value = hand_value(hand)
+        if value < 17:
+            if debug:
+                logging.debug(hand_status(dealer))
+                logging.debug("Dealer has less than 17 points - he must "
+                              "draw a card")
+        elif value == 17 and soft17_draw and hand_soft(hand):
+            if debug:
+                logging.debug(hand_status(dealer))
+                logging.debug("Dealer has soft 17 - he must draw a card")
+        else:
+            break
+        hand.append(draw_card(deck))
 
-    # TODO: Implement soft17_draw logic
-    while hand_value(dealer['hand']) < 17:
+    if debug:
         logging.debug(hand_status(dealer))
-        logging.debug("Dealer has less than 17 points - he must draw a card")
-        dealer['hand'].append(draw_card(deck))
+        logging.debug("Dealer has 17 points or more - he must stand up")
 
-    logging.debug(hand_status(dealer))
-    logging.debug("Dealer has 17 points or more - he must stand up")
 
+def new_table(names=("John Doe",), hand=Hand):
+    '''Prepares players of a table - one seat for every name and the dealer
+    as the last one. Hands are created by `hand` (`Hand` for compact cards,
+    `list` for dictionary cards).
 
-def play_game(all_cards):
-    '''Plays a single round of blackjack. Uses all the functions above.
-    Input: User input according to the instructions printed out
-    Output: Let's user play a single round of blackjack
+    >>> [player['role'] for player in new_table(["Ann", "Bob"])]
+    ['player', 'player', 'dealer']
     '''
-
-    # NOTE: Blackjack is player with 1-8 decks of card. It should be easy to
-    # implement this now.
-    deck = prepare_deck(all_cards)
+    if not MIN_SEATS <= len(names) <= MAX_SEATS:
+        raise ValueError("Number of seats has to be between {} and {}"
+                         .format(MIN_SEATS, MAX_SEATS))
 
     # Represent players as a dictionary. May be the hand shouldn't be part of
     # this dictionary?
-    # TODO: dynamic number of players with various names. But ensure that
-    # dealer is the last one and only one !!
-    players = [
-        {"name": "John Doe", "role": "player", "hand": [],
-         "turn": player_turn},
-        {"name": "Anonymous Dealer", "role": "dealer", "hand": [],
-         "turn": dealer_turn}
-    ]
-
-    for i in range(0, 2):
-        for player in players:
-            # NOTE: In some variations of blackjack dealer gets only first card
-            # at the start of a game or distinguish 'up card' and 'hole card'
-            # and so on
-            player['hand'].append(draw_card(deck))
+    players = [{"name": name, "role": "player", "hand": hand(),
+                "turn": player_turn} for name in names]
+    players.append({"name": "Anonymous Dealer", "role": "dealer",
+                    "hand": hand(), "turn": dealer_turn})
+    return players
+
+
+def play_game(all_cards, names=("John Doe",)):
+    '''Plays a single round of blackjack. Uses all the functions above.
+    Input: Cards for playing - either list of cards (lazily shuffled into a
+           new deck for every game) or a `Shoe` (dealt across many games and
+           shared by all seats), names of players at the table (1-7 seats)
+           and user input according to the instructions printed out
+    Output: Let's users play a single round of blackjack, returns result of
+            every seat (see `resolve_table`)
+    '''
+    if isinstance(all_cards, Shoe):
+        deck = all_cards
+        if deck.new_round():
+            label_print("The shoe has been reshuffled.")
+    else:
+        deck = prepare_deck(all_cards, lazy=True)
+
+    compact = isinstance(deck, Shoe) or type(all_cards[0]) is int
+    players = new_table(names, Hand if compact else list)
+
+    # two rounds of cards - one card for every player (dealer is the last)
+    # in each round - dealt from the deck at once
+    # NOTE: In some variations of blackjack dealer gets only first card
+    # at the start of a game or distinguish 'up card' and 'hole card'
+    # and so on
+    cards = deal_cards(deck, 2 * len(players))
+    for i, player in enumerate(players):
+        player['hand'].extend((cards[i], cards[i + len(players)]))
 
     for player in players:
+        if player['role'] == "player" and len(players) > 2:
+            label_print("{}'s turn".format(player['name']))
         player['turn'](player, deck)
 
-    show_results(players)
+    return show_results(players)
 
 
-if __name__ == "__main__":
-    # some automated tests before playing a game
-    import doctest
-    doctest.testmod()
+def play_session(all_cards, names=("John Doe",)):
+    '''Plays games of blackjack until the player doesn't want to continue.
 
-    # let's go play
-    all_cards = generate_cards()
+    Input and output go through current input source and output sink of
+    `blackjack_cli` (terminal by default, see `blackjack_cli.io_session`).
 
+    Input: cards for playing and names of players, see `play_game`
+    '''
     while True:
-        one_more_game = user_choice(
-            prompt="Hi, are you up for a game of blackjack? If so just say " +
-                   "'yes' otherwise say 'no': "
-        )
+        one_more_game = user_choice(prompt=NEW_GAME_PROMPT)
         if one_more_game == "y":
             label_print("This is a new game - enjoy it.")
-            play_game(all_cards)
+            play_game(all_cards, names)
         else:
             break
 
-    print('Thanks for the game(s), see you soon.')
+    say('Thanks for the game(s), see you soon.')
+
+
+if __name__ == "__main__":
+    # some automated tests before playing a game
+    import doctest
+    doctest.testmod()
+
+    # let's go play
+    decks = user_input(
+        "How many decks should be in the shoe ({}-{})? ".format(MIN_DECKS,
+                                                                 MAX_DECKS),
+        int, [rule_greater_equal(MIN_DECKS), rule_lower_equal(MAX_DECKS)]
+    )
+    seats = user_input(
+        "How many players are at the table ({}-{})? ".format(MIN_SEATS,
+                                                             MAX_SEATS),
+        int, [rule_greater_equal(MIN_SEATS), rule_lower_equal(MAX_SEATS)]
+    )
+    if seats == 1:
+        names = ("John Doe",)
+    else:
+        names = ["Player {}".format(seat) for seat in range(1, seats + 1)]
+    play_session(Shoe(decks), names)
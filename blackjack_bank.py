@@ -0,0 +1,160 @@
+'''Bank of pre-shuffled shoes in a memory-mapped file.
+
+Shuffling is paid once - when the bank is written. A bank file holds many
+shuffled shoes of compact cards (indices of `blackjack.generate_cards`
+order). Simulations map the file and deal straight from it by `BankShoe`,
+so every run (and every worker process, sharing the mapped pages) gets the
+same shoes bit for bit.
+
+File format (little endian)::
+
+    header  magic "BJSB", version (u16), decks (u16), shoes (u64)
+    shoes   shoes * decks * 52 bytes - cards of every shoe in dealing order
+
+Usage: python blackjack_bank.py FILE SHOES [--decks DECKS] [--seed SEED]
+'''
+
+import mmap
+import random
+import struct
+from blackjack_cards import CARD_COUNT, new_deck
+from blackjack_shoe import Shoe
+
+FILE_MAGIC = b"BJSB"
+FILE_VERSION = 1
+FILE_HEADER = struct.Struct("<4sHHQ")
+
+# shoes shuffled and written at once
+CHUNK_SHOES = 4096
+
+
+def shoe_rng(seed, shoe):
+    '''Returns independent reproducible random generator of one shoe of a
+    bank (see `blackjack_parallel.chunk_rng`).'''
+    return random.Random("blackjack:bank:{}:{}".format(seed, shoe))
+
+
+def write_bank(path, shoes, decks=6, seed=0):
+    '''Writes a bank of `shoes` shuffled shoes of `decks` decks.
+
+    Every shoe is shuffled by its own generator (`shoe_rng`), so a bank is
+    given by the seed and the file can be extended by more shoes of the
+    same seed.
+    '''
+    cards = new_deck(decks)
+    with open(path, "wb") as f:
+        f.write(FILE_HEADER.pack(FILE_MAGIC, FILE_VERSION, decks, shoes))
+        for start in range(0, shoes, CHUNK_SHOES):
+            chunk = bytearray()
+            for shoe in range(start, min(start + CHUNK_SHOES, shoes)):
+                shoe_rng(seed, shoe).shuffle(cards)
+                chunk += cards
+            f.write(chunk)
+
+
+class ShoeBank:
+    '''Read-only memory-mapped bank of shoes written by `write_bank`.
+
+    >>> import os, tempfile
+    >>> path = os.path.join(tempfile.mkdtemp(), "bank.bjsb")
+    >>> write_bank(path, 10, decks=2)
+    >>> with ShoeBank(path) as bank:
+    ...     len(bank), bank.decks, len(bank[9])
+    (10, 2, 104)
+    '''
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            try:
+                magic, version, decks, shoes = FILE_HEADER.unpack(
+                    f.read(FILE_HEADER.size))
+            except struct.error:
+                raise ValueError("'{}' is not a shoe bank".format(path))
+            if magic != FILE_MAGIC or version != FILE_VERSION:
+                raise ValueError("'{}' is not a shoe bank".format(path))
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        self.decks = decks
+        self.shoes = shoes
+        self.shoe_size = decks * CARD_COUNT
+        if len(self.map) < FILE_HEADER.size + shoes * self.shoe_size:
+            self.map.close()
+            raise ValueError("Shoe bank '{}' is truncated".format(path))
+
+    def __len__(self):
+        return self.shoes
+
+    def __getitem__(self, shoe):
+        '''Returns cards of a shoe (`bytes`).'''
+        if not 0 <= shoe < self.shoes:
+            raise IndexError("Shoe bank has only {} shoes".format(self.shoes))
+        start = FILE_HEADER.size + shoe * self.shoe_size
+        return self.map[start:start + self.shoe_size]
+
+    def close(self):
+        self.map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class BankShoe(Shoe):
+    '''Shoe dealing shoes of a `ShoeBank` instead of shuffling.
+
+    Every "shuffle" takes the next shoe of the bank - shoes `first`,
+    `first + step`, `first + 2 * step`, ... - so shoe users with different
+    `first` (e.g. chunks of a parallel run) never deal the same shoe.
+
+    Parameters
+    ----------
+    bank : `ShoeBank`
+    first : `int`, optional
+        Number of the first shoe. Default 0.
+    step : `int`, optional
+        Distance between following shoes. Default 1.
+    penetration, cut_card
+        See `blackjack_shoe.Shoe`.
+
+    Raises
+    ------
+    IndexError
+        When the bank has no more shoes.
+    '''
+
+    def __init__(self, bank, first=0, step=1, penetration=0.75,
+                 cut_card=None):
+        self.bank = bank
+        self.next_shoe = first
+        self.step = step
+        super().__init__(bank.decks, penetration, cut_card, rng=None)
+
+    def shuffle(self):
+        self.cards = self.bank[self.next_shoe]
+        self.next_shoe += self.step
+        self.position = 0
+        self.rank_counts = list(self.full_counts)
+        self.shuffles += 1
+
+
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()
+
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("file")
+    parser.add_argument("shoes", type=int)
+    parser.add_argument("--decks", type=int, default=6)
+    parser.add_argument("--seed", default="0")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    write_bank(args.file, args.shoes, args.decks, args.seed)
+    print("{} shoes written in {:.2f} s".format(
+        args.shoes, time.perf_counter() - start))
@@ -0,0 +1,213 @@
+'''Bankroll simulation of betting schemes.
+
+Rounds are played by the game engine only once - `round_outcomes` records the
+payout of every round (betting one unit) together with the true count before
+the round. Bankroll paths are then evolved by resampling these outcomes, all
+paths at once as NumPy arrays, so thousands of paths don't need thousands of
+replayed games.
+
+A betting scheme is a function `bets(bankroll, counts)` returning the bet of
+every path from current bankrolls and true counts of the dealt rounds (all
+`numpy.ndarray`), see `bet_flat`, `bet_ramp` and `bet_kelly`.
+
+Requires NumPy (except `round_outcomes`).
+'''
+
+import random
+from blackjack_count import CountingShoe
+from blackjack_rules import RuleSet
+from blackjack_sim import play_round_rules, policy_stand_on
+try:
+    import numpy as np
+except ImportError:     # pragma: no cover - depends on environment
+    np = None
+
+QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+
+def round_outcomes(rounds, policy=policy_stand_on(17), rules=None,
+                   tags="hi-lo", rng=random):
+    '''Plays headless rounds from a counting shoe and records their outcomes.
+
+    Parameters
+    ----------
+    rounds : `int`
+        Number of rounds to be played.
+    policy : `function`, optional
+        Player policy, see `blackjack_sim`. Default: draw until 17 points.
+    rules : `blackjack_rules.RuleSet`, optional
+        Rules of the table. Default `RuleSet()`.
+    tags : optional
+        Counting system, see `blackjack_count.CountingShoe`.
+    rng : `random.Random`, optional
+        Source of randomness of the shoe. Default module `random`.
+
+    Returns
+    -------
+    payouts : `list` of `float`
+        Payout of every round betting one unit.
+    counts : `list` of `float`
+        True count before every round.
+    '''
+    if rules is None:
+        rules = RuleSet()
+    shoe = CountingShoe(rules.decks, rules.penetration, rng=rng, tags=tags,
+                        deck=rules.deck)
+
+    payouts = []
+    counts = []
+    for i in range(rounds):
+        shoe.new_round()
+        counts.append(shoe.true_count)
+        payouts.append(play_round_rules(shoe, policy, rules)[2][1])
+    return payouts, counts
+
+
+def outcomes_from_records(records):
+    '''Returns payouts of hand records (see `blackjack_records.read_records`)
+    and zero counts - records don't keep the count.'''
+    payouts = np.asarray(records["payout"], dtype=np.float64)
+    return payouts, np.zeros_like(payouts)
+
+
+def bet_flat(units=1):
+    '''Factory for scheme betting the same amount every round.'''
+    def flat(bankroll, counts):
+        return np.full(bankroll.shape, float(units))
+    return flat
+
+
+def bet_ramp(ramp, unit=1):
+    '''Factory for scheme betting by the true count.
+
+    Parameters
+    ----------
+    ramp : `dict`
+        True count -> number of units bet from that (rounded down) count
+        upwards, e.g. ``{1: 1, 2: 2, 3: 4, 4: 8}``. Counts below the lowest
+        one bet its units.
+    unit : `float`, optional
+        Size of one unit. Default 1.
+
+    >>> bets = bet_ramp({1: 1, 2: 2, 3: 4})
+    >>> [float(bet) for bet in bets(np.zeros(4), np.array([-1, 1.5, 2, 7]))]
+    [1.0, 1.0, 2.0, 4.0]
+    '''
+    thresholds = np.array(sorted(ramp), dtype=np.float64)
+    units = np.array([ramp[count] for count in sorted(ramp)],
+                     dtype=np.float64) * unit
+
+    def count_ramp(bankroll, counts):
+        steps = np.searchsorted(thresholds, np.floor(counts), side="right")
+        return units[np.maximum(steps - 1, 0)]
+    return count_ramp
+
+
+def bet_kelly(fraction=0.5, base_edge=-0.005, edge_per_count=0.005,
+              variance=1.3, min_bet=0):
+    '''Factory for scheme betting a fraction of the Kelly bet.
+
+    Player's edge is estimated as `base_edge` + `edge_per_count` * true
+    count. The Kelly bet is edge / `variance` of the bankroll, `fraction` of
+    it is bet (at least `min_bet`, nothing more than the bankroll).
+    '''
+    def kelly(bankroll, counts):
+        edge = base_edge + edge_per_count * counts
+        bets = fraction * np.maximum(edge, 0) / variance * bankroll
+        return np.minimum(np.maximum(bets, min_bet), np.maximum(bankroll, 0))
+    return kelly
+
+
+def simulate_bankroll(payouts, counts, bets, bankroll=100, rounds=1000,
+                      paths=10000, seed=None):
+    '''Evolves bankroll paths by resampled round outcomes.
+
+    Every path plays `rounds` rounds drawn randomly from the outcomes (the
+    payout and the count of a round stay together). A path is ruined when
+    its bankroll doesn't cover the next bet - it stops betting then.
+
+    Parameters
+    ----------
+    payouts, counts : sequence of `float`
+        Outcomes of rounds, see `round_outcomes`.
+    bets : `function`
+        Betting scheme, see module docstring.
+    bankroll : `float`, optional
+        Initial bankroll of every path. Default 100.
+    rounds : `int`, optional
+        Number of rounds of every path. Default 1000.
+    paths : `int`, optional
+        Number of independent paths. Default 10000.
+    seed : optional
+        Seed of resampling. Default `None` - random.
+
+    Returns
+    -------
+    `dict`
+        Ruin probability, quantiles of final bankroll (`QUANTILES`), mean
+        final bankroll, median and 95th percentile of maximal drawdown, mean
+        number of rounds played and arrays of final bankrolls and drawdowns.
+    '''
+    payouts = np.asarray(payouts, dtype=np.float64)
+    counts = np.asarray(counts, dtype=np.float64)
+    rng = np.random.default_rng(seed)
+
+    bank = np.full(paths, float(bankroll))
+    peak = bank.copy()
+    drawdown = np.zeros(paths)
+    alive = np.ones(paths, dtype=bool)
+    played = np.zeros(paths, dtype=np.int64)
+
+    for i in range(rounds):
+        index = rng.integers(0, len(payouts), paths)
+        wager = bets(bank, counts[index])
+        alive &= (bank > 0) & (wager <= bank)
+        wager = np.where(alive, wager, 0)
+        bank += wager * payouts[index]
+        played += alive
+        np.maximum(peak, bank, out=peak)
+        np.maximum(drawdown, peak - bank, out=drawdown)
+
+    ruined = ~alive | (bank <= 0)
+    return {"paths": paths, "rounds": rounds,
+            "ruin_probability": float(ruined.mean()),
+            "quantiles": dict(zip(QUANTILES,
+                                  np.quantile(bank, QUANTILES).tolist())),
+            "mean": float(bank.mean()),
+            "drawdown_median": float(np.median(drawdown)),
+            "drawdown_95": float(np.quantile(drawdown, 0.95)),
+            "mean_rounds": float(played.mean()),
+            "final": bank, "drawdown": drawdown}
+
+
+def format_report(report):
+    '''Returns result of `simulate_bankroll` as a human readable text.'''
+    lines = ["{paths} paths x {rounds} rounds".format(**report),
+             "ruin probability  {:.2%}".format(report["ruin_probability"]),
+             "mean bankroll     {:.2f}".format(report["mean"])]
+    for quantile, value in report["quantiles"].items():
+        lines.append("quantile {:<8} {:.2f}".format(quantile, value))
+    lines.append("drawdown median  {:.2f}".format(report["drawdown_median"]))
+    lines.append("drawdown 95%     {:.2f}".format(report["drawdown_95"]))
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()
+
+    import time
+
+    start = time.perf_counter()
+    payouts, counts = round_outcomes(100000, rng=random.Random(1))
+    print("100000 rounds played in {:.2f} s".format(
+        time.perf_counter() - start))
+
+    for name, bets in (("flat", bet_flat(1)),
+                       ("ramp 1-8", bet_ramp({1: 1, 2: 2, 3: 4, 4: 8})),
+                       ("half Kelly", bet_kelly(0.5))):
+        start = time.perf_counter()
+        report = simulate_bankroll(payouts, counts, bets, seed=1)
+        print()
+        print("** {} ** ({:.2f} s)".format(name, time.perf_counter() - start))
+        print(format_report(report))
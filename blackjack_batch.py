@@ -0,0 +1,195 @@
+'''Batch evaluation of many blackjack hands at once.
+
+Hands are given as a 2-D matrix of rank indices (see `blackjack_cards.RANKS`),
+one hand per row. Rows are padded by `PAD` to the same length. The results are
+the same as from `blackjack.hand_value` and `blackjack.resolve_game` applied
+to every row one by one.
+
+NumPy is used when it is installed, otherwise the evaluation falls back to
+plain Python loops over lists (same results, only slower).
+'''
+
+from blackjack_cards import ACE, RANK_VALUE, CARD_RANK
+
+try:
+    import numpy as np
+except ImportError:     # pragma: no cover - depends on environment
+    np = None
+
+# padding of short hands in a rank matrix
+PAD = -1
+
+# result codes - the same meaning as text codes of `blackjack.resolve_game`
+PW, DW, SO = 0, 1, 2
+RESULT_CODES = ("PW", "DW", "SO")
+
+
+def rank_matrix(hands, width=None):
+    '''Converts list of hands of compact cards into a padded rank matrix.
+
+    Parameters
+    ----------
+    hands : `list`
+        List of hands, every hand is a sequence of compact cards.
+    width : `int`, optional
+        Number of columns. Default length of the longest hand.
+
+    Returns
+    -------
+    `numpy.ndarray` of `int8` or `list` of `list` when NumPy is missing
+
+    Examples
+    --------
+    >>> [[int(r) for r in row] for row in rank_matrix([[12, 8], [0, 1, 15]])]
+    [[12, 8, -1], [0, 1, 2]]
+    '''
+    if width is None:
+        width = max((len(hand) for hand in hands), default=0)
+
+    rows = [[CARD_RANK[card] for card in hand] + [PAD] * (width - len(hand))
+            for hand in hands]
+
+    if np is None:
+        return rows
+    return np.array(rows, dtype=np.int8).reshape(len(rows), width)
+
+
+def _hand_totals_python(ranks):
+    totals = []
+    softs = []
+    blackjacks = []
+    for row in ranks:
+        total = 0
+        cards = 0
+        ace = False
+        for rank in row:
+            if rank == PAD:
+                continue
+            cards += 1
+            total += RANK_VALUE[rank]
+            if rank == ACE:
+                ace = True
+        soft = ace and total <= 11
+        if soft:
+            total += 10
+        totals.append(total)
+        softs.append(soft)
+        blackjacks.append(total == 21 and cards == 2)
+    return totals, softs, blackjacks
+
+
+def _hand_totals_numpy(ranks):
+    ranks = np.asarray(ranks)
+    valid = ranks != PAD
+    rank_values = np.frombuffer(RANK_VALUE, dtype=np.uint8)
+    values = rank_values[np.where(valid, ranks, 0)]
+    hard = np.where(valid, values, 0).sum(axis=1, dtype=np.int16)
+    soft = (ranks == ACE).any(axis=1) & (hard <= 11)
+    totals = hard + 10 * soft
+    blackjacks = (totals == 21) & (valid.sum(axis=1) == 2)
+    return totals, soft, blackjacks
+
+
+def hand_totals(ranks):
+    '''Evaluates all hands (rows) of a rank matrix.
+
+    Parameters
+    ----------
+    ranks : 2-D array-like
+        Rank matrix padded by `PAD`, one hand per row.
+
+    Returns
+    -------
+    totals
+        Total points of every hand - see `blackjack.hand_value`.
+    soft
+        `True` for hands with an Ace counted as 11.
+    blackjack
+        `True` for hands of 21 points with exactly two cards.
+
+    Examples
+    --------
+    >>> totals, soft, blackjack = hand_totals([[12, 9, PAD], [12, 12, 8]])
+    >>> [int(t) for t in totals], [bool(s) for s in soft]
+    ([21, 12], [True, False])
+    >>> [bool(b) for b in blackjack]
+    [True, False]
+    '''
+    if np is None:
+        return _hand_totals_python(ranks)
+    return _hand_totals_numpy(ranks)
+
+
+def resolve_code(player_score, player_blackjack, dealer_score,
+                 dealer_blackjack):
+    '''Result code of a single game - the same decision as in
+    `blackjack.resolve_game` made on already evaluated hands.'''
+    if player_score > 21:
+        return DW
+    elif dealer_score > 21:
+        return PW
+    elif player_blackjack and not dealer_blackjack:
+        return PW
+    elif dealer_blackjack and not player_blackjack:
+        return DW
+    elif player_score > dealer_score:
+        return PW
+    elif dealer_score > player_score:
+        return DW
+    return SO
+
+
+def _resolve_games_numpy(player, dealer):
+    return np.select(
+        [player[0] > 21,
+         dealer[0] > 21,
+         player[2] & ~dealer[2],
+         dealer[2] & ~player[2],
+         player[0] > dealer[0],
+         dealer[0] > player[0]],
+        [DW, PW, PW, DW, PW, DW],
+        default=SO).astype(np.int8)
+
+
+def resolve_games(player_ranks, dealer_ranks):
+    '''Decides results of many games at once.
+
+    Parameters
+    ----------
+    player_ranks : 2-D array-like
+        Rank matrix of player hands.
+    dealer_ranks : 2-D array-like
+        Rank matrix of dealer hands, the same number of rows as
+        `player_ranks`.
+
+    Returns
+    -------
+    player : `tuple`
+        Result of `hand_totals` for player hands.
+    dealer : `tuple`
+        Result of `hand_totals` for dealer hands.
+    codes
+        Result code of every game (`PW`, `DW` or `SO`).
+
+    Examples
+    --------
+    >>> player, dealer, codes = resolve_games([[12, 9], [8, 5]],
+    ...                                       [[8, 7], [8, 7]])
+    >>> [RESULT_CODES[code] for code in codes]
+    ['PW', 'DW']
+    '''
+    player = hand_totals(player_ranks)
+    dealer = hand_totals(dealer_ranks)
+
+    if np is None:
+        codes = [resolve_code(*row) for row in zip(player[0], player[2],
+                                                   dealer[0], dealer[2])]
+    else:
+        codes = _resolve_games_numpy(player, dealer)
+
+    return player, dealer, codes
+
+
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()
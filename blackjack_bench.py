@@ -0,0 +1,296 @@
+'''Benchmarks of the core game functions.
+
+Every benchmark times one operation (e.g. one call of `hand_value`) many
+times. Operations are timed in batches - a batch is long enough to be
+measured reliably - and several batches give percentiles of time per
+operation. Results can be stored as a baseline and later runs compared with
+it - operations slower than the baseline by more than a threshold are
+reported as regressions.
+
+Throughput of the simulator is `simulate[100 rounds]` - one operation is 100
+headless rounds from a 6-deck shoe played by the table fast path of
+`blackjack_sim.simulate`. On one core it runs about 200-260 thousand rounds
+per second (Python 3.11), nearly half of the time is spent by reshuffling the
+shoe (`random.shuffle` of 312 cards every ~43 rounds). Rounds needing
+`blackjack_hand.Hand` objects (`headless_round`, custom policies, writers,
+probes) run about 80-130 thousand rounds per second.
+
+Usage: python blackjack_bench.py [--save | --compare] [--baseline FILE]
+'''
+
+import json
+import random
+import statistics
+import time
+from blackjack import (generate_cards, prepare_deck, draw_card, hand_value,
+                       resolve_game, dealer_turn)
+from blackjack_cards import ACE, new_deck
+from blackjack_hand import Hand
+from blackjack_shoe import Shoe
+from blackjack_count import CountingShoe
+from blackjack_rules import RuleSet
+from blackjack_sim import (simulate, play_round, play_round_rules,
+                          policy_stand_on)
+
+BASELINE_FILE = "bench_baseline.json"
+
+# relative slowdown reported as regression
+THRESHOLD = 0.10
+
+# minimal duration of one timed batch (seconds)
+BATCH_TIME = 0.005
+
+
+def _bench_generate_cards():
+    return generate_cards
+
+
+def _bench_prepare_deck():
+    deck = new_deck()
+    return lambda: prepare_deck(deck)
+
+
+def _deck_round(lazy):
+    # new deck for a round with 5 cards drawn
+    cards = new_deck()
+    rng = random.Random(1)
+
+    def deck_round():
+        deck = prepare_deck(cards, rng, lazy)
+        for i in range(5):
+            deck.pop()
+    return deck_round
+
+
+def _bench_deck_round():
+    return _deck_round(False)
+
+
+def _bench_deck_round_lazy():
+    return _deck_round(True)
+
+
+def _bench_draw_card():
+    shoe = Shoe(rng=random.Random(1))
+    return lambda: draw_card(shoe)
+
+
+def _bench_draw_card_counting():
+    shoe = CountingShoe(rng=random.Random(1))
+    return lambda: draw_card(shoe)
+
+
+def _bench_hand_value_aces():
+    # four Aces and small cards - 11 cards, 21 points
+    hand = [ACE, ACE + 13, ACE + 26, ACE + 39, 0, 13, 26, 39, 1, 14, 27]
+    return lambda: hand_value(hand)
+
+
+def _bench_hand_value_dicts():
+    views = generate_cards()
+    hand = [views[card] for card in (ACE, ACE + 13, 0, 13, 26, 39, 1, 14)]
+    return lambda: hand_value(hand)
+
+
+def _bench_hand_value_hand():
+    hand = Hand([ACE, ACE + 13, ACE + 26, ACE + 39, 0, 13, 26, 39, 1, 14, 27])
+    return lambda: hand_value(hand)
+
+
+def _bench_resolve_game():
+    player = {"hand": Hand([ACE, 8])}
+    dealer = {"hand": Hand([8, 4, 5])}
+    return lambda: resolve_game(player, dealer)
+
+
+def _bench_dealer_turn():
+    shoe = Shoe(rng=random.Random(1))
+
+    def dealer_round():
+        shoe.new_round()
+        dealer_turn({"role": "dealer", "hand": Hand([shoe.pop()])}, shoe)
+    return dealer_round
+
+
+def _bench_headless_round():
+    shoe = Shoe(rng=random.Random(1))
+    policy = policy_stand_on(17)
+
+    def headless_round():
+        shoe.new_round()
+        play_round(shoe, policy)
+    return headless_round
+
+
+def _bench_headless_round_rules():
+    rules = RuleSet()
+    shoe = rules.new_shoe(random.Random(1))
+    policy = policy_stand_on(17)
+
+    def headless_round():
+        shoe.new_round()
+        play_round_rules(shoe, policy, rules)
+    return headless_round
+
+
+def _bench_simulate():
+    shoe = Shoe(rng=random.Random(1))
+    policy = policy_stand_on(17)
+    return lambda: simulate(100, policy, shoe)
+
+
+# name -> factory returning operation to be timed
+BENCHMARKS = {
+    "generate_cards": _bench_generate_cards,
+    "prepare_deck": _bench_prepare_deck,
+    "deck_round": _bench_deck_round,
+    "deck_round[lazy]": _bench_deck_round_lazy,
+    "draw_card": _bench_draw_card,
+    "draw_card[counting]": _bench_draw_card_counting,
+    "hand_value[aces]": _bench_hand_value_aces,
+    "hand_value[dicts]": _bench_hand_value_dicts,
+    "hand_value[Hand]": _bench_hand_value_hand,
+    "resolve_game": _bench_resolve_game,
+    "dealer_turn": _bench_dealer_turn,
+    "headless_round": _bench_headless_round,
+    "headless_round[rules]": _bench_headless_round_rules,
+    "simulate[100 rounds]": _bench_simulate,
+}
+
+
+def _batch_size(operation):
+    '''Number of operations in a batch lasting at least `BATCH_TIME`.'''
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for i in range(number):
+            operation()
+        if time.perf_counter() - start >= BATCH_TIME:
+            return number
+        number *= 2
+
+
+def bench(operation, batches=30):
+    '''Times an operation.
+
+    Parameters
+    ----------
+    operation : `function`
+        Function without parameters.
+    batches : `int`, optional
+        Number of timed batches.
+
+    Returns
+    -------
+    `dict`
+        Operations per second (by median) and percentiles of time per
+        operation in microseconds.
+    '''
+    number = _batch_size(operation)
+    samples = []
+    for batch in range(batches):
+        start = time.perf_counter()
+        for i in range(number):
+            operation()
+        samples.append((time.perf_counter() - start) / number * 1e6)
+
+    percentiles = statistics.quantiles(samples, n=100, method="inclusive")
+    median = statistics.median(samples)
+    return {"ops_per_sec": 1e6 / median,
+            "p50_us": median,
+            "p90_us": percentiles[89],
+            "p99_us": percentiles[98]}
+
+
+def run_benchmarks(names=None, batches=30):
+    '''Runs benchmarks (all by default) and returns their results by name.'''
+    if names is None:
+        names = list(BENCHMARKS)
+    return {name: bench(BENCHMARKS[name](), batches) for name in names}
+
+
+def load_baseline(path=BASELINE_FILE):
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_baseline(results, path=BASELINE_FILE):
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+
+
+def find_regressions(results, baseline, threshold=THRESHOLD):
+    '''Compares results with a baseline.
+
+    Returns
+    -------
+    `list` of `tuple`
+        (name, baseline ops/sec, current ops/sec) of every benchmark slower
+        than baseline by more than `threshold`.
+
+    >>> results = {"a": {"ops_per_sec": 80}, "b": {"ops_per_sec": 95}}
+    >>> baseline = {"a": {"ops_per_sec": 100}, "b": {"ops_per_sec": 100}}
+    >>> find_regressions(results, baseline)
+    [('a', 100, 80)]
+    '''
+    regressions = []
+    for name, stats in results.items():
+        if name not in baseline:
+            continue
+        expected = baseline[name]["ops_per_sec"]
+        if stats["ops_per_sec"] < expected * (1 - threshold):
+            regressions.append((name, expected, stats["ops_per_sec"]))
+    return regressions
+
+
+def format_results(results, baseline=None):
+    '''Returns results as a human readable table.'''
+    lines = ["{:<24} {:>12} {:>10} {:>10} {:>10} {:>8}".format(
+        "benchmark", "ops/s", "p50 us", "p90 us", "p99 us", "change")]
+    for name, stats in results.items():
+        change = ""
+        if baseline and name in baseline:
+            change = "{:+.1%}".format(stats["ops_per_sec"] /
+                                      baseline[name]["ops_per_sec"] - 1)
+        lines.append("{:<24} {:>12.0f} {:>10.3f} {:>10.3f} {:>10.3f} {:>8}"
+                     .format(name, stats["ops_per_sec"], stats["p50_us"],
+                             stats["p90_us"], stats["p99_us"], change))
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("names", nargs="*", help="benchmarks to run")
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--save", action="store_true",
+                        help="store results as the baseline")
+    parser.add_argument("--compare", action="store_true",
+                        help="fail on regression against the baseline")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    parser.add_argument("--batches", type=int, default=30)
+    args = parser.parse_args()
+
+    baseline = None
+    if args.compare:
+        try:
+            baseline = load_baseline(args.baseline)
+        except FileNotFoundError:
+            sys.exit("No baseline '{}' - run with --save first to create it"
+                     .format(args.baseline))
+
+    results = run_benchmarks(args.names or None, args.batches)
+    print(format_results(results, baseline))
+
+    if args.save:
+        save_baseline(results, args.baseline)
+        print("Baseline saved to '{}'".format(args.baseline))
+
+    if args.compare:
+        regressions = find_regressions(results, baseline, args.threshold)
+        for name, expected, current in regressions:
+            print("REGRESSION {}: {:.0f} -> {:.0f} ops/s".format(
+                name, expected, current))
+        sys.exit(1 if regressions else 0)
@@ -0,0 +1,98 @@
+'''Compact representation of playing cards.
+
+One playing card is represented by a small integer - the index of the card in
+the list returned by `blackjack.generate_cards` (i.e. colors in order hearts,
+diamonds, spades, clubs and 13 ranks from 2 to Ace in each color). Everything
+needed during a game (rank, value, is it an Ace?) is looked up by that index in
+the tables below, dictionaries from `generate_cards` are used only for
+displaying cards to a player.
+
+A deck is a `bytearray` of such integers - one byte per card.
+'''
+
+import random
+
+RANKS = ('2', '3', '4', '5', '6', '7', '8', '9', '10', 'Jack', 'Queen',
+         'King', 'Ace')
+RANK_COUNT = len(RANKS)
+CARD_COUNT = 4 * RANK_COUNT
+
+# index of the Ace in RANKS
+ACE = RANK_COUNT - 1
+
+# hard value of a rank - Ace is counted as 1, the extra 10 points of a soft
+# hand are added by `hand_total`
+RANK_VALUE = bytes((2, 3, 4, 5, 6, 7, 8, 9, 10, 10, 10, 10, 1))
+
+CARD_RANK = bytes(card % RANK_COUNT for card in range(CARD_COUNT))
+CARD_VALUE = bytes(RANK_VALUE[rank] for rank in CARD_RANK)
+
+
+def new_deck(decks=1):
+    '''Returns unshuffled deck(s) of cards in `generate_cards` order.
+
+    >>> deck = new_deck()
+    >>> len(deck), deck[0], deck[-1]
+    (52, 0, 51)
+    >>> len(new_deck(6))
+    312
+    '''
+    return bytearray(range(CARD_COUNT)) * decks
+
+
+def shuffled_deck(decks=1, rng=random):
+    '''Returns shuffled deck(s) of cards.'''
+    deck = new_deck(decks)
+    rng.shuffle(deck)
+    return deck
+
+
+def hand_total(hand):
+    '''Counts total value of a hand of compact cards.
+
+    One Ace is counted as 11 if it doesn't bust the hand, all other Aces are
+    counted as 1.
+
+    >>> hand_total([8, 6])        # 10 + 8
+    18
+    >>> hand_total([12, 8, 25])   # Ace + 10 + Ace
+    12
+    >>> hand_total([12, 9])       # Ace + Jack
+    21
+    '''
+    total = 0
+    ace = False
+    for card in hand:
+        value = CARD_VALUE[card]
+        total += value
+        if value == 1:
+            ace = True
+
+    if ace and total <= 11:
+        total += 10
+
+    return total
+
+
+def is_soft(hand):
+    '''Returns `True` if the hand contains an Ace counted as 11.
+
+    >>> is_soft([12, 5])
+    True
+    >>> is_soft([12, 5, 8])
+    False
+    '''
+    total = 0
+    ace = False
+    for card in hand:
+        value = CARD_VALUE[card]
+        total += value
+        if value == 1:
+            ace = True
+
+    return ace and total <= 11
+
+
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()
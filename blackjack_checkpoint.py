@@ -0,0 +1,160 @@
+'''Long-running headless simulation with checkpoints.
+
+Rounds are played in chunks of fixed size from one shoe. After a chunk, when
+at least `interval` seconds passed since the last checkpoint, the state of
+the run - the shoe (including its random generator and position), aggregate
+results and number of played rounds - is written to a checkpoint file. The
+file is replaced atomically, so a crash during writing leaves the previous
+checkpoint intact.
+
+A run started again with the same checkpoint file continues from the last
+checkpoint. Chunks are merged in the same order in both cases, so a resumed
+run gives exactly the same results as an uninterrupted one.
+
+Usage: python blackjack_checkpoint.py ROUNDS FILE [--seed SEED]
+'''
+
+import os
+import pickle
+import time
+from blackjack_parallel import chunk_rng
+from blackjack_shoe import Shoe
+from blackjack_sim import (simulate, new_results, merge_results,
+                          policy_stand_on, policy_identity)
+
+CHECKPOINT_VERSION = 1
+
+# rounds played between checks of the checkpoint interval
+CHECKPOINT_ROUNDS = 10000
+
+# minimal number of seconds between two checkpoints
+INTERVAL = 5.0
+
+
+def save_checkpoint(path, state):
+    '''Writes state of a run to a checkpoint file (atomically).'''
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def load_checkpoint(path):
+    '''Reads state of a run saved by `save_checkpoint`.'''
+    with open(path, "rb") as f:
+        state = pickle.load(f)
+    if state.get("version") != CHECKPOINT_VERSION:
+        raise ValueError("'{}' is not a checkpoint file".format(path))
+    return state
+
+
+def rules_identity(rules):
+    '''Returns every field of a `blackjack_rules.RuleSet` (`None` for no
+    rules) - rule sets of the same run have equal identities.'''
+    if rules is None:
+        return None
+    deck = rules.deck
+    return {"decks": rules.decks, "hit_soft17": rules.hit_soft17,
+            "blackjack_payout": rules.blackjack_payout,
+            "double": rules.double,
+            "double_after_split": rules.double_after_split,
+            "max_hands": rules.max_hands, "resplit_aces": rules.resplit_aces,
+            "surrender": rules.surrender, "penetration": rules.penetration,
+            "deck": None if deck is None else (deck.name, bytes(deck.cards))}
+
+
+def simulate_checkpointed(rounds, path, policy=policy_stand_on(17), decks=6,
+                          soft17_draw=False, seed=0, rules=None,
+                          interval=INTERVAL, chunk_rounds=CHECKPOINT_ROUNDS):
+    '''Plays headless rounds, checkpointing the run to `path`.
+
+    If `path` holds a checkpoint of the same run (the same number of rounds,
+    seed, decks, dealer rule, rules, policy and chunk size) the run is
+    resumed from it. Policies are told apart by
+    `blackjack_sim.policy_identity`.
+
+    Parameters
+    ----------
+    rounds : `int`
+        Number of rounds to be played.
+    path : `str`
+        Checkpoint file.
+    policy : `function`, optional
+        Player policy. Default: draw until 17 points.
+    decks : `int`, optional
+        Number of decks in the shoe. Default 6.
+    soft17_draw : `bool`, optional
+        Passed to `blackjack.dealer_turn`.
+    seed : optional
+        Seed of the shoe. Default 0.
+    rules : `blackjack_rules.RuleSet`, optional
+        Passed to `blackjack_sim.simulate` (its decks and penetration are
+        used for the shoe).
+    interval : `float`, optional
+        Minimal number of seconds between checkpoints. Default `INTERVAL`.
+    chunk_rounds : `int`, optional
+        Number of rounds between checks of the interval.
+
+    Returns
+    -------
+    `dict`
+        Aggregate results, see `blackjack_sim.new_results`.
+
+    Raises
+    ------
+    ValueError
+        When `path` holds a checkpoint of another run.
+    '''
+    run = {"rounds": rounds, "seed": seed, "decks": decks,
+           "soft17_draw": soft17_draw, "chunk_rounds": chunk_rounds,
+           "rules": rules_identity(rules),
+           "policy": policy_identity(policy)}
+
+    if os.path.exists(path):
+        state = load_checkpoint(path)
+        if state["run"] != run:
+            raise ValueError("'{}' is a checkpoint of another run"
+                             .format(path))
+    else:
+        if rules is None:
+            shoe = Shoe(decks, rng=chunk_rng(seed, 0))
+        else:
+            shoe = rules.new_shoe(chunk_rng(seed, 0))
+        state = {"version": CHECKPOINT_VERSION, "run": run, "played": 0,
+                 "results": new_results(), "shoe": shoe}
+
+    shoe = state["shoe"]
+    last_checkpoint = time.monotonic()
+    while state["played"] < rounds:
+        chunk = min(chunk_rounds, rounds - state["played"])
+        merge_results(state["results"],
+                      simulate(chunk, policy, shoe, soft17_draw, rules=rules))
+        state["played"] += chunk
+
+        if time.monotonic() - last_checkpoint >= interval:
+            save_checkpoint(path, state)
+            last_checkpoint = time.monotonic()
+
+    # the final state - running the finished run again only reads results
+    save_checkpoint(path, state)
+    return state["results"]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("rounds", type=int)
+    parser.add_argument("file", help="checkpoint file")
+    parser.add_argument("--seed", default="0")
+    parser.add_argument("--decks", type=int, default=6)
+    parser.add_argument("--interval", type=float, default=INTERVAL)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    results = simulate_checkpointed(args.rounds, args.file, decks=args.decks,
+                                    seed=args.seed, interval=args.interval)
+    print(results)
+    print("finished in {:.2f} s".format(time.perf_counter() - start))
@@ -1,6 +1,11 @@
 '''Helper module for a blackjack game'''
 
 import re
+import json
+from contextlib import contextmanager
+
+INCORRECT_CHOICE = "Incorrect value. Try it again."
+INVALID_INPUT = "Invalid input. Please answer in correct format."
 
 
 def validate(value, default_ruleset=[], *additional_rulesets):
@@ -218,8 +223,122 @@ def rule_sum(*refs):
     return is_sum
 
 
+class ScriptedInput:
+    """Input source answering prompts from a prepared list of answers.
+
+    Like `input()` it raises `EOFError` when there are no more answers.
+
+    >>> answers = ScriptedInput(["yes", "no"])
+    >>> answers("Prompt: "), answers("Prompt: ")
+    ('yes', 'no')
+    """
+
+    def __init__(self, answers):
+        self.answers = iter(answers)
+
+    def __call__(self, prompt=""):
+        try:
+            return next(self.answers)
+        except StopIteration:
+            raise EOFError("No more scripted answers")
+
+
+class RecordingInput:
+    """Input source recording answers of another source (e.g. `input`).
+
+    Recorded answers are in attribute `answers`, see `save_sessions`.
+    """
+
+    def __init__(self, source=input):
+        self.source = source
+        self.answers = []
+
+    def __call__(self, prompt=""):
+        answer = self.source(prompt)
+        self.answers.append(answer)
+        return answer
+
+
+class BufferedOutput:
+    """Output sink collecting all messages in a list `lines`."""
+
+    def __init__(self):
+        self.lines = []
+
+    def __call__(self, message=""):
+        self.lines.append(str(message))
+
+
+def discard_output(message=""):
+    """Output sink ignoring all messages."""
+
+
+# current input source and output sink, see `io_session`
+_source = input
+_sink = print
+
+
+def say(message=""):
+    """Shows message to user through current output sink."""
+    _sink(message)
+
+
+@contextmanager
+def io_session(source=None, sink=None):
+    """Context manager replacing input source and output sink of all
+    functions of this module (and of the game using them).
+
+    Parameters
+    ----------
+    source : `function`, optional
+        source(prompt) -> str, e.g. `input` (default), `ScriptedInput`,
+        `RecordingInput`.
+    sink : `function`, optional
+        sink(message), e.g. `print` (default), `BufferedOutput`,
+        `discard_output`.
+
+    Examples
+    --------
+    >>> with io_session(ScriptedInput(["maybe", "n"]), discard_output):
+    ...     user_choice()
+    'n'
+    """
+    global _source, _sink
+    saved = _source, _sink
+    if source is not None:
+        _source = source
+    if sink is not None:
+        _sink = sink
+    try:
+        yield
+    finally:
+        _source, _sink = saved
+
+
+def load_sessions(path):
+    """Loads recorded sessions - one JSON line per session, either a list
+    of answers or an object with the answers and the seed of the shoe
+    (``{"seed": 42, "answers": ["y", "n"]}``).
+
+    Returns
+    -------
+    `list` of `list` of `str` or `dict`
+    """
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def save_sessions(path, sessions):
+    """Appends sessions (lists of answers or objects with the answers and
+    the seed, see `load_sessions`) to a session file."""
+    with open(path, "a", encoding="utf-8") as f:
+        for answers in sessions:
+            f.write(json.dumps(answers) + "\n")
+
+
 # IDEA: Add support for validation messages
-def user_input(prompt="", expected_type=str, *rulesets):
+def user_input(prompt="", expected_type=str, *rulesets, source=None,
+               sink=None):
     '''Calls for user input from CLI with defined prompt.
 
     Parameters
@@ -232,6 +351,10 @@ def user_input(prompt="", expected_type=str, *rulesets):
         Default `str`.
     rulesets : `list` of rules
         Rulesets to be applied for input value validation.
+    source : `function`, optional
+        Input source used instead of the current one (see `io_session`).
+    sink : `function`, optional
+        Output sink used instead of the current one (see `io_session`).
 
     Returns
     -------
@@ -251,8 +374,11 @@ def user_input(prompt="", expected_type=str, *rulesets):
     --------
     Docstring of `validate` method for more details about validation rulesets.
     '''
+    source = source or _source
+    sink = sink or _sink
+
     while True:
-        raw_input = input(prompt)
+        raw_input = source(prompt)
 
         try:
             raw_input = expected_type(raw_input)
@@ -261,7 +387,7 @@ def user_input(prompt="", expected_type=str, *rulesets):
         except Exception:
             pass
 
-        print("Invalid input. Please answer in correct format.")
+        sink(INVALID_INPUT)
 
     return raw_input
 
@@ -309,9 +435,37 @@ def _prepare_options_dictionary(options, case_sensitive=False):
     return options_dict
 
 
+def match_option(raw_input, options):
+    """Finds option matching user input.
+
+    For internal use in `user_choice` function (and its non-blocking
+    counterparts, e.g. in `blackjack_server`).
+
+    Parameters
+    ----------
+    raw_input : `str`
+        User input (already lowercased if the choice is not case sensitive).
+    options : `dict`
+        Options prepared by `_prepare_options_dictionary`.
+
+    Returns
+    -------
+    Key of matching option or `None` if no option matches.
+
+    Examples
+    --------
+    >>> match_option("yes", {"y": ["y", "yes"], "n": ["n", "no"]})
+    'y'
+    """
+    for key, values in options.items():
+        if raw_input in values:
+            return key
+    return None
+
+
 # IDEA: Add support for validation messages
 def user_choice(options=[("y", "yes"), ("n", "no")], prompt="",
-                case_sensitive=False):
+                case_sensitive=False, source=None, sink=None):
     """Gets an user choice from options. More different forms of any option
     might be declared.
 
@@ -326,6 +480,10 @@ def user_choice(options=[("y", "yes"), ("n", "no")], prompt="",
     case_sensitive : `bool`
         If `True` then uppercase and lowercase letters are treated as distinct.
         Default `False`
+    source : `function`, optional
+        Input source used instead of the current one (see `io_session`).
+    sink : `function`, optional
+        Output sink used instead of the current one (see `io_session`).
 
     Returns
     -------
@@ -343,17 +501,21 @@ def user_choice(options=[("y", "yes"), ("n", "no")], prompt="",
         The same as previous example
     """
     options = _prepare_options_dictionary(options)
+    source = source or _source
+    sink = sink or _sink
 
     while True:
-        raw_input = input(prompt) if case_sensitive else input(prompt).lower()
-        for key, values in options.items():
-            if raw_input in values:
-                return key
-        print("Incorrect value. Try it again.")
+        raw_input = source(prompt)
+        if not case_sensitive:
+            raw_input = raw_input.lower()
+        choice = match_option(raw_input, options)
+        if choice is not None:
+            return choice
+        sink(INCORRECT_CHOICE)
 
 
 def label_print(message, decoration="-", extra_line=True):
-    '''Prints a message in an ascii frame.
+    '''Prints a message in an ascii frame (through current output sink).
 
     Parameters
     ----------
@@ -366,12 +528,12 @@ def label_print(message, decoration="-", extra_line=True):
         message. Default `True`
     '''
     if extra_line:
-        print()
-    print(decoration*len(message))
-    print(message)
-    print(decoration*len(message))
+        say()
+    say(decoration*len(message))
+    say(message)
+    say(decoration*len(message))
     if extra_line:
-        print()
+        say()
 
 
 if __name__ == "__main__":
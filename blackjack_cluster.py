@@ -0,0 +1,253 @@
+'''Simulation spread over many hosts - coordinator and workers over TCP.
+
+The coordinator splits a run into chunks of rounds exactly as
+`blackjack_parallel.simulate_parallel` does and hands them out to workers
+connected over TCP. Every chunk is played by
+`blackjack_parallel.simulate_chunk` with its own seeded shoe, so a chunk gives
+the same results on any worker and the merged totals are identical to a
+single-process run with the same seed.
+
+* Workers ask for a chunk whenever they are idle, so fast workers simply play
+  more chunks.
+* When no chunk is waiting, an idle worker steals a chunk still being played
+  by another (slower) worker. Whichever finishes first delivers the result,
+  the other one is ignored.
+* Chunks of a worker whose connection is lost go back to the queue.
+* Every finished chunk streams its aggregate results back immediately; they
+  are merged in chunk order at the end.
+
+Protocol (UTF-8, one JSON message per line):
+
+* worker sends ``{"type": "ready"}`` once after connecting,
+* coordinator sends ``{"type": "chunk", "chunk": N, "rounds": R, "job":
+  {...}}`` or ``{"type": "done"}``,
+* worker answers a chunk by ``{"type": "result", "chunk": N, "results":
+  {...}}`` and waits for the next message.
+
+Usage: python blackjack_cluster.py coordinate ROUNDS [--port PORT] [...]
+       python blackjack_cluster.py work [--host HOST] [--port PORT]
+'''
+
+import asyncio
+import json
+import socket
+from blackjack_parallel import simulate_chunk, split_rounds, CHUNK_ROUNDS
+from blackjack_sim import new_results, merge_results, policy_stand_on
+
+HOST = "127.0.0.1"
+PORT = 8022
+
+# number of workers playing one chunk at the same time (original + thief)
+MAX_COPIES = 2
+
+
+def _message(message):
+    return (json.dumps(message) + "\n").encode()
+
+
+class Coordinator:
+    '''Coordinator of a distributed simulation.
+
+    Parameters
+    ----------
+    rounds : `int`
+        Number of rounds to be played.
+    seed : optional
+        Seed of the run (`int` or `str`). Default 0.
+    decks : `int`, optional
+        Number of decks of every chunk's shoe. Default 6.
+    soft17_draw : `bool`, optional
+        Passed to `blackjack.dealer_turn`.
+    stand_on : `int`, optional
+        Player policy `blackjack_sim.policy_stand_on(stand_on)`. Default 17.
+    chunk_rounds : `int`, optional
+        Number of rounds of one chunk.
+
+    Examples
+    --------
+    Coordinator is started in an event loop, workers (`run_worker`) connect
+    to it, e.g.::
+
+        coordinator = Coordinator(10 ** 9, seed=1)
+        await coordinator.start(port=8022)
+        results = await coordinator.wait()
+    '''
+
+    def __init__(self, rounds, seed=0, decks=6, soft17_draw=False,
+                 stand_on=17, chunk_rounds=CHUNK_ROUNDS):
+        self.job = {"seed": seed, "decks": decks, "soft17_draw": soft17_draw,
+                    "stand_on": stand_on}
+        self.sizes = dict(split_rounds(rounds, chunk_rounds))
+        self.pending = sorted(self.sizes)
+        # chunk -> number of workers playing it
+        self.playing = {}
+        self.results = {}
+        self.progress = new_results()
+        self.server = None
+        self.changed = None
+
+    @property
+    def finished(self):
+        return len(self.results) == len(self.sizes)
+
+    def _next_chunk(self, own):
+        '''Returns chunk for an idle worker, `None` if there isn't any.'''
+        if self.pending:
+            return self.pending.pop(0)
+        # steal the oldest chunk played by fewest other workers
+        candidates = [chunk for chunk, copies in self.playing.items()
+                      if copies < MAX_COPIES and chunk not in own]
+        if candidates:
+            return min(candidates, key=lambda c: (self.playing[c], c))
+        return None
+
+    def _release(self, chunk):
+        '''Worker stopped playing a chunk (finished it or died).'''
+        self.playing[chunk] -= 1
+        if not self.playing[chunk]:
+            del self.playing[chunk]
+            if chunk not in self.results:
+                # nobody else plays it - back to the queue
+                self.pending.insert(0, chunk)
+
+    async def _serve_worker(self, reader, writer):
+        own = set()
+        try:
+            if not await reader.readline():
+                return
+            while True:
+                async with self.changed:
+                    while True:
+                        if self.finished:
+                            chunk = None
+                            break
+                        chunk = self._next_chunk(own)
+                        if chunk is not None:
+                            break
+                        await self.changed.wait()
+                if chunk is None:
+                    writer.write(_message({"type": "done"}))
+                    await writer.drain()
+                    return
+
+                own.add(chunk)
+                self.playing[chunk] = self.playing.get(chunk, 0) + 1
+                writer.write(_message({"type": "chunk", "chunk": chunk,
+                                       "rounds": self.sizes[chunk],
+                                       "job": self.job}))
+                await writer.drain()
+
+                line = await reader.readline()
+                if not line:
+                    raise ConnectionError("Worker has disconnected")
+                message = json.loads(line)
+                if message.get("chunk") != chunk:
+                    raise ValueError("Worker returned another chunk")
+
+                async with self.changed:
+                    own.discard(chunk)
+                    if chunk not in self.results:
+                        self.results[chunk] = message["results"]
+                        merge_results(self.progress, message["results"])
+                    self._release(chunk)
+                    self.changed.notify_all()
+        except (ConnectionError, ValueError, KeyError):
+            pass
+        finally:
+            async with self.changed:
+                for chunk in own:
+                    self._release(chunk)
+                self.changed.notify_all()
+            writer.close()
+
+    async def start(self, host=HOST, port=PORT):
+        '''Starts listening for workers.
+
+        Returns
+        -------
+        `tuple`
+            Host and port the coordinator listens on (useful with port 0).
+        '''
+        self.changed = asyncio.Condition()
+        self.server = await asyncio.start_server(self._serve_worker, host,
+                                                 port)
+        return self.server.sockets[0].getsockname()[:2]
+
+    async def wait(self):
+        '''Waits until all chunks are played, stops the server and returns
+        merged results (see `blackjack_sim.new_results`).'''
+        async with self.changed:
+            await self.changed.wait_for(lambda: self.finished)
+        # workers still playing stolen chunks get "done" after they finish,
+        # a hung worker must not hold the results back
+        self.server.close()
+
+        results = new_results()
+        for chunk in sorted(self.results):
+            merge_results(results, self.results[chunk])
+        return results
+
+
+def play_chunk(message):
+    '''Plays a chunk received from the coordinator and returns the result
+    message.'''
+    job = message["job"]
+    results = simulate_chunk(job["seed"], message["chunk"],
+                             message["rounds"],
+                             policy_stand_on(job["stand_on"]), job["decks"],
+                             job["soft17_draw"])
+    return {"type": "result", "chunk": message["chunk"], "results": results}
+
+
+def run_worker(host=HOST, port=PORT):
+    '''Plays chunks of a coordinator until the run is finished.
+
+    Returns
+    -------
+    `int`
+        Number of chunks played.
+    '''
+    played = 0
+    with socket.create_connection((host, port)) as connection:
+        stream = connection.makefile("rwb")
+        stream.write(_message({"type": "ready"}))
+        stream.flush()
+        for line in stream:
+            message = json.loads(line)
+            if message["type"] == "done":
+                break
+            stream.write(_message(play_chunk(message)))
+            stream.flush()
+            played += 1
+    return played
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("command", choices=("coordinate", "work"))
+    parser.add_argument("rounds", type=int, nargs="?")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--seed", default="0")
+    parser.add_argument("--decks", type=int, default=6)
+    parser.add_argument("--stand-on", type=int, default=17)
+    parser.add_argument("--chunk-rounds", type=int, default=CHUNK_ROUNDS)
+    args = parser.parse_args()
+
+    if args.command == "work":
+        print("{} chunks played".format(run_worker(args.host, args.port)))
+    else:
+        async def main():
+            coordinator = Coordinator(args.rounds, args.seed, args.decks,
+                                      stand_on=args.stand_on,
+                                      chunk_rounds=args.chunk_rounds)
+            await coordinator.start(args.host, args.port)
+            start = time.perf_counter()
+            results = await coordinator.wait()
+            print(results)
+            print("finished in {:.2f} s".format(time.perf_counter() - start))
+
+        asyncio.run(main())
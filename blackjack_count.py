@@ -0,0 +1,106 @@
+'''Card counting - running and true count of a shoe.
+
+Counting systems assign a tag to every rank (see `TAG_SYSTEMS`). The running
+count is the sum of tags of all cards dealt since the last shuffle, the true
+count is the running count per remaining deck.
+'''
+
+import random
+from blackjack_cards import CARD_COUNT, CARD_RANK, RANK_COUNT
+from blackjack_shoe import Shoe
+
+# tags of ranks 2, 3, 4, 5, 6, 7, 8, 9, 10, Jack, Queen, King, Ace
+TAG_SYSTEMS = {
+    "hi-lo": (1, 1, 1, 1, 1, 0, 0, 0, -1, -1, -1, -1, -1),
+    "ko": (1, 1, 1, 1, 1, 1, 0, 0, -1, -1, -1, -1, -1),
+    "hi-opt-i": (0, 1, 1, 1, 1, 0, 0, 0, -1, -1, -1, -1, 0),
+    "hi-opt-ii": (1, 1, 2, 2, 1, 1, 0, 0, -2, -2, -2, -2, 0),
+    "omega-ii": (1, 1, 2, 2, 2, 1, 0, -1, -2, -2, -2, -2, 0),
+    "zen": (1, 1, 2, 2, 2, 1, 0, 0, -2, -2, -2, -2, -1),
+}
+
+
+class CountingShoe(Shoe):
+    '''Shoe keeping the running count of dealt cards.
+
+    Per-rank remaining counts (`rank_counts`), running count and true count
+    are updated on every dealt card in constant time and can be read at any
+    moment.
+
+    Parameters
+    ----------
+    decks, penetration, cut_card, rng, deck
+        See `blackjack_shoe.Shoe`.
+    tags : `str` or sequence of `int`, optional
+        Counting system - name from `TAG_SYSTEMS` or tags of all 13 ranks.
+        Default "hi-lo".
+    initial_count : `int`, optional
+        Running count after shuffle (used by unbalanced systems, e.g. KO
+        starts at 4 - 4 * decks). Default 0.
+
+    Examples
+    --------
+    >>> shoe = CountingShoe(decks=1, cut_card=40)
+    >>> for i in range(52):
+    ...     card = shoe.pop()
+    >>> shoe.running_count   # Hi-Lo is a balanced system
+    0
+    '''
+
+    def __init__(self, decks=6, penetration=0.75, cut_card=None, rng=random,
+                 tags="hi-lo", initial_count=0, deck=None):
+        if isinstance(tags, str):
+            tags = TAG_SYSTEMS[tags]
+        if len(tags) != RANK_COUNT:
+            raise ValueError("Counting system needs a tag for every rank")
+        self.tags = tuple(tags)
+        # tag of every card - saves rank lookup when dealing
+        self.card_tags = tuple(self.tags[CARD_RANK[card]]
+                               for card in range(CARD_COUNT))
+        self.initial_count = initial_count
+        super().__init__(decks, penetration, cut_card, rng, deck)
+
+    def shuffle(self):
+        super().shuffle()
+        self.running_count = self.initial_count
+
+    def pop(self):
+        # the same as `Shoe.pop` + count update, inlined for speed
+        if self.position >= len(self.cards):
+            self.shuffle()
+        card = self.cards[self.position]
+        self.position += 1
+        self.rank_counts[CARD_RANK[card]] -= 1
+        self.running_count += self.card_tags[card]
+        return card
+
+    def deal(self, count):
+        if self.position + count > len(self.cards):
+            return [self.pop() for i in range(count)]
+        cards = Shoe.deal(self, count)
+        card_tags = self.card_tags
+        self.running_count += sum(card_tags[card] for card in cards)
+        return cards
+
+    @property
+    def decks_remaining(self):
+        '''Number of decks (fractional) not dealt yet.'''
+        return (len(self.cards) - self.position) / self.deck_size
+
+    @property
+    def true_count(self):
+        '''Running count per remaining deck.'''
+        remaining = len(self.cards) - self.position
+        if not remaining:
+            return 0.0
+        return self.running_count * self.deck_size / remaining
+
+    def composition(self):
+        '''Remaining cards of every rank as a tuple (e.g. for
+        `blackjack_odds.dealer_distribution`).'''
+        return tuple(self.rank_counts)
+
+
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()
@@ -0,0 +1,193 @@
+'''Deck definitions read from a config file and compiled into card tables.
+
+A deck definition tells which of the 52 cards of `blackjack.generate_cards`
+a deck holds, e.g. Spanish 21 is a deck without the four 10s (face cards
+stay). Cards keep their compact indices (see module `blackjack_cards`), so
+`hand_value`, `hand_total`, dealer's play and settlement work unchanged with
+any deck - only the cards put into the shoe differ.
+
+Config file (JSON) maps deck names to definitions::
+
+    {
+        "spanish21": {"remove": ["10"]},
+        "aces-high": {"ranks": ["2", "3", "4", "5", "6", "7", "8", "9",
+                                "10", "Jack", "Queen", "King", "Ace", "Ace"]},
+        "red": {"suits": ["hearts", "diamonds"], "copies": 2}
+    }
+
+Keys of a definition (all optional):
+
+* "ranks" - names of ranks of every suit (`blackjack_cards.RANKS`), a rank
+  listed more times is put in more times. Default all ranks once.
+* "remove" - names of ranks left out.
+* "suits" - names of suits (`SUITS`). Default all four.
+* "copies" - number of copies of every card. Default 1.
+
+A definition is compiled into `DeckTables` - cards of one deck and number of
+cards of every rank. Card values are those of the cards (see
+`blackjack_cards.CARD_VALUE`), a definition can't change them. Compiling
+takes tens of microseconds; compiled tables are kept in memory by a hash of
+the definition's content, so equal definitions are compiled once per
+process.
+
+Usage: python blackjack_decks.py [CONFIG]
+'''
+
+import hashlib
+import json
+from collections import namedtuple
+from blackjack_cards import CARD_RANK, RANKS, RANK_COUNT
+
+SUITS = ("hearts", "diamonds", "spades", "clubs")
+
+DECK_DEFINITIONS = {
+    "standard": {},
+    "spanish21": {"remove": ["10"]},
+}
+
+DEFINITION_KEYS = ("ranks", "remove", "suits", "copies")
+
+# compiled tables by hash of the definition
+_compiled = {}
+
+DeckTables = namedtuple("DeckTables", ("name", "cards", "rank_counts"))
+DeckTables.__doc__ = '''Compiled deck definition.
+
+Parameters
+----------
+name : `str`
+    Name of the deck.
+cards : `bytes`
+    Compact cards of one deck (see `blackjack_shoe.Shoe`).
+rank_counts : `tuple` of `int`
+    Number of cards of every rank in one deck.
+'''
+
+
+def _names(definition, key, names, default):
+    values = definition.get(key, default)
+    if isinstance(values, str) or not isinstance(values, (list, tuple)):
+        raise ValueError("'{}' has to be a list of names".format(key))
+    for value in values:
+        if value not in names:
+            raise ValueError("Unknown name '{}' in '{}'".format(value, key))
+    return [names.index(value) for value in values]
+
+
+def compile_deck(definition, name=""):
+    '''Compiles a deck definition into `DeckTables`.
+
+    >>> deck = compile_deck({"remove": ["10"]}, "spanish21")
+    >>> len(deck.cards), deck.rank_counts[8], deck.rank_counts[9]
+    (48, 0, 4)
+    >>> compile_deck({"suits": ["hearts"], "copies": 2}).cards[:3]
+    b'\\x00\\x00\\x01'
+
+    Raises
+    ------
+    ValueError
+        When the definition is invalid or the deck would be empty.
+    '''
+    if not isinstance(definition, dict):
+        raise ValueError("Deck definition has to be a dictionary")
+    for key in definition:
+        if key not in DEFINITION_KEYS:
+            raise ValueError("Unknown key '{}' of deck definition"
+                             .format(key))
+    ranks = _names(definition, "ranks", RANKS, RANKS)
+    removed = _names(definition, "remove", RANKS, ())
+    suits = _names(definition, "suits", SUITS, SUITS)
+    copies = definition.get("copies", 1)
+    if not isinstance(copies, int) or copies < 1:
+        raise ValueError("Number of copies has to be a positive integer")
+
+    cards = bytes(suit * RANK_COUNT + rank
+                  for suit in suits for rank in ranks if rank not in removed
+                  for i in range(copies))
+    if not cards:
+        raise ValueError("Deck has no cards")
+
+    rank_counts = [0] * RANK_COUNT
+    for card in cards:
+        rank_counts[CARD_RANK[card]] += 1
+    return DeckTables(name, cards, tuple(rank_counts))
+
+
+def definition_hash(definition):
+    '''Returns hash of a definition's content (hex string) - the same for
+    equal definitions regardless of key order.'''
+    content = json.dumps(definition, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+def deck_tables(definition, name=""):
+    '''Returns compiled tables of a definition, compiling it only if an
+    equal definition hasn't been compiled yet (see `definition_hash`).
+
+    >>> a = deck_tables({"remove": ["10"]}, "spanish21")
+    >>> b = deck_tables({"remove": ["10"]}, "no-tens")
+    >>> a.cards is b.cards, b.name
+    (True, 'no-tens')
+    '''
+    key = definition_hash(definition)
+    tables = _compiled.get(key)
+    if tables is None:
+        tables = _compiled[key] = compile_deck(definition)
+    return tables._replace(name=name)
+
+
+def read_definitions(path=None):
+    '''Returns deck definitions of a config file together with the built-in
+    ones (`DECK_DEFINITIONS`), definitions of the file take precedence.'''
+    definitions = dict(DECK_DEFINITIONS)
+    if path is not None:
+        with open(path, encoding="utf-8") as f:
+            config = json.load(f)
+        if not isinstance(config, dict):
+            raise ValueError("'{}' is not a deck config file".format(path))
+        definitions.update(config)
+    return definitions
+
+
+def load_decks(path=None):
+    '''Returns compiled tables (`DeckTables`) of all decks of a config file
+    (and built-in decks) by their names, see `read_definitions` and
+    `deck_tables`.'''
+    return {name: deck_tables(definition, name)
+            for name, definition in read_definitions(path).items()}
+
+
+def load_deck(name, path=None):
+    '''Returns compiled tables of one deck of a config file (or a built-in
+    deck).
+
+    >>> load_deck("spanish21").rank_counts
+    (4, 4, 4, 4, 4, 4, 4, 4, 0, 4, 4, 4, 4)
+
+    Raises
+    ------
+    KeyError
+        When there is no such deck.
+    '''
+    definitions = read_definitions(path)
+    if name not in definitions:
+        raise KeyError("Unknown deck '{}'".format(name))
+    return deck_tables(definitions[name], name)
+
+
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()
+
+    import sys
+    import time
+
+    start = time.perf_counter()
+    decks = load_decks(sys.argv[1] if len(sys.argv) > 1 else None)
+    elapsed = time.perf_counter() - start
+    for deck in decks.values():
+        print("{:<16} {:>3} cards  {}".format(
+            deck.name, len(deck.cards),
+            " ".join("{}:{}".format(rank, count) for rank, count
+                     in zip(RANKS, deck.rank_counts) if count)))
+    print("loaded in {:.2f} ms".format(elapsed * 1000))
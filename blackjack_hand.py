@@ -0,0 +1,88 @@
+'''Hand of compact cards with incrementally maintained value.'''
+
+from blackjack_cards import CARD_VALUE
+
+
+class Hand(list):
+    '''List of compact cards (see module `blackjack_cards`) which keeps its
+    hard total and number of Aces up to date as cards are added. Value of
+    the hand, soft/hard state, bust and blackjack are thus available in
+    constant time.
+
+    Cards should be added and removed only by `append`, `extend`, `pop` and
+    `clear`, other list methods don't update the totals.
+
+    Examples
+    --------
+    >>> hand = Hand([12, 5])      # Ace + 7
+    >>> hand.value, hand.soft
+    (18, True)
+    >>> hand.append(8)            # 10
+    >>> hand.value, hand.soft
+    (18, False)
+    >>> Hand([12, 9]).blackjack   # Ace + Jack
+    True
+    '''
+
+    __slots__ = ('hard', 'aces')
+
+    def __init__(self, cards=()):
+        super().__init__()
+        self.hard = 0
+        self.aces = 0
+        self.extend(cards)
+
+    def append(self, card):
+        list.append(self, card)
+        value = CARD_VALUE[card]
+        self.hard += value
+        if value == 1:
+            self.aces += 1
+
+    def extend(self, cards):
+        for card in cards:
+            self.append(card)
+
+    def __iadd__(self, cards):
+        self.extend(cards)
+        return self
+
+    def pop(self, index=-1):
+        card = list.pop(self, index)
+        value = CARD_VALUE[card]
+        self.hard -= value
+        if value == 1:
+            self.aces -= 1
+        return card
+
+    def clear(self):
+        list.clear(self)
+        self.hard = 0
+        self.aces = 0
+
+    @property
+    def soft(self):
+        '''`True` if an Ace is counted as 11.'''
+        return self.aces > 0 and self.hard <= 11
+
+    @property
+    def value(self):
+        '''Total number of points - see `blackjack.hand_value`.'''
+        if self.aces and self.hard <= 11:
+            return self.hard + 10
+        return self.hard
+
+    @property
+    def busted(self):
+        '''`True` if the hand has more than 21 points.'''
+        return self.hard > 21
+
+    @property
+    def blackjack(self):
+        '''`True` for 21 points with the first two cards.'''
+        return len(self) == 2 and self.aces > 0 and self.hard == 11
+
+
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()
@@ -0,0 +1,209 @@
+'''Hand history stored in an SQLite database.
+
+Rounds (`blackjack_sim.RoundRecord`, e.g. from `blackjack_sim.iter_rounds`)
+are inserted in batches by `executemany` inside one transaction per ingest,
+so ingest is limited by the game engine, not by the database. Columns asked
+about most often - dealer's upcard, player's total and result code - are
+indexed.
+
+Example - every hand where the dealer showed an Ace and the player stood on
+16::
+
+    with HandHistory("history.db") as history:
+        history.ingest(iter_rounds(100000, policy_stand_on(16)))
+        hands = history.query(upcard=ACE, player_total=16)
+'''
+
+import sqlite3
+from itertools import islice
+from blackjack_cards import CARD_RANK
+from blackjack_sim import RoundRecord
+
+# rounds inserted by one executemany call
+BATCH_ROUNDS = 10000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS hands (
+    id INTEGER PRIMARY KEY,
+    run TEXT NOT NULL,
+    round INTEGER NOT NULL,
+    upcard INTEGER NOT NULL,
+    player_cards BLOB NOT NULL,
+    dealer_cards BLOB NOT NULL,
+    player_total INTEGER NOT NULL,
+    dealer_total INTEGER NOT NULL,
+    result TEXT NOT NULL,
+    payout REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS hands_upcard ON hands (upcard);
+CREATE INDEX IF NOT EXISTS hands_player_total ON hands (player_total);
+CREATE INDEX IF NOT EXISTS hands_result ON hands (result);
+"""
+
+INSERT = """
+INSERT INTO hands (run, round, upcard, player_cards, dealer_cards,
+                   player_total, dealer_total, result, payout)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# columns which can be used in `HandHistory.query` filters
+FILTERS = ("run", "upcard", "player_total", "dealer_total", "result")
+
+
+def _row(run, record):
+    return (run, record.number, CARD_RANK[record.dealer_cards[0]],
+            bytes(record.player_cards), bytes(record.dealer_cards),
+            record.player_total, record.dealer_total, record.result,
+            record.payout)
+
+
+def _where(filters):
+    '''Returns WHERE clause and its parameters for column filters.'''
+    conditions = []
+    parameters = []
+    for column, value in filters.items():
+        if column not in FILTERS:
+            raise ValueError("Unknown filter '{}'".format(column))
+        if value is None:
+            continue
+        if isinstance(value, (list, tuple, range)):
+            conditions.append("{} IN ({})".format(
+                column, ", ".join("?" * len(value))))
+            parameters.extend(value)
+        else:
+            conditions.append("{} = ?".format(column))
+            parameters.append(value)
+    if not conditions:
+        return "", parameters
+    return " WHERE " + " AND ".join(conditions), parameters
+
+
+class HandHistory:
+    '''Hand history database.
+
+    Parameters
+    ----------
+    path : `str`, optional
+        Database file. Default ":memory:" - in-memory database.
+
+    Examples
+    --------
+    >>> from blackjack_sim import iter_rounds
+    >>> with HandHistory() as history:
+    ...     history.ingest(iter_rounds(1000))
+    ...     stats = history.summary()
+    1000
+    >>> stats['rounds'] == stats['PW'] + stats['DW'] + stats['SO']
+    True
+    '''
+
+    def __init__(self, path=":memory:"):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        # history can be rebuilt by simulation, speed beats durability
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        self.connection.execute("PRAGMA synchronous = OFF")
+        self.connection.executescript(SCHEMA)
+
+    def ingest(self, records, run="", batch_rounds=BATCH_ROUNDS):
+        '''Inserts rounds into the history in one transaction.
+
+        Parameters
+        ----------
+        records : iterable of `blackjack_sim.RoundRecord`
+            Rounds to be stored - consumed lazily, batch by batch.
+        run : `str`, optional
+            Name of the run the rounds belong to. Default "".
+        batch_rounds : `int`, optional
+            Rounds inserted by one `executemany` call.
+
+        Returns
+        -------
+        `int`
+            Number of inserted rounds.
+        '''
+        records = iter(records)
+        count = 0
+        with self.connection:
+            while True:
+                rows = [_row(run, record)
+                        for record in islice(records, batch_rounds)]
+                if not rows:
+                    break
+                self.connection.executemany(INSERT, rows)
+                count += len(rows)
+        return count
+
+    def query(self, limit=None, **filters):
+        '''Returns stored rounds matching all filters.
+
+        Filters are columns of `FILTERS` with a value or a sequence of
+        allowed values, e.g. ``query(upcard=ACE, player_total=16)`` or
+        ``query(result="PW", player_total=range(12, 17))``.
+
+        Returns
+        -------
+        `list` of `blackjack_sim.RoundRecord`
+        '''
+        where, parameters = _where(filters)
+        sql = ("SELECT round, player_cards, dealer_cards, player_total, "
+               "dealer_total, result, payout FROM hands" + where +
+               " ORDER BY id")
+        if limit is not None:
+            sql += " LIMIT {:d}".format(limit)
+        return [RoundRecord(number, tuple(player), tuple(dealer), *rest)
+                for number, player, dealer, *rest
+                in self.connection.execute(sql, parameters)]
+
+    def summary(self, **filters):
+        '''Returns aggregate results of stored rounds matching the filters
+        (see `query`) - number of rounds, result codes and net payout.'''
+        where, parameters = _where(filters)
+        sql = ("SELECT COUNT(*), "
+               "COALESCE(SUM(result = 'PW'), 0), "
+               "COALESCE(SUM(result = 'DW'), 0), "
+               "COALESCE(SUM(result = 'SO'), 0), "
+               "COALESCE(SUM(payout), 0.0) FROM hands" + where)
+        rounds, pw, dw, so, net = self.connection.execute(
+            sql, parameters).fetchone()
+        return {"rounds": rounds, "PW": pw, "DW": dw, "SO": so, "net": net}
+
+    def by_upcard(self, **filters):
+        '''Returns `summary` of the rounds for every dealer's upcard rank.'''
+        where, parameters = _where(filters)
+        sql = ("SELECT upcard, COUNT(*), SUM(result = 'PW'), "
+               "SUM(result = 'DW'), SUM(result = 'SO'), SUM(payout) "
+               "FROM hands" + where + " GROUP BY upcard ORDER BY upcard")
+        return {upcard: {"rounds": rounds, "PW": pw, "DW": dw, "SO": so,
+                         "net": net}
+                for upcard, rounds, pw, dw, so, net
+                in self.connection.execute(sql, parameters)}
+
+    def __len__(self):
+        return self.connection.execute(
+            "SELECT COUNT(*) FROM hands").fetchone()[0]
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()
+
+    import time
+    from blackjack_sim import iter_rounds
+
+    records = list(iter_rounds(200000))
+    with HandHistory() as history:
+        start = time.perf_counter()
+        history.ingest(records)
+        elapsed = time.perf_counter() - start
+        print("{} rounds ingested in {:.2f} s ({:.0f} rounds/s)".format(
+            len(records), elapsed, len(records) / elapsed))
@@ -0,0 +1,130 @@
+'''Exact probabilities of dealer's final hand.
+
+Dealer plays by the rules of `blackjack.dealer_turn` - draws below 17 points
+and optionally on soft 17. Probabilities are computed exactly by enumerating
+all the ways the dealer can draw from the remaining cards.
+
+Shoe composition is given as a sequence of remaining card counts per rank
+(see `blackjack_cards.RANKS`), e.g. `Shoe.rank_counts`.
+'''
+
+from functools import lru_cache
+from blackjack_cards import RANK_COUNT, RANK_VALUE
+
+# final dealer hands in the order used by `dealer_distribution`
+DEALER_OUTCOMES = (17, 18, 19, 20, 21, "blackjack", "bust")
+BLACKJACK = 5
+BUST = 6
+
+# number of (upcard, composition, rule) combinations kept in cache
+DEALER_CACHE_SIZE = 4096
+
+
+def _finish(counts, hard, ace, first, hit_soft17, memo):
+    '''Distribution of final hands from given dealer state.
+
+    `first` is `True` when the dealer has only his upcard, i.e. the next card
+    completes his first two cards.
+    '''
+    key = (counts, hard, ace, first)
+    result = memo.get(key)
+    if result is not None:
+        return result
+
+    result = [0.0] * len(DEALER_OUTCOMES)
+    total = sum(counts)
+    for rank in range(RANK_COUNT):
+        count = counts[rank]
+        if not count:
+            continue
+        p = count / total
+        new_hard = hard + RANK_VALUE[rank]
+        new_ace = ace or rank == RANK_COUNT - 1
+        soft = new_ace and new_hard <= 11
+        value = new_hard + 10 if soft else new_hard
+
+        if value > 21:
+            result[BUST] += p
+        elif first and value == 21:
+            result[BLACKJACK] += p
+        elif value > 17 or (value == 17 and not (soft and hit_soft17)):
+            result[value - 17] += p
+        else:
+            rest = counts[:rank] + (count - 1,) + counts[rank + 1:]
+            if not sum(rest):
+                raise ValueError("Not enough cards in the shoe for dealer")
+            following = _finish(rest, new_hard, new_ace, False, hit_soft17,
+                                memo)
+            for i, q in enumerate(following):
+                result[i] += p * q
+
+    result = tuple(result)
+    memo[key] = result
+    return result
+
+
+@lru_cache(maxsize=DEALER_CACHE_SIZE)
+def _cached_distribution(upcard, composition, hit_soft17):
+    value = RANK_VALUE[upcard]
+    return _finish(composition, value, value == 1, True, hit_soft17, {})
+
+
+def dealer_distribution(upcard, composition, hit_soft17=False):
+    '''Probabilities of dealer's final hands.
+
+    Parameters
+    ----------
+    upcard : `int`
+        Rank of dealer's upcard (index into `blackjack_cards.RANKS`).
+    composition : sequence of `int`
+        Number of remaining cards of every rank. The upcard is expected to be
+        already removed from the composition.
+    hit_soft17 : `bool`, optional
+        If `True` then dealer draws on soft 17 (see `soft17_draw` of
+        `blackjack.dealer_turn`).
+
+    Returns
+    -------
+    `tuple` of `float`
+        Probabilities of final hands in order of `DEALER_OUTCOMES`.
+
+    Results are cached - repeated queries with the same composition are
+    cheap. See `dealer_cache_info`.
+
+    Examples
+    --------
+    Dealer with a 10 upcard drawing from a shoe of sevens ends on 17.
+
+    >>> sevens = [0] * 13
+    >>> sevens[5] = 4
+    >>> dealer_distribution(8, sevens)
+    (1.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0)
+    '''
+    return _cached_distribution(upcard, tuple(composition), bool(hit_soft17))
+
+
+def dealer_cache_info():
+    '''Statistics of the cache of `dealer_distribution`.'''
+    return _cached_distribution.cache_info()
+
+
+def dealer_cache_clear():
+    '''Clears the cache of `dealer_distribution`.'''
+    _cached_distribution.cache_clear()
+
+
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()
+
+    from blackjack_cards import RANKS
+
+    composition = [4 * 6] * RANK_COUNT
+    print("6 decks, dealer stands on soft 17")
+    print("upcard " + " ".join("{:>9}".format(o) for o in DEALER_OUTCOMES))
+    for upcard in range(RANK_COUNT):
+        composition[upcard] -= 1
+        distribution = dealer_distribution(upcard, composition)
+        composition[upcard] += 1
+        print("{:>6} ".format(RANKS[upcard]) +
+              " ".join("{:9.4f}".format(p) for p in distribution))
@@ -0,0 +1,142 @@
+'''Parallel headless simulation using a pool of processes.
+
+Rounds are split into chunks of fixed size. Every chunk is played with its own
+`Shoe` and its own random generator seeded by the run seed and the chunk
+number, so the chunk results don't depend on which process plays them. Chunk
+results are merged in chunk order - a run with a given seed gives identical
+totals regardless of the number of worker processes.
+'''
+
+import random
+from concurrent.futures import ProcessPoolExecutor
+from blackjack_bank import ShoeBank, BankShoe
+from blackjack_shoe import Shoe
+from blackjack_sim import (simulate, new_results, merge_results,
+                          policy_stand_on)
+
+CHUNK_ROUNDS = 10000
+
+
+def chunk_rng(seed, chunk):
+    '''Returns independent reproducible random generator of one chunk.
+
+    String seeds are hashed by SHA-512 in `random.seed`, so generators of
+    neighbouring chunks are unrelated and the same in every process.
+
+    >>> chunk_rng(1, 2).random() == chunk_rng(1, 2).random()
+    True
+    >>> chunk_rng(1, 2).random() == chunk_rng(1, 3).random()
+    False
+    '''
+    return random.Random("blackjack:{}:{}".format(seed, chunk))
+
+
+def split_rounds(rounds, chunk_rounds=CHUNK_ROUNDS):
+    '''Splits rounds into chunks.
+
+    Returns
+    -------
+    `list` of `tuple`
+        (chunk number, number of rounds in the chunk)
+
+    >>> split_rounds(25, 10)
+    [(0, 10), (1, 10), (2, 5)]
+    '''
+    return [(chunk, min(chunk_rounds, rounds - start))
+            for chunk, start in enumerate(range(0, rounds, chunk_rounds))]
+
+
+def simulate_chunk(seed, chunk, rounds, policy, decks, soft17_draw,
+                   bank=None, chunks=1):
+    '''Plays one chunk of rounds, see `blackjack_sim.simulate`.
+
+    With `bank` (path of a `blackjack_bank` file) the chunk deals shoes
+    `chunk`, `chunk + chunks`, ... of the bank instead of shuffling.
+    '''
+    if bank is None:
+        shoe = Shoe(decks, rng=chunk_rng(seed, chunk))
+        return simulate(rounds, policy, shoe, soft17_draw)
+    with ShoeBank(bank) as shoe_bank:
+        shoe = BankShoe(shoe_bank, chunk, chunks)
+        return simulate(rounds, policy, shoe, soft17_draw)
+
+
+def simulate_parallel(rounds, policy=policy_stand_on(17), decks=6,
+                      soft17_draw=False, seed=0, workers=None,
+                      chunk_rounds=CHUNK_ROUNDS, bank=None):
+    '''Plays given number of headless rounds in worker processes.
+
+    Parameters
+    ----------
+    rounds : `int`
+        Number of rounds to be played.
+    policy : `function`, optional
+        Player policy. It has to be picklable (module level function,
+        `functools.partial`, `blackjack_strategy.Strategy`, ...). Default:
+        draw until 17 points.
+    decks : `int`, optional
+        Number of decks in the shoe of every chunk. Default 6.
+    soft17_draw : `bool`, optional
+        Passed to `blackjack.dealer_turn`.
+    seed : optional
+        Seed of the run. Default 0.
+    workers : `int`, optional
+        Number of worker processes. Default number of CPUs. With 1 worker
+        everything is played in the current process.
+    chunk_rounds : `int`, optional
+        Number of rounds in one chunk. Results depend on it (together with
+        `seed`), not on `workers`.
+    bank : `str`, optional
+        Path of a shoe bank (see `blackjack_bank`). If given, shoes are
+        dealt from the bank (its number of decks is used) instead of being
+        shuffled, and results depend on the bank instead of `seed`.
+
+    Returns
+    -------
+    `dict`
+        Aggregate results, see `blackjack_sim.new_results`.
+
+    Examples
+    --------
+    >>> a = simulate_parallel(300, seed=7, workers=1, chunk_rounds=100)
+    >>> b = simulate_parallel(300, seed=7, workers=2, chunk_rounds=100)
+    >>> a == b
+    True
+    '''
+    chunks = split_rounds(rounds, chunk_rounds)
+    arguments = ([seed] * len(chunks),
+                 [chunk for chunk, size in chunks],
+                 [size for chunk, size in chunks],
+                 [policy] * len(chunks),
+                 [decks] * len(chunks),
+                 [soft17_draw] * len(chunks),
+                 [bank] * len(chunks),
+                 [len(chunks)] * len(chunks))
+
+    results = new_results()
+    if workers == 1:
+        for chunk_results in map(simulate_chunk, *arguments):
+            merge_results(results, chunk_results)
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            # map returns results in order of chunks
+            for chunk_results in pool.map(simulate_chunk, *arguments):
+                merge_results(results, chunk_results)
+
+    return results
+
+
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()
+
+    import time
+
+    rounds = 400000
+    start = time.perf_counter()
+    results = simulate_parallel(rounds)
+    elapsed = time.perf_counter() - start
+
+    print(results)
+    print("{} rounds in {:.2f} s ({:.0f} rounds/s)".format(
+        rounds, elapsed, rounds / elapsed))
@@ -0,0 +1,127 @@
+'''Instrumentation of game phases and profiling of simulations.
+
+Probes measure number of calls and time spent in named phases of a round
+(see `PHASES`). Probes are disabled by default. Instrumented code checks
+`enabled` only once per run (e.g. `blackjack_sim.simulate` passes the probe
+hook `record` to the round or `None`), so disabled probes cost only a check
+of the missing hook per phase.
+
+Examples
+--------
+>>> import blackjack_probe
+>>> from blackjack_sim import simulate
+>>> blackjack_probe.reset()
+>>> blackjack_probe.enable()
+>>> results = simulate(100)
+>>> blackjack_probe.disable()
+>>> blackjack_probe.stats()['deal']['calls']
+100
+'''
+
+import cProfile
+import pstats
+import time
+
+PHASES = ("deal", "player_turn", "dealer_turn", "resolve")
+
+enabled = False
+
+clock = time.perf_counter
+
+_calls = dict.fromkeys(PHASES, 0)
+_times = dict.fromkeys(PHASES, 0.0)
+
+
+def enable():
+    '''Enables probes.'''
+    global enabled
+    enabled = True
+
+
+def disable():
+    '''Disables probes. Collected statistics are kept.'''
+    global enabled
+    enabled = False
+
+
+def reset():
+    '''Clears collected statistics.'''
+    for phase in PHASES:
+        _calls[phase] = 0
+        _times[phase] = 0.0
+
+
+def record(phase, start):
+    '''Records one call of a phase started at `start` (value of `clock`).
+
+    Returns
+    -------
+    `float`
+        Current time - start of the following phase.
+    '''
+    now = clock()
+    _calls[phase] += 1
+    _times[phase] += now - start
+    return now
+
+
+def stats():
+    '''Returns collected statistics.
+
+    Returns
+    -------
+    `dict`
+        For every phase number of calls, total time in seconds and mean
+        time of one call in microseconds.
+    '''
+    return {phase: {"calls": _calls[phase],
+                    "total_s": _times[phase],
+                    "mean_us": _times[phase] / _calls[phase] * 1e6
+                    if _calls[phase] else 0.0}
+            for phase in PHASES}
+
+
+def profile(function, *args, path=None, **kwargs):
+    '''Runs function under `cProfile`.
+
+    Parameters
+    ----------
+    function : `function`
+        Profiled function (e.g. `blackjack_sim.simulate`) called with `args`
+        and `kwargs`.
+    path : `str`, optional
+        If given, raw profile is saved there (readable by `pstats`,
+        `snakeviz`, ...).
+
+    Returns
+    -------
+    result
+        Return value of the function.
+    `pstats.Stats`
+        Collected profile.
+    '''
+    profiler = cProfile.Profile()
+    result = profiler.runcall(function, *args, **kwargs)
+    if path is not None:
+        profiler.dump_stats(path)
+    return result, pstats.Stats(profiler)
+
+
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()
+
+    # simulator uses module `blackjack_probe`, not this `__main__`
+    import blackjack_probe
+    from blackjack_sim import simulate
+
+    blackjack_probe.reset()
+    blackjack_probe.enable()
+    simulate(100000)
+    blackjack_probe.disable()
+    for phase, phase_stats in blackjack_probe.stats().items():
+        print("{:<12} {calls:>8} calls {total_s:8.3f} s {mean_us:8.3f} us"
+              .format(phase, **phase_stats))
+
+    result, profile_stats = profile(simulate, 100000)
+    profile_stats.sort_stats("tottime").print_stats(10)
@@ -0,0 +1,181 @@
+'''Binary hand records of simulated rounds.
+
+Every round is stored as one fixed-width record (see `RECORD`). Records are
+collected in a buffer and appended to the file in large chunks, so memory
+use doesn't grow with the length of a run. The file starts with a short
+header followed by records only - readers can map it as a NumPy structured
+array without copying (see `read_records`).
+'''
+
+import os
+import struct
+from blackjack import hand_value
+from blackjack_batch import RESULT_CODES
+
+try:
+    import numpy as np
+except ImportError:     # pragma: no cover - depends on environment
+    np = None
+
+FILE_MAGIC = b"BJHR"
+FILE_VERSION = 2
+FILE_HEADER = struct.Struct("<4sHH8x")   # magic, version, record size
+
+# maximum number of cards of one hand stored in a record
+MAX_CARDS = 12
+# padding of unused card slots
+NO_CARD = 0xFF
+
+# seed, round, payout, player cards count, dealer cards count,
+# player total, dealer total, result code, player cards, dealer cards - the
+# payout is a double, so payouts like 1.2 (6:5) are read back exactly
+RECORD = struct.Struct("<QQdBBBBB{0}s{0}s".format(MAX_CARDS))
+
+if np is not None:
+    RECORD_DTYPE = np.dtype([
+        ("seed", "<u8"), ("round", "<u8"), ("payout", "<f8"),
+        ("player_count", "u1"), ("dealer_count", "u1"),
+        ("player_total", "u1"), ("dealer_total", "u1"), ("result", "u1"),
+        ("player_cards", "u1", (MAX_CARDS,)),
+        ("dealer_cards", "u1", (MAX_CARDS,))])
+    assert RECORD_DTYPE.itemsize == RECORD.size
+
+# number of records kept in memory before they are written to the file
+CHUNK_RECORDS = 65536
+
+
+def _cards_field(hand):
+    if len(hand) > MAX_CARDS:
+        raise ValueError("Hand with {} cards doesn't fit into a record"
+                         .format(len(hand)))
+    return bytes(hand) + bytes([NO_CARD]) * (MAX_CARDS - len(hand))
+
+
+class HandRecordWriter:
+    '''Appends hand records to a file.
+
+    Parameters
+    ----------
+    path : `str`
+        File with records. New file is created, records are appended to an
+        existing one.
+    seed : `int`, optional
+        Seed stored in every record - identification of the run (or of a
+        chunk of a run) the rounds come from. Default 0.
+    chunk_records : `int`, optional
+        Number of records written at once.
+
+    Writer should be closed (or used as a context manager) to write the last
+    chunk.
+    '''
+
+    def __init__(self, path, seed=0, chunk_records=CHUNK_RECORDS):
+        self.path = path
+        self.seed = seed
+        self.buffer = bytearray(RECORD.size * chunk_records)
+        self.chunk_records = chunk_records
+        self.buffered = 0
+
+        self.file = open(path, "ab")
+        if self.file.tell() == 0:
+            self.file.write(FILE_HEADER.pack(FILE_MAGIC, FILE_VERSION,
+                                             RECORD.size))
+            self.round = 0
+        else:
+            self.round = _check_header(path)
+
+    def write(self, player_hand, dealer_hand, result, payout):
+        '''Adds one round.
+
+        Parameters
+        ----------
+        player_hand, dealer_hand : sequence of compact cards
+            Final hands of the round.
+        result : `str`
+            Result code of `blackjack.resolve_game`.
+        payout : `float`
+            Amount won (negative if lost) by the player betting one unit.
+        '''
+        RECORD.pack_into(self.buffer, self.buffered * RECORD.size,
+                         self.seed, self.round, payout,
+                         len(player_hand), len(dealer_hand),
+                         hand_value(player_hand), hand_value(dealer_hand),
+                         RESULT_CODES.index(result),
+                         _cards_field(player_hand), _cards_field(dealer_hand))
+        self.round += 1
+        self.buffered += 1
+        if self.buffered == self.chunk_records:
+            self.flush()
+
+    def flush(self):
+        '''Writes buffered records to the file.'''
+        if self.buffered:
+            self.file.write(memoryview(self.buffer)[:self.buffered *
+                                                    RECORD.size])
+            self.buffered = 0
+        self.file.flush()
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _check_header(path):
+    '''Checks file header and returns number of records in the file.'''
+    with open(path, "rb") as f:
+        header = f.read(FILE_HEADER.size)
+    try:
+        magic, version, record_size = FILE_HEADER.unpack(header)
+    except struct.error:
+        raise ValueError("'{}' is not a hand record file".format(path))
+    if magic != FILE_MAGIC or version != FILE_VERSION or \
+            record_size != RECORD.size:
+        raise ValueError("'{}' is not a hand record file".format(path))
+    return (os.path.getsize(path) - FILE_HEADER.size) // RECORD.size
+
+
+def read_records(path):
+    '''Maps record file as a read-only NumPy structured array (zero copy).
+
+    Fields of the array are described by `RECORD_DTYPE`. Requires NumPy, see
+    `iter_records` for plain Python reading.
+    '''
+    count = _check_header(path)
+    return np.memmap(path, dtype=RECORD_DTYPE, mode="r",
+                     offset=FILE_HEADER.size, shape=(count,))
+
+
+def iter_records(path):
+    '''Yields records of a file one by one as dictionaries.
+
+    Cards are returned as `bytes` of compact cards (see `blackjack_cards`)
+    without padding.
+    '''
+    _check_header(path)
+    with open(path, "rb") as f:
+        f.seek(FILE_HEADER.size)
+        while True:
+            chunk = f.read(RECORD.size * CHUNK_RECORDS)
+            if len(chunk) < RECORD.size:
+                break
+            chunk = chunk[:len(chunk) - len(chunk) % RECORD.size]
+            for (seed, round, payout, player_count, dealer_count,
+                 player_total, dealer_total, result, player_cards,
+                 dealer_cards) in RECORD.iter_unpack(chunk):
+                yield {"seed": seed, "round": round, "payout": payout,
+                       "player_total": player_total,
+                       "dealer_total": dealer_total,
+                       "result": RESULT_CODES[result],
+                       "player_cards": player_cards[:player_count],
+                       "dealer_cards": dealer_cards[:dealer_count]}
+
+
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()
@@ -0,0 +1,100 @@
+'''Recording and fast replay of game sessions.
+
+A session is the list of answers a player gave during `blackjack.play_session`.
+Sessions are stored in a session file, one JSON line per session (see
+`blackjack_cli.save_sessions`). A recorded session holds the seed of its
+shoe together with the answers, so its replay deals the same cards. Replay
+feeds the answers back through `blackjack_cli.ScriptedInput` instead of the
+terminal, with output buffered or discarded, so thousands of sessions are
+replayed per second.
+
+Usage: python blackjack_replay.py record FILE [--decks DECKS] [--seed SEED]
+       python blackjack_replay.py replay FILE [--decks DECKS] [--seed SEED]
+'''
+
+import random
+import time
+from blackjack import play_session
+from blackjack_cli import (io_session, ScriptedInput, RecordingInput,
+                           discard_output, load_sessions, save_sessions)
+from blackjack_shoe import Shoe
+
+
+def record_session(path, decks=6, source=input, sink=None, seed=None):
+    '''Plays a session (in the terminal by default) and appends player's
+    answers with the seed of the shoe to a session file. Default seed
+    `None` - a random one.'''
+    if seed is None:
+        seed = random.randrange(2 ** 32)
+    recorder = RecordingInput(source)
+    try:
+        with io_session(recorder, sink):
+            play_session(Shoe(decks, rng=random.Random(seed)))
+    finally:
+        save_sessions(path, [{"seed": seed, "answers": recorder.answers}])
+
+
+def replay_sessions(sessions, decks=6, sink=discard_output, seed=None):
+    '''Replays sessions.
+
+    Parameters
+    ----------
+    sessions : `list` or `str`
+        Sessions (answers or objects with the answers and the seed, see
+        `blackjack_cli.load_sessions`) or path of a session file.
+    decks : `int`, optional
+        Number of decks of the shoe used by each session. Default 6.
+    sink : `function`, optional
+        Output sink of the sessions, e.g. `blackjack_cli.BufferedOutput`.
+        Default `blackjack_cli.discard_output`.
+    seed : optional
+        Seed of shuffling of sessions without a recorded seed. Every such
+        session gets its own reproducible shoe. Default `None` - random
+        shoes. Recorded sessions are always replayed with their own seed.
+
+    Returns
+    -------
+    `dict`
+        Number of replayed sessions, number of sessions which ran out of
+        answers before the end and elapsed time.
+    '''
+    if isinstance(sessions, str):
+        sessions = load_sessions(sessions)
+
+    incomplete = 0
+    start = time.perf_counter()
+    for number, answers in enumerate(sessions):
+        if isinstance(answers, dict):
+            rng = random.Random(answers["seed"])
+            answers = answers["answers"]
+        elif seed is None:
+            rng = random
+        else:
+            rng = random.Random("{}:{}".format(seed, number))
+        with io_session(ScriptedInput(answers), sink):
+            try:
+                play_session(Shoe(decks, rng=rng))
+            except EOFError:
+                incomplete += 1
+    elapsed = time.perf_counter() - start
+
+    return {"sessions": len(sessions), "incomplete": incomplete,
+            "elapsed_s": elapsed}
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("command", choices=("record", "replay"))
+    parser.add_argument("file")
+    parser.add_argument("--decks", type=int, default=6)
+    parser.add_argument("--seed")
+    args = parser.parse_args()
+
+    if args.command == "record":
+        record_session(args.file, args.decks, seed=args.seed)
+    else:
+        result = replay_sessions(args.file, args.decks, seed=args.seed)
+        print("{sessions} sessions ({incomplete} incomplete) replayed in "
+              "{elapsed_s:.2f} s".format(**result))
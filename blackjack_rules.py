@@ -0,0 +1,269 @@
+'''Table rules compiled into lookup tables.
+
+A `RuleSet` gathers the rules which differ between casinos - number of decks,
+dealer hitting soft 17, blackjack payout, doubling, splitting, surrender and
+penetration of the shoe. The rules are compiled once into tables, so the
+decisions in the hot loop of a simulation are simple table lookups:
+
+* dealer draw table - indexed by hand key (see `hand_key`),
+* settlement table - indexed by player's and dealer's final states, holds the
+  result code (see `blackjack.resolve_game`) and the payout,
+* double table - indexed by hand key,
+* surrender is decided by `RuleSet.can_surrender` from the option and the
+  dealer's final state (looked up in the states table).
+'''
+
+import random
+from blackjack_cards import CARD_VALUE
+from blackjack_shoe import Shoe
+
+# hard totals in tables indexed by hand key - the highest hard total of a
+# hand is 30 (20 + 10)
+HARD_TOTALS = 32
+
+# final state of a hand - value 0-21, bust or natural blackjack
+BUST = 22
+BLACKJACK = 23
+STATES = 24
+
+# payout of a surrendered hand - half of the bet is lost
+SURRENDER_PAYOUT = -0.5
+
+DOUBLE_OPTIONS = ("any", "9-11", "10-11", "none")
+SURRENDER_OPTIONS = ("none", "late", "early")
+
+
+def hand_key(hand):
+    '''Returns index of a `blackjack_hand.Hand` in tables of a `RuleSet` -
+    its hard total, moved by `HARD_TOTALS` if the hand has an Ace. Unlike the
+    value and the soft flag of the hand, the key is read from the hand
+    without any computation. Only hands reachable in a game (hard total at
+    most 30) have a key.
+
+    >>> from blackjack_hand import Hand
+    >>> hand_key(Hand([8, 7])), hand_key(Hand([12, 5]))
+    (19, 40)
+    '''
+    return hand.hard + HARD_TOTALS if hand.aces else hand.hard
+
+
+def _key_value(key):
+    '''Returns value and soft flag of a hand key.'''
+    hard, ace = key % HARD_TOTALS, key >= HARD_TOTALS
+    soft = ace and hard <= 11
+    return (hard + 10 if soft else hard), soft
+
+
+def hand_state(hand):
+    '''Returns final state of a `blackjack_hand.Hand` - its value, `BUST` or
+    `BLACKJACK`.
+
+    >>> from blackjack_hand import Hand
+    >>> hand_state(Hand([12, 9])), hand_state(Hand([8, 8, 8]))
+    (23, 22)
+    '''
+    if hand.blackjack:
+        return BLACKJACK
+    value = hand.value
+    return BUST if value > 21 else value
+
+
+class RuleSet:
+    '''Rules of a blackjack table.
+
+    Parameters
+    ----------
+    decks : `int`, optional
+        Number of decks in the shoe. Default 6.
+    hit_soft17 : `bool`, optional
+        Dealer draws on soft 17 (H17) instead of standing (S17). Default
+        `False`.
+    blackjack_payout : `float`, optional
+        Payout of player's natural blackjack. Default 1.5 (3:2).
+    double : `str`, optional
+        Hands which may be doubled - "any" two cards, hard "9-11", hard
+        "10-11" or "none". Default "any".
+    double_after_split : `bool`, optional
+        Doubling is allowed after split. Default `True`.
+    max_hands : `int`, optional
+        Maximum number of hands made by splitting (1 - no split). Default 4.
+    resplit_aces : `bool`, optional
+        Split Aces may be split again. Default `False`.
+    surrender : `str`, optional
+        "none", "late" (after dealer checked for blackjack) or "early".
+        Default "none".
+    penetration : `float`, optional
+        Fraction of the shoe dealt before reshuffle. Default 0.75.
+    deck : `blackjack_decks.DeckTables`, optional
+        Cards of one deck of the shoe (e.g. Spanish 21). Default all 52.
+
+    Examples
+    --------
+    >>> rules = RuleSet(hit_soft17=True, blackjack_payout=1.2)
+    >>> rules
+    RuleSet(6D H17 6:5 DA DAS SP4)
+    >>> rules.settlement[BLACKJACK * STATES + 20]
+    ('PW', 1.2)
+    '''
+
+    def __init__(self, decks=6, hit_soft17=False, blackjack_payout=1.5,
+                 double="any", double_after_split=True, max_hands=4,
+                 resplit_aces=False, surrender="none", penetration=0.75,
+                 deck=None):
+        if double not in DOUBLE_OPTIONS:
+            raise ValueError("Double has to be one of {}"
+                             .format(DOUBLE_OPTIONS))
+        if surrender not in SURRENDER_OPTIONS:
+            raise ValueError("Surrender has to be one of {}"
+                             .format(SURRENDER_OPTIONS))
+        if max_hands < 1:
+            raise ValueError("Maximum number of hands has to be positive")
+        if blackjack_payout <= 0:
+            raise ValueError("Blackjack payout has to be positive")
+        if not 0 < penetration <= 1:
+            raise ValueError("Penetration has to be between 0 and 1")
+
+        self.decks = decks
+        self.hit_soft17 = hit_soft17
+        self.blackjack_payout = blackjack_payout
+        self.double = double
+        self.double_after_split = double_after_split
+        self.max_hands = max_hands
+        self.resplit_aces = resplit_aces
+        self.surrender = surrender
+        self.penetration = penetration
+        self.deck = deck
+        self.compile()
+
+    def compile(self):
+        '''Builds lookup tables from the rules. Has to be called again when
+        a rule is changed.'''
+        keys = [_key_value(key) for key in range(2 * HARD_TOTALS)]
+
+        self.dealer_draw = bytes(
+            value < 17 or (value == 17 and soft and self.hit_soft17)
+            for value, soft in keys)
+
+        self.double_allowed = bytes(
+            self._double_allowed(soft, value) for value, soft in keys)
+
+        # final state of a hand (except blackjack) by hand key
+        self.states = bytes(BUST if value > 21 else value
+                            for value, soft in keys)
+
+        self.settlement = tuple(
+            self._settle_states(player, dealer)
+            for player in range(STATES) for dealer in range(STATES))
+
+    def _double_allowed(self, soft, value):
+        if self.double == "any":
+            return value <= 21
+        if soft or self.double == "none":
+            return False
+        low = 9 if self.double == "9-11" else 10
+        return low <= value <= 11
+
+    def _settle_states(self, player, dealer):
+        '''Result code and payout of final states - the same rules as
+        `blackjack.resolve_game`.'''
+        if player == BUST:
+            return ("DW", -1)
+        # blackjack is paid even if the dealer busted afterwards
+        if player == BLACKJACK and dealer != BLACKJACK:
+            return ("PW", self.blackjack_payout)
+        if dealer == BUST:
+            return ("PW", 1)
+        if dealer == BLACKJACK and player != BLACKJACK:
+            return ("DW", -1)
+        if player > dealer:
+            return ("PW", 1)
+        if dealer > player:
+            return ("DW", -1)
+        return ("SO", 0)
+
+    def new_shoe(self, rng=random):
+        '''Returns a new `blackjack_shoe.Shoe` following the rules.'''
+        return Shoe(self.decks, self.penetration, rng=rng, deck=self.deck)
+
+    def dealer_play(self, hand, deck):
+        '''Draws cards to dealer's `blackjack_hand.Hand` from the deck
+        according to the dealer draw table.'''
+        draw = self.dealer_draw
+        while draw[hand.hard + HARD_TOTALS if hand.aces else hand.hard]:
+            hand.append(deck.pop())
+
+    def settle(self, player_hand, dealer_hand):
+        '''Returns result code and payout (betting one unit) of final hands.
+
+        >>> from blackjack_hand import Hand
+        >>> RuleSet().settle(Hand([12, 9]), Hand([8, 7]))
+        ('PW', 1.5)
+        '''
+        states = self.states
+        player = states[hand_key(player_hand)]
+        if player == 21 and len(player_hand) == 2:
+            player = BLACKJACK
+        dealer = states[hand_key(dealer_hand)]
+        if dealer == 21 and len(dealer_hand) == 2:
+            dealer = BLACKJACK
+        return self.settlement[player * STATES + dealer]
+
+    def can_double(self, hand, split=False):
+        '''`True` if the two-card hand may be doubled.'''
+        if len(hand) != 2 or (split and not self.double_after_split):
+            return False
+        return bool(self.double_allowed[hand_key(hand)])
+
+    def can_surrender(self, hand, dealer_hand, split=False):
+        '''`True` if the player may surrender the two-card hand (giving up
+        half of the bet). Late surrender is offered only after the dealer
+        checked for blackjack, i.e. not when he has one.
+
+        >>> from blackjack_hand import Hand
+        >>> rules = RuleSet(surrender="late")
+        >>> rules.can_surrender(Hand([8, 6]), Hand([8, 7]))
+        True
+        >>> rules.can_surrender(Hand([8, 6]), Hand([12, 9]))
+        False
+        '''
+        if self.surrender == "none" or len(hand) != 2 or split:
+            return False
+        if self.surrender == "late":
+            return not (len(dealer_hand) == 2 and
+                        self.states[hand_key(dealer_hand)] == 21)
+        return True
+
+    def can_split(self, hand, hands=1, aces=False):
+        '''`True` if the pair may be split, having `hands` hands already
+        (`aces` - hands made by splitting Aces).'''
+        if len(hand) != 2 or hands >= self.max_hands:
+            return False
+        if aces and not self.resplit_aces:
+            return False
+        return CARD_VALUE[hand[0]] == CARD_VALUE[hand[1]]
+
+    def __repr__(self):
+        payout = {1.5: "3:2", 1.2: "6:5", 1: "1:1", 2: "2:1"}.get(
+            self.blackjack_payout, str(self.blackjack_payout))
+        codes = ["{}D".format(self.decks)]
+        if self.deck is not None:
+            codes.append(self.deck.name)
+        codes += ["H17" if self.hit_soft17 else "S17", payout]
+        if self.double != "none":
+            codes.append("D" + ("A" if self.double == "any" else self.double))
+        if self.double_after_split:
+            codes.append("DAS")
+        if self.max_hands > 1:
+            codes.append("SP{}".format(self.max_hands))
+        if self.resplit_aces:
+            codes.append("RSA")
+        if self.surrender != "none":
+            codes.append(self.surrender[0].upper() + "S")
+        if self.penetration != 0.75:
+            codes.append("PEN{:g}".format(self.penetration))
+        return "RuleSet({})".format(" ".join(codes))
+
+
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()
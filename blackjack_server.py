@@ -0,0 +1,224 @@
+'''Asyncio server hosting many blackjack tables at once.
+
+Every connection is one table - one player against the dealer with its own
+shoe. The game is the same as in `blackjack.play_game`, only the questions
+are asked over the connection instead of by blocking `input()`, so a slow
+player never stalls other tables.
+
+Line protocol (UTF-8, one message per line):
+
+* server sends ``> text`` lines with information for the player,
+* server sends ``? prompt`` line when it waits for an answer,
+* client answers with exactly one line, e.g. ``yes``.
+
+Answers are validated the same way as by `blackjack_cli.user_choice`.
+
+Usage: python blackjack_server.py [--host HOST] [--port PORT] [--unix PATH]
+       python blackjack_server.py --load-test TABLES [--games GAMES]
+'''
+
+import asyncio
+import re
+import time
+from blackjack import (NEW_GAME_PROMPT, DRAW_PROMPT, draw_card, hand_value,
+                       hand_status, dealer_turn, resolve_game)
+from blackjack_cli import (_prepare_options_dictionary, match_option,
+                           INCORRECT_CHOICE)
+from blackjack_hand import Hand
+from blackjack_shoe import Shoe
+
+HOST = "127.0.0.1"
+PORT = 8021
+
+# queue of not yet accepted connections - many tables connect at once
+BACKLOG = 4096
+
+# seconds without an answer before a table is closed
+IDLE_TIMEOUT = 300
+
+INFO = "> "
+PROMPT = "? "
+
+
+def send(writer, message):
+    '''Queues an information line for the player.'''
+    writer.write((INFO + message + "\n").encode())
+
+
+async def ask_choice(reader, writer, options=[("y", "yes"), ("n", "no")],
+                     prompt="", case_sensitive=False):
+    '''Non-blocking counterpart of `blackjack_cli.user_choice`.
+
+    Raises
+    ------
+    ConnectionError
+        When the player disconnects.
+    asyncio.TimeoutError
+        When the player doesn't answer in `IDLE_TIMEOUT` seconds.
+    '''
+    options = _prepare_options_dictionary(options, case_sensitive)
+
+    while True:
+        writer.write((PROMPT + prompt + "\n").encode())
+        await writer.drain()
+
+        line = await asyncio.wait_for(reader.readline(), IDLE_TIMEOUT)
+        if not line:
+            raise ConnectionError("Player has left the table")
+        raw_input = line.decode(errors="replace").strip()
+        if not case_sensitive:
+            raw_input = raw_input.lower()
+
+        choice = match_option(raw_input, options)
+        if choice is not None:
+            return choice
+        send(writer, INCORRECT_CHOICE)
+
+
+async def play_table_game(reader, writer, shoe):
+    '''Plays a single round of blackjack at a table, see
+    `blackjack.play_game`.'''
+    if shoe.new_round():
+        send(writer, "The shoe has been reshuffled.")
+
+    player = {"name": "Player", "role": "player", "hand": Hand()}
+    dealer = {"name": "Anonymous Dealer", "role": "dealer", "hand": Hand()}
+
+    for i in range(0, 2):
+        for gambler in (player, dealer):
+            gambler['hand'].append(draw_card(shoe))
+
+    send(writer, hand_status(player))
+    while hand_value(player['hand']) < 21:
+        if await ask_choice(reader, writer, prompt=DRAW_PROMPT) == "n":
+            break
+        player['hand'].append(draw_card(shoe))
+        send(writer, hand_status(player))
+
+    dealer_turn(dealer, shoe)
+
+    send(writer, "** GAME RESULTS **")
+    send(writer, hand_status(dealer))
+    send(writer, hand_status(player))
+    send(writer, resolve_game(player, dealer)[1])
+
+
+async def serve_table(reader, writer, decks=6):
+    '''Serves one connection - one table - until the player leaves.'''
+    shoe = Shoe(decks)
+    try:
+        while await ask_choice(reader, writer,
+                               prompt=NEW_GAME_PROMPT) == "y":
+            send(writer, "This is a new game - enjoy it.")
+            await play_table_game(reader, writer, shoe)
+        send(writer, "Thanks for the game(s), see you soon.")
+        await writer.drain()
+    except (ConnectionError, asyncio.TimeoutError, ValueError):
+        # ValueError - line longer than the reader's limit
+        pass
+    finally:
+        writer.close()
+
+
+async def start_server(host=HOST, port=PORT, path=None, decks=6):
+    '''Starts server on TCP `host`:`port` or on Unix socket `path`.
+
+    Returns
+    -------
+    `asyncio.Server`
+    '''
+    def handler(reader, writer):
+        return serve_table(reader, writer, decks)
+
+    if path is not None:
+        return await asyncio.start_unix_server(handler, path,
+                                               backlog=BACKLOG)
+    return await asyncio.start_server(handler, host, port, backlog=BACKLOG)
+
+
+# points of player's hand in `blackjack.hand_status` message
+PLAYER_POINTS = re.compile(r"^You have .* makes a (\d+)-point hand\.$")
+
+
+async def bot_player(reader, writer, games=10, stand_on=17):
+    '''Stand-in for a human player used for load testing.
+
+    Plays given number of games drawing cards until `stand_on` points.
+
+    Returns
+    -------
+    `int`
+        Number of games played.
+    '''
+    played = 0
+    points = 0
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            line = line.decode().rstrip("\n")
+            if line.startswith(INFO):
+                match = PLAYER_POINTS.match(line[len(INFO):])
+                if match:
+                    points = int(match.group(1))
+            elif line.startswith(PROMPT):
+                if line[len(PROMPT):] == NEW_GAME_PROMPT:
+                    answer = "yes" if played < games else "no"
+                    played += answer == "yes"
+                else:
+                    answer = "yes" if points < stand_on else "no"
+                writer.write((answer + "\n").encode())
+                await writer.drain()
+    finally:
+        writer.close()
+    return played
+
+
+async def load_test(tables=100, games=10, host=HOST, port=PORT, path=None):
+    '''Plays games at many tables concurrently by bot players.
+
+    Returns
+    -------
+    `dict`
+        Number of tables, games played and elapsed time.
+    '''
+    async def table():
+        if path is not None:
+            reader, writer = await asyncio.open_unix_connection(path)
+        else:
+            reader, writer = await asyncio.open_connection(host, port)
+        return await bot_player(reader, writer, games)
+
+    start = time.perf_counter()
+    played = await asyncio.gather(*(table() for i in range(tables)))
+    elapsed = time.perf_counter() - start
+    return {"tables": tables, "games": sum(played), "elapsed_s": elapsed}
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--unix", metavar="PATH")
+    parser.add_argument("--decks", type=int, default=6)
+    parser.add_argument("--load-test", type=int, metavar="TABLES",
+                        help="run local server and play at TABLES tables")
+    parser.add_argument("--games", type=int, default=10)
+    args = parser.parse_args()
+
+    async def main():
+        server = await start_server(args.host, args.port, args.unix,
+                                    args.decks)
+        async with server:
+            if args.load_test:
+                result = await load_test(args.load_test, args.games,
+                                         args.host, args.port, args.unix)
+                print("{games} games at {tables} tables in {elapsed_s:.2f} s"
+                      .format(**result))
+            else:
+                await server.serve_forever()
+
+    asyncio.run(main())
@@ -0,0 +1,181 @@
+'''Multi-deck shoe dealing compact cards across many games.'''
+
+import random
+from blackjack_cards import CARD_RANK, RANK_COUNT, new_deck
+
+MIN_DECKS = 1
+MAX_DECKS = 8
+
+
+class Shoe:
+    '''Shoe of 1-8 decks of compact cards (see module `blackjack_cards`).
+
+    Cards are dealt from the shoe across many games. The shoe is reshuffled
+    only when a game starts after the cut card has been reached. Cut card is
+    placed according to `penetration` - fraction of the shoe dealt before
+    reshuffle - or directly by `cut_card` position.
+
+    Shoe can be used everywhere a deck is expected - cards are drawn by
+    `pop` just like from a list (see `blackjack.draw_card`).
+
+    Parameters
+    ----------
+    decks : `int`, optional
+        Number of decks in the shoe (1-8). Default 6.
+    penetration : `float`, optional
+        Fraction of cards dealt before reshuffle. Default 0.75.
+    cut_card : `int`, optional
+        Number of cards dealt before reshuffle. Overrides `penetration`.
+    rng : `random.Random`, optional
+        Source of randomness used for shuffling. Default module `random`.
+    deck : `blackjack_decks.DeckTables`, optional
+        Cards of one deck (e.g. Spanish 21 deck without 10s). Default all 52
+        cards.
+
+    Examples
+    --------
+    >>> shoe = Shoe(decks=2, cut_card=80)
+    >>> shoe.remaining
+    104
+    >>> card = shoe.pop()
+    >>> shoe.remaining, sum(shoe.rank_counts)
+    (103, 103)
+    '''
+
+    def __init__(self, decks=6, penetration=0.75, cut_card=None, rng=random,
+                 deck=None):
+        if not MIN_DECKS <= decks <= MAX_DECKS:
+            raise ValueError("Number of decks has to be between {} and {}"
+                             .format(MIN_DECKS, MAX_DECKS))
+
+        self.decks = decks
+        if deck is None:
+            self.cards = new_deck(decks)
+            self.full_counts = (4 * decks,) * RANK_COUNT
+        else:
+            self.cards = bytearray(deck.cards) * decks
+            self.full_counts = tuple(count * decks
+                                     for count in deck.rank_counts)
+        self.deck_size = len(self.cards) // decks
+        if cut_card is None:
+            cut_card = int(len(self.cards) * penetration)
+        if not 0 < cut_card <= len(self.cards):
+            raise ValueError("Cut card has to be inside the shoe")
+        self.cut_card = cut_card
+        self.rng = rng
+        self.shuffles = 0
+        self.shuffle()
+
+    def shuffle(self):
+        '''Returns all cards to the shoe and shuffles them.'''
+        self.rng.shuffle(self.cards)
+        self.position = 0
+        self.rank_counts = list(self.full_counts)
+        self.shuffles += 1
+
+    def new_round(self):
+        '''Prepares shoe for a new game - reshuffles it if the cut card has
+        been reached.
+
+        Returns
+        -------
+        `bool`
+            `True` if the shoe has been reshuffled.
+        '''
+        if self.position >= self.cut_card:
+            self.shuffle()
+            return True
+        return False
+
+    def pop(self):
+        '''Deals the next card.
+
+        In the rare case when the whole shoe is dealt out during a game,
+        the shoe is reshuffled (including cards still in players' hands).
+        '''
+        if self.position >= len(self.cards):
+            self.shuffle()
+        card = self.cards[self.position]
+        self.position += 1
+        self.rank_counts[CARD_RANK[card]] -= 1
+        return card
+
+    def deal(self, count):
+        '''Deals `count` next cards at once (in the order of `pop`).'''
+        if self.position + count > len(self.cards):
+            return [self.pop() for i in range(count)]
+        cards = self.cards[self.position:self.position + count]
+        self.position += count
+        rank_counts = self.rank_counts
+        for card in cards:
+            rank_counts[CARD_RANK[card]] -= 1
+        return cards
+
+    def __len__(self):
+        return len(self.cards) - self.position
+
+    @property
+    def remaining(self):
+        '''Number of cards not dealt yet.'''
+        return len(self.cards) - self.position
+
+    @property
+    def cut_card_reached(self):
+        '''`True` if the shoe will be reshuffled before next game.'''
+        return self.position >= self.cut_card
+
+
+class LazyDeck:
+    '''Deck shuffled lazily - card by card as they are drawn.
+
+    Every `pop` makes one step of Fisher-Yates shuffle: a random card is
+    picked from the not yet drawn ones and swapped to the end of them. Work
+    of a game is thus proportional to the number of cards drawn, not to the
+    size of the deck. The steps are the same as of `random.shuffle`, so
+    cards are drawn with exactly the same distribution as from a fully
+    shuffled deck - with the same random generator state even the same
+    cards (see `blackjack.prepare_deck`).
+
+    Parameters
+    ----------
+    cards : `list` or `bytearray`
+        Cards of the deck (in any order). They are copied.
+    rng : `random.Random`, optional
+        Source of randomness. Default module `random`.
+
+    Examples
+    --------
+    >>> deck = LazyDeck(new_deck())
+    >>> card = deck.pop()
+    >>> len(deck)
+    51
+    '''
+
+    def __init__(self, cards, rng=random):
+        self.cards = cards[:]
+        self.left = len(self.cards)
+        self.randrange = rng.randrange
+
+    def pop(self):
+        '''Draws a random card from the cards not drawn yet.'''
+        left = self.left - 1
+        if left < 0:
+            raise IndexError("pop from empty deck")
+        cards = self.cards
+        if left:
+            j = self.randrange(left + 1)
+            cards[left], cards[j] = cards[j], cards[left]
+        self.left = left
+        return cards[left]
+
+    def deal(self, count):
+        '''Draws `count` cards at once (in the order of `pop`).'''
+        return [self.pop() for i in range(count)]
+
+    def __len__(self):
+        return self.left
+
+
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()
@@ -0,0 +1,610 @@
+'''Headless simulation of blackjack rounds.
+
+Plays rounds of blackjack without any user interaction. Player decisions are
+made by a policy - any function `policy(hand, upcard)` returning `True` when
+the player should draw a card. Dealer play and result resolution are taken
+from module `blackjack` so the simulated rounds follow the same rules as an
+interactive game.
+'''
+
+import random
+from collections import namedtuple
+from functools import lru_cache, partial
+from blackjack import (prepare_deck, draw_card, hand_value, hand_soft,
+                       dealer_turn, resolve_game)
+from blackjack_cards import CARD_RANK, CARD_VALUE
+from blackjack_hand import Hand
+from blackjack_rules import (RuleSet, HARD_TOTALS, BLACKJACK, STATES,
+                             SURRENDER_PAYOUT)
+from blackjack_shoe import Shoe
+import blackjack_probe
+
+# Blackjack usually pays 3:2
+BLACKJACK_PAYOUT = 1.5
+
+# cards left in the shoe needed to play a round by the table fast path -
+# more than any round can draw; closer to the end of the shoe rounds are
+# played by `_play_round`, which reshuffles the shoe when it runs out
+ROUND_CARDS = 64
+
+# one played round yielded by `iter_rounds` - cards are tuples of compact
+# cards, result is the code of `blackjack.resolve_game`
+RoundRecord = namedtuple("RoundRecord", [
+    "number", "player_cards", "dealer_cards", "player_total", "dealer_total",
+    "result", "payout"])
+
+
+def _stand_on(limit, hand, upcard):
+    """Returns `True` if hand has less than `limit` points."""
+    return hand_value(hand) < limit
+
+
+def policy_stand_on(limit=17):
+    """Factory for policy drawing cards until hand reaches given limit.
+
+    Policy is a `functools.partial` (not a closure), so it can be passed to
+    worker processes (see `blackjack_parallel`).
+
+    Parameters
+    ----------
+    limit : `int`, optional
+        Player stands when having `limit` points or more. Default 17 - the
+        same as the dealer does.
+
+    Returns
+    -------
+    `function`
+        stand_on(hand, upcard) -> bool
+    """
+    return partial(_stand_on, limit)
+
+
+def policy_identity(policy):
+    """Returns a string identifying a policy, e.g. to tell whether a saved
+    run was played by the same policy.
+
+    A policy may name itself by attribute `policy_id`, otherwise the name is
+    made from the module and qualified name of the function (and arguments
+    of a `functools.partial`) or from the class and attributes of a callable
+    object.
+
+    >>> policy_identity(policy_stand_on(16)).endswith("._stand_on(16)")
+    True
+    """
+    name = getattr(policy, "policy_id", None)
+    if name is not None:
+        return name
+    if isinstance(policy, partial):
+        arguments = [repr(arg) for arg in policy.args]
+        arguments += ["{}={!r}".format(key, value)
+                      for key, value in sorted(policy.keywords.items())]
+        return "{}({})".format(policy_identity(policy.func),
+                               ", ".join(arguments))
+    if hasattr(policy, "__qualname__"):
+        return "{}.{}".format(policy.__module__, policy.__qualname__)
+    kind = type(policy)
+    return "{}.{}{!r}".format(kind.__module__, kind.__qualname__,
+                              sorted(vars(policy).items()))
+
+
+def policy_never_draw(hand, upcard):
+    """Policy which never draws a card (i.e. player always stands)."""
+    return False
+
+
+def policy_surrender(hand, upcard):
+    """Surrender policy of basic strategy - surrenders hard 16 against 9, 10
+    or Ace and hard 15 against 10.
+
+    >>> policy_surrender(Hand([8, 4]), 12), policy_surrender(Hand([8, 4]), 4)
+    (True, False)
+    """
+    if hand_soft(hand):
+        return False
+    total = hand_value(hand)
+    upcard_value = CARD_VALUE[upcard]
+    if total == 16:
+        return upcard_value in (9, 10, 1)
+    return total == 15 and upcard_value == 10
+
+
+def policy_turn(player, deck, policy, upcard):
+    '''Non-interactive counterpart of `blackjack.player_turn`.
+
+    Parameters
+    ----------
+    player : `dict`
+        Dictionary representing player. Presence of 'hand' key is expected.
+    deck : `list`
+        List of cards.
+    policy : `function`
+        policy(hand, upcard) -> bool, `True` means "draw a card".
+    upcard : card
+        Dealer's face-up card.
+
+    Returns
+    -------
+    `None`
+    '''
+    hand = player['hand']
+    while hand_value(hand) < 21 and policy(hand, upcard):
+        hand.append(draw_card(deck))
+
+
+def _play_round(deck, policy, soft17_draw=False, rules=None, record=None,
+                surrender=policy_surrender):
+    '''Plays a single headless round - the one implementation behind
+    `play_round`, `play_round_rules` and `play_round_probed`.
+
+    Parameters
+    ----------
+    deck, policy, soft17_draw
+        See `play_round`.
+    rules : `blackjack_rules.RuleSet`, optional
+        If given, the dealer plays and the round is settled by its lookup
+        tables, otherwise by `blackjack.dealer_turn` and
+        `blackjack.resolve_game`.
+    record : `function`, optional
+        Probe hook `blackjack_probe.record` - if given, every phase of the
+        round is measured.
+    surrender : `function`, optional
+        surrender(hand, upcard) -> bool, asked when `rules` allow to
+        surrender the first two cards. `None` - never surrender.
+    '''
+    if record is not None:
+        start = blackjack_probe.clock()
+
+    player = {"name": "Simulated Player", "role": "player", "hand": Hand()}
+    dealer = {"name": "Simulated Dealer", "role": "dealer", "hand": Hand()}
+
+    for i in range(0, 2):
+        player['hand'].append(draw_card(deck))
+        dealer['hand'].append(draw_card(deck))
+    if record is not None:
+        start = record("deal", start)
+
+    # surrendered hand is neither played nor settled
+    surrendered = (rules is not None and surrender is not None and
+                   rules.can_surrender(player['hand'], dealer['hand']) and
+                   surrender(player['hand'], dealer['hand'][0]))
+
+    if not surrendered:
+        policy_turn(player, deck, policy, dealer['hand'][0])
+    if record is not None:
+        start = record("player_turn", start)
+
+    if rules is None:
+        dealer_turn(dealer, deck, soft17_draw)
+    elif not surrendered:
+        rules.dealer_play(dealer['hand'], deck)
+    if record is not None:
+        start = record("dealer_turn", start)
+
+    if rules is None:
+        result = resolve_game(player, dealer)
+    elif surrendered:
+        result = ("DW", SURRENDER_PAYOUT)
+    else:
+        result = rules.settle(player['hand'], dealer['hand'])
+    if record is not None:
+        record("resolve", start)
+
+    return player, dealer, result
+
+
+def play_round(deck, policy, soft17_draw=False):
+    '''Plays a single headless round of blackjack.
+
+    Cards are dealt in the same order as in `blackjack.play_game` - two
+    rounds of one card for the player and one card for the dealer. The
+    dealer's first card is the upcard.
+
+    Parameters
+    ----------
+    deck : `list`
+        Shuffled deck of cards. Drawn cards are removed.
+    policy : `function`
+        Player policy, see module docstring.
+    soft17_draw : `bool`, optional
+        Passed to `blackjack.dealer_turn`.
+
+    Returns
+    -------
+    player : `dict`
+    dealer : `dict`
+    result : `tuple`
+        Result of `blackjack.resolve_game`.
+    '''
+    return _play_round(deck, policy, soft17_draw)
+
+
+def play_round_rules(deck, policy, rules, surrender=policy_surrender):
+    '''The same as `play_round`, but the dealer plays and the round is
+    settled by lookup tables of `rules` (`blackjack_rules.RuleSet`). When
+    the rules allow surrender, `surrender(hand, upcard)` decides it (`None` -
+    never surrender) and a surrendered round pays
+    `blackjack_rules.SURRENDER_PAYOUT`.
+
+    Returns
+    -------
+    player : `dict`
+    dealer : `dict`
+    result : `tuple`
+        Result code and payout, see `blackjack_rules.RuleSet.settle`.
+    '''
+    return _play_round(deck, policy, rules=rules, surrender=surrender)
+
+
+def play_round_probed(deck, policy, soft17_draw=False, rules=None):
+    '''The same as `play_round` (or `play_round_rules` when `rules` are
+    given), but phases of the round are measured by probes of module
+    `blackjack_probe`.'''
+    return _play_round(deck, policy, soft17_draw, rules,
+                       blackjack_probe.record)
+
+
+def policy_table(policy):
+    '''Returns draw decisions of a policy for every hand key (see
+    `blackjack_rules.hand_key`) as `bytes`, or `None` if the decisions can't
+    be tabulated - only `policy_stand_on` and `policy_never_draw` are known
+    to depend on nothing else than the value of the hand.
+
+    >>> table = policy_table(policy_stand_on(17))
+    >>> table[16], table[17], table[HARD_TOTALS + 6]    # 16, 17, soft 17
+    (1, 0, 1)
+    '''
+    if policy is policy_never_draw:
+        limit = 0
+    elif (isinstance(policy, partial) and policy.func is _stand_on and
+            len(policy.args) == 1 and not policy.keywords):
+        limit = min(policy.args[0], 21)
+    else:
+        return None
+    table = bytearray(2 * HARD_TOTALS)
+    for key in range(2 * HARD_TOTALS):
+        hard = key % HARD_TOTALS
+        value = hard + 10 if key >= HARD_TOTALS and hard <= 11 else hard
+        table[key] = value < limit
+    return bytes(table)
+
+
+@lru_cache(maxsize=None)
+def _dealer_rules(soft17_draw):
+    # rules of `blackjack.dealer_turn` and `blackjack.resolve_game`
+    return RuleSet(hit_soft17=soft17_draw, blackjack_payout=BLACKJACK_PAYOUT)
+
+
+def _simulate_tables(rounds, draw, shoe, rules, policy):
+    '''Plays rounds from a shoe by lookup tables only - the fast path of
+    `simulate`.
+
+    The player's and dealer's hands are two integers each - hard total and
+    hand key offset of an Ace - read straight from the shoe's cards, every
+    decision is one lookup (`draw` of `policy_table`, dealer draw, states and
+    settlement tables of `rules`). Rounds, cards and results are exactly the
+    same as of `_play_round`, which plays the rounds near the end of the
+    shoe.
+    '''
+    value = CARD_VALUE
+    rank = CARD_RANK
+    dealer_draw = rules.dealer_draw
+    states = rules.states
+    settlement = rules.settlement
+    codes = {"PW": 0, "DW": 0, "SO": 0}
+    player_blackjacks = dealer_blackjacks = player_busts = dealer_busts = 0
+    net = 0.0
+    results = new_results()
+
+    cut_card = shoe.cut_card
+    last_position = len(shoe.cards) - ROUND_CARDS
+
+    for i in range(rounds):
+        # `shoe.new_round` inlined
+        if shoe.position >= cut_card:
+            shoe.shuffle()
+        cards = shoe.cards
+        position = shoe.position
+        if position > last_position:
+            player, dealer, result = _play_round(shoe, policy, rules=rules,
+                                                 surrender=None)
+            net += record_round(results, player, dealer, result, result[1])
+            continue
+        counts = shoe.rank_counts
+
+        card1, card2, card3, card4 = cards[position:position + 4]
+        position += 4
+        counts[rank[card1]] -= 1
+        counts[rank[card2]] -= 1
+        counts[rank[card3]] -= 1
+        counts[rank[card4]] -= 1
+        value1, value2, value3, value4 = (value[card1], value[card2],
+                                          value[card3], value[card4])
+        player_hard = value1 + value3
+        player_ace = HARD_TOTALS if value1 == 1 or value3 == 1 else 0
+        dealer_hard = value2 + value4
+        dealer_ace = HARD_TOTALS if value2 == 1 or value4 == 1 else 0
+
+        player_state = states[player_hard + player_ace]
+        if player_state == 21:
+            player_state = BLACKJACK
+        else:
+            while draw[player_hard + player_ace]:
+                card = cards[position]
+                position += 1
+                counts[rank[card]] -= 1
+                card_value = value[card]
+                player_hard += card_value
+                if card_value == 1:
+                    player_ace = HARD_TOTALS
+            player_state = states[player_hard + player_ace]
+
+        dealer_state = states[dealer_hard + dealer_ace]
+        if dealer_state == 21:
+            dealer_state = BLACKJACK
+        else:
+            while dealer_draw[dealer_hard + dealer_ace]:
+                card = cards[position]
+                position += 1
+                counts[rank[card]] -= 1
+                card_value = value[card]
+                dealer_hard += card_value
+                if card_value == 1:
+                    dealer_ace = HARD_TOTALS
+            dealer_state = states[dealer_hard + dealer_ace]
+        shoe.position = position
+
+        code, payout = settlement[player_state * STATES + dealer_state]
+        codes[code] += 1
+        net += payout
+        if player_state == BLACKJACK:
+            player_blackjacks += 1
+        if dealer_state == BLACKJACK:
+            dealer_blackjacks += 1
+        if player_hard > 21:
+            player_busts += 1
+        elif dealer_hard > 21:
+            dealer_busts += 1
+
+    merge_results(results, {
+        "rounds": sum(codes.values()), "PW": codes["PW"], "DW": codes["DW"],
+        "SO": codes["SO"], "player_blackjack": player_blackjacks,
+        "dealer_blackjack": dealer_blackjacks, "player_bust": player_busts,
+        "dealer_bust": dealer_busts})
+    # payouts of all rounds summed in order - the same float as `simulate`
+    results["net"] = net
+    return results
+
+
+def new_results():
+    '''Returns empty aggregate results of a simulation.
+
+    Keys 'PW', 'DW' and 'SO' count result codes of `blackjack.resolve_game`.
+    Key 'net' is the total amount won by the player when betting one unit
+    per round.
+    '''
+    return {"rounds": 0, "PW": 0, "DW": 0, "SO": 0,
+            "player_blackjack": 0, "dealer_blackjack": 0,
+            "player_bust": 0, "dealer_bust": 0, "net": 0.0}
+
+
+def merge_results(results, other):
+    '''Adds aggregate results `other` into `results` and returns `results`.
+
+    >>> a = new_results(); a['PW'] = 2; a['rounds'] = 2
+    >>> b = new_results(); b['DW'] = 1; b['rounds'] = 1
+    >>> merged = merge_results(a, b)
+    >>> merged['rounds'], merged['PW'], merged['DW']
+    (3, 2, 1)
+    '''
+    for key, value in other.items():
+        results[key] += value
+    return results
+
+
+def round_payout(player, code):
+    '''Returns payout of a round - amount won (negative if lost) by the
+    player betting one unit - from the result code.'''
+    if code == "PW":
+        hand = player['hand']
+        if hand_value(hand) == 21 and len(hand) == 2:
+            return BLACKJACK_PAYOUT
+        return 1
+    if code == "DW":
+        return -1
+    return 0
+
+
+def record_round(results, player, dealer, result, payout=None):
+    '''Adds one played round into aggregate results.
+
+    Payout is computed from the result code unless given.
+
+    Returns
+    -------
+    `float`
+        Payout of the round - amount won (negative if lost) by the player
+        betting one unit.
+    '''
+    player_score = hand_value(player['hand'])
+    dealer_score = hand_value(dealer['hand'])
+    player_blackjack = player_score == 21 and len(player['hand']) == 2
+    code = result[0]
+
+    results['rounds'] += 1
+    results[code] += 1
+    if player_blackjack:
+        results['player_blackjack'] += 1
+    if dealer_score == 21 and len(dealer['hand']) == 2:
+        results['dealer_blackjack'] += 1
+    if player_score > 21:
+        results['player_bust'] += 1
+    elif dealer_score > 21:
+        results['dealer_bust'] += 1
+
+    if payout is None:
+        payout = round_payout(player, code)
+    results['net'] += payout
+
+    return payout
+
+
+def simulate(rounds, policy=policy_stand_on(17), all_cards=None,
+             soft17_draw=False, rng=random, writer=None, rules=None,
+             lazy=True):
+    '''Plays given number of headless rounds and aggregates their results.
+
+    Cards are dealt the same way as in `blackjack.play_game` - either from a
+    shoe across many rounds or from a freshly shuffled deck every round.
+
+    Rounds dealt from a `Shoe` by `policy_stand_on` or `policy_never_draw`
+    without a writer or probes are played by lookup tables only (see
+    `policy_table`) - with exactly the same results, about three times
+    faster.
+
+    Parameters
+    ----------
+    rounds : `int`
+        Number of rounds to be played.
+    policy : `function`, optional
+        Player policy. Default: draw until 17 points.
+    all_cards : `Shoe`, `bytearray` or `list`, optional
+        `Shoe` dealing all rounds or cards shuffled into a new deck for
+        each round. Default 6-deck `Shoe`.
+    soft17_draw : `bool`, optional
+        Passed to `blackjack.dealer_turn`.
+    rng : `random.Random`, optional
+        Source of randomness for shuffling new decks. Not used with `Shoe`,
+        which has its own. Default module `random`.
+    writer : `blackjack_records.HandRecordWriter`, optional
+        If given, every round is written to it as a hand record.
+    rules : `blackjack_rules.RuleSet`, optional
+        If given, dealer play, surrender (decided by `policy_surrender`) and
+        settlement (incl. blackjack payout) follow the rules, `soft17_draw`
+        is ignored and the default shoe is made by the rules.
+    lazy : `bool`, optional
+        New decks are shuffled lazily - only the cards drawn (see
+        `blackjack_shoe.LazyDeck`). Default `True`.
+
+    Returns
+    -------
+    `dict`
+        Aggregate results, see `new_results`.
+
+    Examples
+    --------
+    >>> results = simulate(100)
+    >>> results['rounds']
+    100
+    >>> results['PW'] + results['DW'] + results['SO']
+    100
+    '''
+    if all_cards is None:
+        all_cards = Shoe() if rules is None else rules.new_shoe()
+
+    shoe = all_cards if isinstance(all_cards, Shoe) else None
+    # probes are checked once per run, not in every round
+    record = blackjack_probe.record if blackjack_probe.enabled else None
+
+    # fast path - nothing but aggregate results is asked for and everything
+    # can be looked up in tables (a shoe with its own `pop`, e.g. counting
+    # one, has to see every card)
+    if (shoe is not None and writer is None and record is None and
+            type(shoe).pop is Shoe.pop and
+            (rules is None or rules.surrender == "none")):
+        draw = policy_table(policy)
+        if draw is not None:
+            return _simulate_tables(
+                rounds, draw, shoe,
+                _dealer_rules(soft17_draw) if rules is None else rules,
+                policy)
+
+    results = new_results()
+    for i in range(rounds):
+        if shoe is not None:
+            shoe.new_round()
+            deck = shoe
+        else:
+            deck = prepare_deck(all_cards, rng, lazy)
+
+        player, dealer, result = _play_round(deck, policy, soft17_draw,
+                                             rules, record)
+        if rules is None:
+            payout = record_round(results, player, dealer, result)
+        else:
+            payout = record_round(results, player, dealer, result,
+                                  result[1])
+        if writer is not None:
+            writer.write(player['hand'], dealer['hand'], result[0], payout)
+
+    return results
+
+
+def iter_rounds(rounds=None, policy=policy_stand_on(17), all_cards=None,
+                soft17_draw=False, rng=random, rules=None, lazy=True):
+    '''Plays headless rounds lazily - one round per requested record.
+
+    Rounds are played by `play_round` (or `play_round_rules`) exactly as by
+    `simulate`, but nothing is aggregated: every round is yielded as a
+    `RoundRecord` and forgotten. Memory use doesn't grow with the number of
+    rounds and a consumer stopping early doesn't pay for rounds it didn't
+    ask for.
+
+    Parameters
+    ----------
+    rounds : `int`, optional
+        Number of rounds. Default `None` - infinite.
+    policy, all_cards, soft17_draw, rng, rules, lazy
+        See `simulate`.
+
+    Yields
+    ------
+    `RoundRecord`
+
+    Examples
+    --------
+    >>> from itertools import islice
+    >>> losses = (r for r in iter_rounds() if r.result == "DW")
+    >>> [r.result for r in islice(losses, 3)]
+    ['DW', 'DW', 'DW']
+    '''
+    if all_cards is None:
+        all_cards = Shoe() if rules is None else rules.new_shoe()
+    shoe = all_cards if isinstance(all_cards, Shoe) else None
+
+    number = 0
+    while rounds is None or number < rounds:
+        if shoe is not None:
+            shoe.new_round()
+            deck = shoe
+        else:
+            deck = prepare_deck(all_cards, rng, lazy)
+
+        player, dealer, result = _play_round(deck, policy, soft17_draw,
+                                             rules)
+        code = result[0]
+        if rules is None:
+            payout = round_payout(player, code)
+        else:
+            payout = result[1]
+        player_hand = player['hand']
+        dealer_hand = dealer['hand']
+        yield RoundRecord(number, tuple(player_hand), tuple(dealer_hand),
+                          hand_value(player_hand), hand_value(dealer_hand),
+                          code, payout)
+        number += 1
+
+
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()
+
+    import time
+
+    rounds = 100000
+    start = time.perf_counter()
+    results = simulate(rounds)
+    elapsed = time.perf_counter() - start
+
+    print(results)
+    print("{} rounds in {:.2f} s ({:.0f} rounds/s)".format(
+        rounds, elapsed, rounds / elapsed))
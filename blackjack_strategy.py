@@ -0,0 +1,234 @@
+'''Basic strategy computed by expected value recursion.
+
+The optimal decision for every player's total and dealer's upcard is found by
+comparing expected value of standing (using exact dealer probabilities from
+`blackjack_odds`) and of drawing a card (recursively, drawing again while it's
+better). The player draws from the full shoe without the dealer's upcard, i.e.
+the strategy is total-dependent, just like common basic strategy charts.
+
+Solved strategies are stored in small binary files, so they are computed only
+once for every rule set.
+'''
+
+import os
+import struct
+import tempfile
+from blackjack import hand_value, hand_soft
+from blackjack_cards import ACE, CARD_RANK, RANK_COUNT, RANK_VALUE
+from blackjack_odds import dealer_distribution, BLACKJACK, BUST
+
+# decisions
+HIT = ord("H")
+STAND = ord("S")
+
+# table is indexed by [soft][total][upcard rank]
+TOTALS = 22
+TABLE_SIZE = 2 * TOTALS * RANK_COUNT
+
+FILE_MAGIC = b"BJST"
+FILE_VERSION = 1
+FILE_HEADER = struct.Struct("<4sBBB")
+
+STRATEGY_DIR = os.path.join(os.path.expanduser("~"), ".cache", "blackjack")
+
+
+def _table_index(total, soft, upcard_rank):
+    return (soft * TOTALS + total) * RANK_COUNT + upcard_rank
+
+
+class Strategy:
+    '''Hit/stand decisions for every player's total and dealer's upcard.
+
+    Strategy can be used directly as a policy of `blackjack_sim` -
+    `strategy(hand, upcard)` returns `True` when the player should draw.
+
+    Parameters
+    ----------
+    table : `bytes`
+        Decision (`HIT` or `STAND`) for every [soft][total][upcard rank].
+    decks : `int`
+        Number of decks the strategy has been solved for.
+    hit_soft17 : `bool`
+        Dealer's soft 17 rule the strategy has been solved for.
+    '''
+
+    def __init__(self, table, decks, hit_soft17):
+        if len(table) != TABLE_SIZE:
+            raise ValueError("Strategy table has a wrong size")
+        self.table = bytes(table)
+        self.decks = decks
+        self.hit_soft17 = hit_soft17
+
+    def action(self, total, soft, upcard_rank):
+        '''Returns decision (`"H"` or `"S"`) for given situation.'''
+        if total > 21:
+            return "S"
+        return chr(self.table[_table_index(total, soft, upcard_rank)])
+
+    def __call__(self, hand, upcard):
+        total = hand_value(hand)
+        if total > 21:
+            return False
+        index = _table_index(total, hand_soft(hand), CARD_RANK[upcard])
+        return self.table[index] == HIT
+
+    def save(self, path):
+        '''Saves strategy to a binary file (atomically). The file is written
+        under a unique temporary name first, so processes saving the same
+        strategy at once don't overwrite each other's unfinished file.'''
+        fd, tmp_path = tempfile.mkstemp(
+            prefix=os.path.basename(path) + ".", suffix=".tmp",
+            dir=os.path.dirname(path) or ".")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(FILE_HEADER.pack(FILE_MAGIC, FILE_VERSION,
+                                         self.decks, self.hit_soft17))
+                f.write(self.table)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    @classmethod
+    def load(cls, path, decks=None, hit_soft17=None):
+        '''Loads strategy saved by `save`.
+
+        Raises
+        ------
+        ValueError
+            When the file is not a strategy or (if `decks` or `hit_soft17`
+            is given) the strategy has been solved for other rules.
+        '''
+        with open(path, "rb") as f:
+            data = f.read()
+        magic, version, file_decks, file_h17 = FILE_HEADER.unpack_from(data)
+        if magic != FILE_MAGIC or version != FILE_VERSION:
+            raise ValueError("'{}' is not a strategy file".format(path))
+        if ((decks is not None and file_decks != decks) or
+                (hit_soft17 is not None and
+                 bool(file_h17) != bool(hit_soft17))):
+            raise ValueError("'{}' is a strategy for other rules"
+                             .format(path))
+        return cls(data[FILE_HEADER.size:], file_decks, bool(file_h17))
+
+
+def _stand_value(total, distribution):
+    '''Expected value of standing on `total` against dealer's final hands.'''
+    ev = distribution[BUST] - distribution[BLACKJACK]
+    for i, dealer_total in enumerate(range(17, 22)):
+        if total > dealer_total:
+            ev += distribution[i]
+        elif total < dealer_total:
+            ev -= distribution[i]
+    return ev
+
+
+def solve_strategy(decks=6, hit_soft17=False):
+    '''Computes optimal hit/stand decisions for given rules.
+
+    Parameters
+    ----------
+    decks : `int`, optional
+        Number of decks in the shoe. Default 6.
+    hit_soft17 : `bool`, optional
+        If `True` dealer draws on soft 17. Default `False`.
+
+    Returns
+    -------
+    `Strategy`
+    '''
+    table = bytearray([STAND]) * TABLE_SIZE
+
+    for upcard in range(RANK_COUNT):
+        composition = [4 * decks] * RANK_COUNT
+        composition[upcard] -= 1
+        cards = sum(composition)
+        draw = [(RANK_VALUE[rank], rank == ACE, count / cards)
+                for rank, count in enumerate(composition)]
+        distribution = dealer_distribution(upcard, composition, hit_soft17)
+        values = {}
+
+        def best_value(hard, ace):
+            '''Expected value of the best play from given hand.'''
+            if hard > 21:
+                return -1.0
+            if hard > 11:
+                ace = False
+            key = (hard, ace)
+            if key in values:
+                return values[key]
+
+            total = hard + 10 if ace else hard
+            stand = _stand_value(total, distribution)
+            if total < 21:
+                hit = sum(p * best_value(hard + value, ace or is_ace)
+                          for value, is_ace, p in draw)
+            else:
+                hit = -1.0
+            values[key] = max(stand, hit)
+            if hit > stand:
+                table[_table_index(total, ace, upcard)] = HIT
+            return values[key]
+
+        for hard in range(2, 22):
+            best_value(hard, False)
+            if hard <= 11:
+                best_value(hard, True)
+
+    return Strategy(table, decks, hit_soft17)
+
+
+def basic_strategy(decks=6, hit_soft17=False, directory=STRATEGY_DIR):
+    '''Returns strategy for given rules. Strategy is loaded from a file in
+    `directory` if it has been already solved, otherwise it's solved and
+    saved there.
+
+    Parameters
+    ----------
+    decks : `int`, optional
+        Number of decks in the shoe. Default 6.
+    hit_soft17 : `bool`, optional
+        If `True` dealer draws on soft 17. Default `False`.
+    directory : `str`, optional
+        Directory of solved strategies. If `None` strategy is solved and not
+        saved.
+
+    Returns
+    -------
+    `Strategy`
+    '''
+    if directory is None:
+        return solve_strategy(decks, hit_soft17)
+
+    path = os.path.join(directory, "strategy-{}d-{}.bst".format(
+        decks, "h17" if hit_soft17 else "s17"))
+    try:
+        return Strategy.load(path, decks, hit_soft17)
+    except (OSError, ValueError, struct.error):
+        pass
+
+    strategy = solve_strategy(decks, hit_soft17)
+    os.makedirs(directory, exist_ok=True)
+    strategy.save(path)
+    return strategy
+
+
+def format_strategy(strategy):
+    '''Returns strategy as a human readable chart.'''
+    upcards = list(range(9)) + [ACE]
+    lines = ["      " + " ".join("{:>2}".format(RANK_VALUE[u] if u != ACE
+                                              else "A") for u in upcards)]
+    for soft, totals in ((False, range(5, 22)), (True, range(12, 22))):
+        for total in totals:
+            label = ("S" if soft else "H") + str(total)
+            lines.append("{:>5} ".format(label) + " ".join(
+                "{:>2}".format(strategy.action(total, soft, u))
+                for u in upcards))
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()
+
+    print(format_strategy(basic_strategy()))
@@ -0,0 +1,69 @@
+import unittest
+import random
+from blackjack_bankroll import (round_outcomes, simulate_bankroll, bet_flat,
+                                bet_ramp, bet_kelly, np)
+from blackjack_rules import RuleSet
+
+
+class RoundOutcomesTest(unittest.TestCase):
+    def test_outcomes(self):
+        """Every round has a payout and a true count"""
+        payouts, counts = round_outcomes(500, rng=random.Random(1))
+        self.assertEqual(500, len(payouts))
+        self.assertEqual(500, len(counts))
+        self.assertTrue(set(payouts) <= {-1, 0, 1, 1.5})
+        self.assertEqual(0, counts[0])
+
+    def test_blackjack_payout_of_rules(self):
+        """Payouts follow the rules"""
+        payouts, counts = round_outcomes(
+            500, rules=RuleSet(blackjack_payout=1.2), rng=random.Random(1))
+        self.assertIn(1.2, payouts)
+        self.assertNotIn(1.5, payouts)
+
+
+@unittest.skipIf(np is None, "NumPy is not installed")
+class BankrollTest(unittest.TestCase):
+    def test_certain_ruin(self):
+        """Always losing flat bettor is ruined after bankroll / bet rounds"""
+        report = simulate_bankroll([-1.0], [0.0], bet_flat(10), bankroll=100,
+                                   rounds=50, paths=100, seed=1)
+        self.assertEqual(1.0, report['ruin_probability'])
+        self.assertEqual(10, report['mean_rounds'])
+        self.assertEqual(100, report['drawdown_median'])
+        self.assertEqual(0, report['quantiles'][0.5])
+
+    def test_certain_win(self):
+        """Always winning bettor is never ruined"""
+        report = simulate_bankroll([1.0], [0.0], bet_flat(1), bankroll=10,
+                                   rounds=20, paths=10, seed=1)
+        self.assertEqual(0.0, report['ruin_probability'])
+        self.assertEqual(30, report['mean'])
+        self.assertEqual(0, report['drawdown_95'])
+
+    def test_reproducible(self):
+        """Paths are given by the seed"""
+        payouts, counts = round_outcomes(1000, rng=random.Random(2))
+        reports = [simulate_bankroll(payouts, counts, bet_flat(), rounds=200,
+                                     paths=500, seed=3) for i in range(2)]
+        self.assertTrue(np.array_equal(reports[0]['final'],
+                                       reports[1]['final']))
+
+    def test_ramp_follows_count(self):
+        """Ramp bets more on higher counts"""
+        bets = bet_ramp({1: 1, 2: 2, 4: 8}, unit=5)
+        self.assertEqual([5, 5, 10, 10, 40],
+                         bets(np.zeros(5), np.array([-3, 1, 2, 3.9, 6]))
+                         .tolist())
+
+    def test_kelly_bets_fraction_of_bankroll(self):
+        """Kelly bets grow with the bankroll and nothing without an edge"""
+        bets = bet_kelly(fraction=1, base_edge=0, edge_per_count=0.01,
+                         variance=1)
+        self.assertEqual([0, 0.02 * 100, 0.02 * 200],
+                         bets(np.array([100.0, 100.0, 200.0]),
+                              np.array([-1.0, 2.0, 2.0])).tolist())
+
+
+if __name__ == "__main__":
+    unittest.main()
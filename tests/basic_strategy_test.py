@@ -0,0 +1,68 @@
+import unittest
+import os
+import tempfile
+from blackjack_cards import ACE
+from blackjack_hand import Hand
+from blackjack_strategy import solve_strategy, basic_strategy, Strategy
+
+TEN = 8
+
+
+class BasicStrategyTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.strategy = solve_strategy(decks=6, hit_soft17=False)
+
+    def test_hard_totals(self):
+        """Well known hard hand decisions of multi-deck basic strategy"""
+        s = self.strategy
+        self.assertEqual("H", s.action(11, False, TEN))
+        self.assertEqual("H", s.action(12, False, 0))       # 12 vs 2
+        self.assertEqual("S", s.action(12, False, 2))       # 12 vs 4
+        self.assertEqual("S", s.action(16, False, 4))       # 16 vs 6
+        self.assertEqual("H", s.action(16, False, TEN))
+        self.assertEqual("S", s.action(17, False, ACE))
+
+    def test_soft_totals(self):
+        """Well known soft hand decisions of multi-deck basic strategy"""
+        s = self.strategy
+        self.assertEqual("H", s.action(17, True, 4))        # soft 17 vs 6
+        self.assertEqual("S", s.action(18, True, 6))        # soft 18 vs 8
+        self.assertEqual("H", s.action(18, True, TEN))
+        self.assertEqual("S", s.action(19, True, TEN))
+
+    def test_policy(self):
+        """Strategy works as a policy of the simulator"""
+        self.assertTrue(self.strategy(Hand([TEN, 4]), TEN))     # 16 vs 10
+        self.assertFalse(self.strategy(Hand([TEN, 4]), 4))      # 16 vs 6
+
+    def test_save_and_load(self):
+        """Solved strategy is stored and loaded again"""
+        with tempfile.TemporaryDirectory() as directory:
+            strategy = basic_strategy(1, True, directory)
+            files = os.listdir(directory)
+            self.assertEqual(["strategy-1d-h17.bst"], files)
+
+            loaded = Strategy.load(os.path.join(directory, files[0]))
+            self.assertEqual(strategy.table, loaded.table)
+            self.assertEqual(1, loaded.decks)
+            self.assertTrue(loaded.hit_soft17)
+
+    def test_cached_file_of_other_rules(self):
+        """Cached strategy solved for other rules is not served"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "strategy-6d-s17.bst")
+            basic_strategy(1, True, directory)
+            os.rename(os.path.join(directory, "strategy-1d-h17.bst"), path)
+            self.assertRaises(ValueError, Strategy.load, path, 6, False)
+
+            strategy = basic_strategy(6, False, directory)
+            self.assertEqual(6, strategy.decks)
+            self.assertFalse(strategy.hit_soft17)
+            self.assertEqual(self.strategy.table, strategy.table)
+            self.assertEqual(6, Strategy.load(path, 6, False).decks)
+            self.assertEqual(["strategy-6d-s17.bst"], os.listdir(directory))
+
+
+if __name__ == "__main__":
+    unittest.main()
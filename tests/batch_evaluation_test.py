@@ -0,0 +1,60 @@
+import unittest
+import random
+import blackjack_batch
+from blackjack import hand_value, resolve_game
+from blackjack_cards import CARD_COUNT
+from blackjack_batch import (rank_matrix, hand_totals, resolve_games,
+                             RESULT_CODES, _hand_totals_python)
+
+
+def random_hands(count, seed):
+    rng = random.Random(seed)
+    return [rng.sample(range(CARD_COUNT), rng.randint(2, 7))
+            for i in range(count)]
+
+
+class BatchEvaluationTest(unittest.TestCase):
+    def test_hand_totals_match_hand_value(self):
+        """Batch totals are the same as scalar hand values"""
+        hands = random_hands(3000, 1)
+        totals, soft, blackjack = hand_totals(rank_matrix(hands))
+        for hand, total, bj in zip(hands, totals, blackjack):
+            self.assertEqual(hand_value(hand), total)
+            self.assertEqual(hand_value(hand) == 21 and len(hand) == 2, bj)
+
+    def test_python_fallback_matches_hand_value(self):
+        """Pure Python evaluation gives the same totals"""
+        hands = random_hands(1000, 2)
+        ranks = [list(row) for row in rank_matrix(hands)]
+        totals, soft, blackjack = _hand_totals_python(ranks)
+        self.assertEqual([hand_value(hand) for hand in hands], totals)
+
+    def test_resolve_games_match_resolve_game(self):
+        """Batch result codes are the same as from resolve_game"""
+        players = random_hands(3000, 3) + [[12, 8], [12, 8], [0, 1]]
+        dealers = random_hands(3000, 4) + [[25, 21], [6, 7, 1], [25, 21]]
+        player, dealer, codes = resolve_games(rank_matrix(players),
+                                              rank_matrix(dealers))
+        for p, d, code in zip(players, dealers, codes):
+            expected = resolve_game({"hand": p}, {"hand": d})[0]
+            self.assertEqual(expected, RESULT_CODES[code])
+
+    def test_fallback_without_numpy(self):
+        """Batch API works when NumPy is missing"""
+        players = random_hands(300, 5)
+        dealers = random_hands(300, 6)
+        np = blackjack_batch.np
+        blackjack_batch.np = None
+        try:
+            ranks_p = rank_matrix(players)
+            ranks_d = rank_matrix(dealers)
+            player, dealer, codes = resolve_games(ranks_p, ranks_d)
+        finally:
+            blackjack_batch.np = np
+        for p, d, code in zip(players, dealers, codes):
+            expected = resolve_game({"hand": p}, {"hand": d})[0]
+            self.assertEqual(expected, RESULT_CODES[code])
+
+
+if __name__ == "__main__":
+    unittest.main()
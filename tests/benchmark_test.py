@@ -0,0 +1,42 @@
+import unittest
+import os
+import tempfile
+from blackjack_bench import (bench, run_benchmarks, find_regressions,
+                             save_baseline, load_baseline, BENCHMARKS)
+
+
+class BenchmarkTest(unittest.TestCase):
+    def test_bench_statistics(self):
+        """Benchmark reports throughput and ordered percentiles"""
+        stats = bench(lambda: None, batches=5)
+        self.assertGreater(stats['ops_per_sec'], 0)
+        self.assertLessEqual(stats['p50_us'], stats['p90_us'])
+        self.assertLessEqual(stats['p90_us'], stats['p99_us'])
+
+    def test_all_benchmarks_run(self):
+        """Every registered benchmark can be set up and run"""
+        for name, factory in BENCHMARKS.items():
+            operation = factory()
+            for i in range(100):
+                operation()
+
+    def test_regression_against_baseline(self):
+        """Slowdown over threshold is reported, smaller one is not"""
+        baseline = {"x": {"ops_per_sec": 1000.0}, "y": {"ops_per_sec": 50.0}}
+        results = {"x": {"ops_per_sec": 850.0}, "y": {"ops_per_sec": 48.0},
+                   "z": {"ops_per_sec": 1.0}}
+        self.assertEqual([("x", 1000.0, 850.0)],
+                         find_regressions(results, baseline, 0.1))
+        self.assertEqual([], find_regressions(results, baseline, 0.2))
+
+    def test_baseline_file(self):
+        """Baseline survives saving and loading"""
+        results = run_benchmarks(["resolve_game"], batches=3)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "baseline.json")
+            save_baseline(results, path)
+            self.assertEqual(results, load_baseline(path))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import unittest
+import os
+import tempfile
+from blackjack_checkpoint import (simulate_checkpointed, load_checkpoint,
+                                  save_checkpoint)
+from blackjack_rules import RuleSet
+from blackjack_sim import policy_stand_on, policy_identity
+
+
+class Crash(Exception):
+    pass
+
+
+def crashing_policy(rounds):
+    """Policy of `policy_stand_on(17)` crashing the run after given number
+    of its calls."""
+    policy = policy_stand_on(17)
+    calls = [0]
+
+    def crashing(hand, upcard):
+        calls[0] += 1
+        if calls[0] > rounds:
+            raise Crash()
+        return policy(hand, upcard)
+    # the same policy, only crashing
+    crashing.policy_id = policy_identity(policy)
+    return crashing
+
+
+class CheckpointTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "run.ckpt")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_resumed_run_gives_same_results(self):
+        """Run resumed after a crash ends with the same numbers"""
+        path = os.path.join(self.directory.name, "whole.ckpt")
+        whole = simulate_checkpointed(3000, path, seed=5, chunk_rounds=200,
+                                      rules=RuleSet(blackjack_payout=1.2))
+
+        with self.assertRaises(Crash):
+            simulate_checkpointed(3000, self.path, crashing_policy(1700),
+                                  seed=5, chunk_rounds=200, interval=0,
+                                  rules=RuleSet(blackjack_payout=1.2))
+        played = load_checkpoint(self.path)["played"]
+        self.assertTrue(0 < played < 3000)
+
+        resumed = simulate_checkpointed(3000, self.path, seed=5,
+                                        chunk_rounds=200,
+                                        rules=RuleSet(blackjack_payout=1.2))
+        self.assertEqual(whole, resumed)
+        self.assertEqual(3000, resumed['rounds'])
+
+    def test_finished_run_is_not_played_again(self):
+        """Finished run only returns stored results"""
+        results = simulate_checkpointed(500, self.path, seed=1)
+        again = simulate_checkpointed(500, self.path, crashing_policy(0),
+                                      seed=1)
+        self.assertEqual(results, again)
+
+    def test_checkpoint_of_another_run(self):
+        """Checkpoint is not used by another run"""
+        simulate_checkpointed(100, self.path, seed=1)
+        self.assertRaises(ValueError, simulate_checkpointed, 100, self.path,
+                          seed=2)
+
+    def test_checkpoint_of_other_rules_or_policy(self):
+        """Checkpoint is not resumed with other penetration or policy"""
+        rules = RuleSet(penetration=0.6)
+        simulate_checkpointed(100, self.path, seed=1, rules=rules)
+        self.assertRaises(ValueError, simulate_checkpointed, 100, self.path,
+                          seed=1, rules=RuleSet(penetration=0.8))
+        self.assertRaises(ValueError, simulate_checkpointed, 100, self.path,
+                          policy_stand_on(16), seed=1, rules=rules)
+        simulate_checkpointed(100, self.path, seed=1,
+                              rules=RuleSet(penetration=0.6))
+
+    def test_atomic_write(self):
+        """Checkpoint is replaced as a whole, no temporary file is left"""
+        save_checkpoint(self.path, {"version": 1, "played": 1})
+        save_checkpoint(self.path, {"version": 1, "played": 2})
+        self.assertEqual(2, load_checkpoint(self.path)["played"])
+        self.assertEqual(["run.ckpt"], os.listdir(self.directory.name))
+
+
+if __name__ == "__main__":
+    unittest.main()
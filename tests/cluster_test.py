@@ -0,0 +1,125 @@
+import unittest
+import asyncio
+import json
+import socket
+import threading
+import time
+from blackjack_cluster import Coordinator, run_worker, play_chunk
+from blackjack_parallel import simulate_parallel
+
+
+def run_cluster(coordinator, workers):
+    """Runs coordinator and workers (functions of host and port, run in
+    threads) on localhost."""
+    async def main():
+        host, port = await coordinator.start(port=0)
+        loop = asyncio.get_running_loop()
+        tasks = [loop.run_in_executor(None, worker, host, port)
+                 for worker in workers]
+        results = await coordinator.wait()
+        played = await asyncio.gather(*tasks)
+        return results, played
+    return asyncio.run(main())
+
+
+def dying_worker(host, port):
+    """Takes a chunk and disconnects without answering."""
+    with socket.create_connection((host, port)) as connection:
+        stream = connection.makefile("rwb")
+        stream.write(b'{"type": "ready"}\n')
+        stream.flush()
+        stream.readline()
+    return 0
+
+
+def late_worker(host, port):
+    """Starts playing after other workers took their chunks."""
+    time.sleep(0.2)
+    return run_worker(host, port)
+
+
+def recording_worker(chunks, received=None, before=None, after=None):
+    """Returns worker playing chunks like `run_worker` which appends numbers
+    of chunks it gets to `chunks`. Optional events: `received` is set when
+    the first chunk arrives, `before` is waited for before answering it and
+    `after` is set when the worker is done."""
+    def worker(host, port):
+        with socket.create_connection((host, port)) as connection:
+            stream = connection.makefile("rwb")
+            stream.write(b'{"type": "ready"}\n')
+            stream.flush()
+            for line in stream:
+                message = json.loads(line)
+                if message["type"] == "done":
+                    break
+                chunks.append(message["chunk"])
+                if len(chunks) == 1:
+                    if received is not None:
+                        received.set()
+                    if before is not None:
+                        # the timeout only guards against a deadlock
+                        before.wait(60)
+                stream.write((json.dumps(play_chunk(message)) +
+                              "\n").encode())
+                stream.flush()
+        if after is not None:
+            after.set()
+        return len(chunks)
+    return worker
+
+
+def delayed(event, worker):
+    """Returns worker connecting only after the event is set."""
+    def start(host, port):
+        event.wait(60)
+        return worker(host, port)
+    return start
+
+
+class ClusterTest(unittest.TestCase):
+    def setUp(self):
+        self.expected = simulate_parallel(3000, seed=4, workers=1,
+                                          chunk_rounds=250)
+
+    def test_workers_on_localhost(self):
+        """Workers together give the totals of a single-process run"""
+        results, played = run_cluster(
+            Coordinator(3000, seed=4, chunk_rounds=250),
+            [run_worker, run_worker, run_worker])
+        self.assertEqual(self.expected, results)
+        self.assertGreaterEqual(sum(played), 12)
+
+    def test_dead_worker_chunk_reassigned(self):
+        """Chunk of a dead worker is played by another one"""
+        results, played = run_cluster(
+            Coordinator(3000, seed=4, chunk_rounds=250),
+            [dying_worker, dying_worker, late_worker])
+        self.assertEqual(self.expected, results)
+        # chunks of dead workers are played too
+        self.assertEqual(12, played[2])
+
+    def test_slow_worker_work_stolen(self):
+        """Fast worker steals the chunk of a slow one"""
+        reserved = threading.Event()
+        fast_done = threading.Event()
+        slow_chunks = []
+        fast_chunks = []
+        # slow worker reserves a chunk and doesn't answer until the fast
+        # worker, connecting only then, has finished the whole run
+        slow = recording_worker(slow_chunks, received=reserved,
+                                before=fast_done)
+        fast = delayed(reserved,
+                       recording_worker(fast_chunks, after=fast_done))
+
+        results, played = run_cluster(
+            Coordinator(3000, seed=4, chunk_rounds=1500), [slow, fast])
+        self.assertEqual(simulate_parallel(3000, seed=4, workers=1,
+                                           chunk_rounds=1500), results)
+        # fast worker played the remaining chunk and the reserved one
+        self.assertEqual(1, len(slow_chunks))
+        self.assertIn(slow_chunks[0], fast_chunks)
+        self.assertEqual([0, 1], sorted(fast_chunks))
+
+
+if __name__ == "__main__":
+    unittest.main()
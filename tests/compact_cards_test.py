@@ -0,0 +1,41 @@
+import unittest
+import random
+from blackjack import generate_cards, hand_value, card_view
+from blackjack_cards import (CARD_COUNT, CARD_VALUE, CARD_RANK, RANKS, ACE,
+                             new_deck, hand_total, is_soft)
+
+
+class CompactCardsTest(unittest.TestCase):
+    def test_tables_match_generated_cards(self):
+        """Compact tables describe the same cards as generate_cards"""
+        cards = generate_cards()
+        self.assertEqual(len(cards), CARD_COUNT)
+        for index, card in enumerate(cards):
+            self.assertEqual(card['number'], RANKS[CARD_RANK[index]])
+            self.assertEqual(card['values'][-1], CARD_VALUE[index])
+            self.assertEqual(card, card_view(index))
+
+    def test_hand_total_matches_hand_value(self):
+        """Compact hands have the same value as their dictionary views"""
+        rng = random.Random(1)
+        for i in range(2000):
+            hand = rng.sample(range(CARD_COUNT), rng.randint(1, 8))
+            views = [card_view(card) for card in hand]
+            self.assertEqual(hand_value(views), hand_total(hand))
+            self.assertEqual(hand_value(views), hand_value(hand))
+
+    def test_soft_hand(self):
+        """Hand is soft only when an Ace counts as 11"""
+        self.assertTrue(is_soft([ACE, 4]))
+        self.assertFalse(is_soft([ACE, 4, 8]))
+        self.assertFalse(is_soft([3, 4]))
+
+    def test_deck(self):
+        """Deck holds every card once per deck"""
+        deck = new_deck(2)
+        self.assertEqual(2 * CARD_COUNT, len(deck))
+        self.assertEqual(sorted(deck), sorted(list(range(CARD_COUNT)) * 2))
+
+
+if __name__ == "__main__":
+    unittest.main()
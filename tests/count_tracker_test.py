@@ -0,0 +1,55 @@
+import unittest
+import random
+from blackjack import draw_card
+from blackjack_cards import CARD_RANK, RANK_COUNT
+from blackjack_count import CountingShoe, TAG_SYSTEMS
+from blackjack_sim import simulate
+
+
+class CountTrackerTest(unittest.TestCase):
+    def test_running_count_matches_dealt_cards(self):
+        """Running count is the sum of tags of dealt cards"""
+        for name, tags in TAG_SYSTEMS.items():
+            shoe = CountingShoe(2, rng=random.Random(1), tags=name)
+            dealt = [draw_card(shoe) for i in range(70)]
+            expected = sum(tags[CARD_RANK[card]] for card in dealt)
+            self.assertEqual(expected, shoe.running_count)
+
+    def test_balanced_and_unbalanced_systems(self):
+        """Balanced systems end at 0, KO ends at 4 per deck over start"""
+        shoe = CountingShoe(6, cut_card=312, rng=random.Random(2))
+        for i in range(312):
+            shoe.pop()
+        self.assertEqual(0, shoe.running_count)
+
+        shoe = CountingShoe(6, cut_card=312, tags="ko", initial_count=-20)
+        for i in range(312):
+            shoe.pop()
+        self.assertEqual(4, shoe.running_count)
+
+    def test_true_count(self):
+        """True count is running count per remaining deck"""
+        shoe = CountingShoe(4, rng=random.Random(3))
+        for i in range(104):
+            shoe.pop()
+        self.assertEqual(2.0, shoe.decks_remaining)
+        self.assertEqual(shoe.running_count / 2, shoe.true_count)
+        self.assertEqual(104, sum(shoe.composition()))
+
+    def test_count_reset_on_shuffle(self):
+        """New shoe starts with the initial count"""
+        shoe = CountingShoe(1, cut_card=10, rng=random.Random(4))
+        while not shoe.cut_card_reached:
+            shoe.pop()
+        shoe.new_round()
+        self.assertEqual(0, shoe.running_count)
+        self.assertEqual([4] * RANK_COUNT, shoe.rank_counts)
+
+    def test_simulation_with_counting_shoe(self):
+        """Counting shoe is used by the simulator like any other shoe"""
+        results = simulate(300, all_cards=CountingShoe())
+        self.assertEqual(300, results['rounds'])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+import random
+from blackjack import dealer_turn
+from blackjack_cards import RANK_COUNT, ACE, CARD_RANK, new_deck
+from blackjack_hand import Hand
+from blackjack_odds import (dealer_distribution, dealer_cache_info,
+                            dealer_cache_clear, DEALER_OUTCOMES, BUST,
+                            BLACKJACK)
+
+
+def simulate_dealer(upcard, deck, hit_soft17, rounds, seed):
+    """Frequencies of dealer's final hands played by dealer_turn"""
+    rng = random.Random(seed)
+    counts = [0] * len(DEALER_OUTCOMES)
+    for i in range(rounds):
+        cards = bytearray(deck)
+        rng.shuffle(cards)
+        dealer = {"role": "dealer", "hand": Hand([upcard])}
+        dealer_turn(dealer, cards, hit_soft17)
+        hand = dealer['hand']
+        if hand.busted:
+            counts[BUST] += 1
+        elif hand.blackjack:
+            counts[BLACKJACK] += 1
+        else:
+            counts[hand.value - 17] += 1
+    return [count / rounds for count in counts]
+
+
+class DealerDistributionTest(unittest.TestCase):
+    def test_probabilities_sum_to_one(self):
+        """Dealer always finishes on one of the outcomes"""
+        composition = [4] * RANK_COUNT
+        for upcard in range(RANK_COUNT):
+            for hit_soft17 in (False, True):
+                distribution = dealer_distribution(upcard, composition,
+                                                   hit_soft17)
+                self.assertAlmostEqual(1.0, sum(distribution))
+
+    def test_soft17_rule(self):
+        """Dealer with soft 17 stands or draws according to the rule"""
+        sixes = [0] * RANK_COUNT
+        sixes[4] = 1    # single 6 left in the shoe
+        sixes[0] = 1    # and a 2
+        stand = dealer_distribution(ACE, sixes)
+        self.assertAlmostEqual(0.5, stand[0])   # A + 6
+        self.assertAlmostEqual(0.5, stand[2])   # A + 2 + 6
+        hit = dealer_distribution(ACE, sixes, hit_soft17=True)
+        self.assertAlmostEqual(1.0, hit[2])     # A + 6 + 2
+
+    def test_matches_dealer_turn(self):
+        """Exact distribution agrees with dealer_turn played many times"""
+        deck = new_deck()
+        upcard_card = 4     # 6 of hearts
+        deck.remove(upcard_card)
+        composition = [4] * RANK_COUNT
+        composition[CARD_RANK[upcard_card]] -= 1
+
+        exact = dealer_distribution(CARD_RANK[upcard_card], composition)
+        simulated = simulate_dealer(upcard_card, deck, False, 20000, 1)
+        for p, q in zip(exact, simulated):
+            self.assertAlmostEqual(p, q, delta=0.015)
+
+    def test_cache(self):
+        """Repeated queries are served from cache"""
+        dealer_cache_clear()
+        composition = [24] * RANK_COUNT
+        dealer_distribution(8, composition)
+        dealer_distribution(8, composition)
+        self.assertEqual(1, dealer_cache_info().hits)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+import json
+import os
+import random
+import tempfile
+from blackjack_cards import RANKS, hand_total
+from blackjack_count import CountingShoe
+from blackjack_decks import (compile_deck, deck_tables, definition_hash,
+                             load_deck, load_decks, DECK_DEFINITIONS)
+from blackjack_rules import RuleSet
+from blackjack_shoe import Shoe
+from blackjack_sim import simulate, policy_stand_on
+
+TEN = RANKS.index("10")
+
+
+class DeckDefinitionsTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.config = os.path.join(self.directory.name, "decks.json")
+        with open(self.config, "w") as f:
+            json.dump({"red": {"suits": ["hearts", "diamonds"],
+                               "copies": 2},
+                       "extra-aces": {"ranks": list(RANKS) + ["Ace"]}}, f)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_compile_definitions(self):
+        """Definitions are compiled into cards and rank counts"""
+        standard = compile_deck(DECK_DEFINITIONS["standard"])
+        self.assertEqual(bytes(range(52)), standard.cards)
+        self.assertEqual((4,) * 13, standard.rank_counts)
+
+        decks = load_decks(self.config)
+        self.assertEqual(48, len(decks["spanish21"].cards))
+        self.assertNotIn(TEN,
+                         [card % 13 for card in decks["spanish21"].cards])
+        self.assertEqual((4,) * 13, decks["red"].rank_counts)
+        self.assertTrue(all(card < 26 for card in decks["red"].cards))
+        self.assertEqual(8, decks["extra-aces"].rank_counts[12])
+
+    def test_invalid_definitions(self):
+        """Invalid definitions are refused"""
+        for definition in ({"ranks": ["1"]}, {"suits": "hearts"},
+                           {"copies": 0}, {"colour": ["red"]},
+                           {"remove": list(RANKS)}):
+            self.assertRaises(ValueError, compile_deck, definition)
+        self.assertRaises(KeyError, load_deck, "pinochle", self.config)
+
+    def test_equal_definitions_compiled_once(self):
+        """Compiled tables are kept by the hash of the definition"""
+        self.assertEqual(definition_hash({"remove": ["10"], "copies": 1}),
+                         definition_hash({"copies": 1, "remove": ["10"]}))
+        self.assertNotEqual(definition_hash({"remove": ["10"]}),
+                            definition_hash({"remove": ["9"]}))
+
+        tables = deck_tables({"remove": ["10"], "copies": 2}, "spanish21")
+        again = deck_tables({"copies": 2, "remove": ["10"]}, "other")
+        self.assertIs(tables.cards, again.cards)
+        self.assertEqual("other", again.name)
+        self.assertIsNot(tables.cards, deck_tables({"remove": ["9"]}).cards)
+
+    def test_shoe_of_compiled_deck(self):
+        """Shoe deals cards of the deck and counts their ranks"""
+        deck = load_deck("spanish21")
+        shoe = Shoe(2, rng=random.Random(1), deck=deck)
+        self.assertEqual(96, shoe.remaining)
+        self.assertEqual(8, shoe.rank_counts[12])
+        self.assertEqual(0, shoe.rank_counts[TEN])
+        cards = [shoe.pop() for i in range(96)]
+        self.assertEqual(sorted(deck.cards * 2), sorted(cards))
+        self.assertEqual([0] * 13, shoe.rank_counts)
+
+        counting = CountingShoe(1, cut_card=40, deck=deck)
+        self.assertEqual(1.0, counting.decks_remaining)
+
+    def test_game_with_compiled_deck(self):
+        """Hand values and dealer's play work unchanged with any deck"""
+        rules = RuleSet(deck=load_deck("spanish21"))
+        self.assertIn("spanish21", repr(rules))
+        shoe = rules.new_shoe(random.Random(2))
+        results = simulate(2000, policy_stand_on(17), shoe, rules=rules)
+        self.assertEqual(2000, results["PW"] + results["DW"] + results["SO"])
+        self.assertEqual(21, hand_total([12, 9]))     # Ace + Jack
+
+
+if __name__ == "__main__":
+    unittest.main()
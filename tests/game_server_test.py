@@ -0,0 +1,62 @@
+import unittest
+import asyncio
+from blackjack_server import start_server, load_test, INFO, PROMPT
+
+
+async def read_until_prompt(reader):
+    lines = []
+    while True:
+        line = (await reader.readline()).decode().rstrip("\n")
+        lines.append(line)
+        if not line or line.startswith(PROMPT):
+            return lines
+
+
+class GameServerTest(unittest.TestCase):
+    def run_with_server(self, scenario):
+        async def main():
+            server = await start_server(port=0)
+            port = server.sockets[0].getsockname()[1]
+            async with server:
+                return await scenario(port)
+        return asyncio.run(main())
+
+    def test_many_tables(self):
+        """Bots play all their games at concurrent tables"""
+        async def scenario(port):
+            return await load_test(tables=30, games=5, port=port)
+        result = self.run_with_server(scenario)
+        self.assertEqual(150, result['games'])
+
+    def test_invalid_answer(self):
+        """Invalid answer is rejected and the question repeated"""
+        async def scenario(port):
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            await read_until_prompt(reader)
+            writer.write(b"maybe\n")
+            lines = await read_until_prompt(reader)
+            writer.write(b"no\n")
+            farewell = await reader.readline()
+            writer.close()
+            return lines, farewell.decode()
+        lines, farewell = self.run_with_server(scenario)
+        self.assertEqual(INFO + "Incorrect value. Try it again.", lines[0])
+        self.assertTrue(lines[1].startswith(PROMPT))
+        self.assertTrue(farewell.startswith(INFO + "Thanks"))
+
+    def test_slow_table_does_not_stall_others(self):
+        """Tables are served while another player doesn't answer"""
+        async def scenario(port):
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            await read_until_prompt(reader)
+            writer.write(b"yes\n")      # starts a game and stops answering
+            result = await asyncio.wait_for(
+                load_test(tables=5, games=3, port=port), 10)
+            writer.close()
+            return result
+        result = self.run_with_server(scenario)
+        self.assertEqual(15, result['games'])
+
+
+if __name__ == "__main__":
+    unittest.main()
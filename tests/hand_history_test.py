@@ -0,0 +1,76 @@
+import unittest
+import os
+import random
+import tempfile
+from blackjack_cards import ACE, CARD_RANK
+from blackjack_history import HandHistory
+from blackjack_shoe import Shoe
+from blackjack_sim import iter_rounds, policy_stand_on
+
+
+class HandHistoryTest(unittest.TestCase):
+    def setUp(self):
+        self.records = list(iter_rounds(
+            3000, policy_stand_on(16), Shoe(rng=random.Random(1))))
+        self.history = HandHistory()
+        self.history.ingest(self.records, run="test", batch_rounds=700)
+
+    def tearDown(self):
+        self.history.close()
+
+    def test_rounds_are_stored(self):
+        """Stored rounds are the same as ingested ones"""
+        self.assertEqual(3000, len(self.history))
+        self.assertEqual(self.records, self.history.query())
+
+    def test_query_slices(self):
+        """Dealer showed an Ace and the player stood on 16"""
+        expected = [r for r in self.records
+                    if CARD_RANK[r.dealer_cards[0]] == ACE and
+                    r.player_total == 16]
+        self.assertTrue(expected)
+        self.assertEqual(expected,
+                         self.history.query(upcard=ACE, player_total=16))
+        self.assertEqual(expected[:2], self.history.query(
+            limit=2, upcard=ACE, player_total=16))
+
+        stiffs = [r for r in self.records
+                  if r.result == "DW" and 12 <= r.player_total <= 16]
+        self.assertEqual(stiffs, self.history.query(
+            result="DW", player_total=range(12, 17)))
+        self.assertRaises(ValueError, self.history.query, cards=5)
+
+    def test_summary(self):
+        """Aggregates are computed by the database"""
+        summary = self.history.summary()
+        self.assertEqual(3000, summary['rounds'])
+        self.assertAlmostEqual(sum(r.payout for r in self.records),
+                               summary['net'])
+        self.assertEqual(sum(1 for r in self.records if r.result == "SO"),
+                         summary['SO'])
+        self.assertEqual(0, self.history.summary(run="other")['rounds'])
+
+        by_upcard = self.history.by_upcard()
+        self.assertEqual(13, len(by_upcard))
+        self.assertEqual(3000, sum(s['rounds'] for s in by_upcard.values()))
+
+    def test_indexes(self):
+        """Queries by upcard, player total and result use indexes"""
+        for column in ("upcard", "player_total", "result"):
+            plan = self.history.connection.execute(
+                "EXPLAIN QUERY PLAN SELECT * FROM hands WHERE {} = 1"
+                .format(column)).fetchall()
+            self.assertIn("hands_" + column, str(plan))
+
+    def test_history_file(self):
+        """History persists in a database file"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "history.db")
+            with HandHistory(path) as history:
+                history.ingest(self.records[:100])
+            with HandHistory(path) as history:
+                self.assertEqual(self.records[:100], history.query())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import unittest
+import os
+import tempfile
+import random
+from blackjack_shoe import Shoe
+from blackjack_sim import simulate
+from blackjack_hand import Hand
+from blackjack_records import (HandRecordWriter, iter_records, read_records,
+                               RECORD, FILE_HEADER, np)
+
+
+class HandRecordsTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "hands.bjhr")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_write_and_read_round(self):
+        """Written round is read back unchanged"""
+        with HandRecordWriter(self.path, seed=42) as writer:
+            writer.write(Hand([12, 9]), Hand([8, 5]), "PW", 1.5)
+        records = list(iter_records(self.path))
+        self.assertEqual(1, len(records))
+        record = records[0]
+        self.assertEqual(42, record['seed'])
+        self.assertEqual(bytes([12, 9]), record['player_cards'])
+        self.assertEqual(bytes([8, 5]), record['dealer_cards'])
+        self.assertEqual((21, 17), (record['player_total'],
+                                    record['dealer_total']))
+        self.assertEqual("PW", record['result'])
+        self.assertEqual(1.5, record['payout'])
+
+    def test_payout_read_back_exactly(self):
+        """Payouts like 6:5 blackjack are read back without rounding"""
+        with HandRecordWriter(self.path) as writer:
+            writer.write(Hand([12, 9]), Hand([8, 5]), "PW", 1.2)
+            writer.write(Hand([8, 6]), Hand([8, 7]), "DW", -0.5)
+        payouts = [r['payout'] for r in iter_records(self.path)]
+        self.assertEqual([1.2, -0.5], payouts)
+        if np is not None:
+            self.assertEqual([1.2, -0.5],
+                             read_records(self.path)['payout'].tolist())
+
+    def test_fixed_width_chunked_file(self):
+        """File grows by whole chunks of fixed-width records"""
+        with HandRecordWriter(self.path, chunk_records=100) as writer:
+            results = simulate(250, all_cards=Shoe(rng=random.Random(1)),
+                               writer=writer)
+            self.assertEqual(FILE_HEADER.size + 200 * RECORD.size,
+                             os.path.getsize(self.path))
+        self.assertEqual(FILE_HEADER.size + 250 * RECORD.size,
+                         os.path.getsize(self.path))
+
+        records = list(iter_records(self.path))
+        self.assertEqual(list(range(250)), [r['round'] for r in records])
+        self.assertEqual(results['net'], sum(r['payout'] for r in records))
+        self.assertEqual(results['PW'],
+                         sum(1 for r in records if r['result'] == "PW"))
+
+    def test_append(self):
+        """Records are appended to an existing file"""
+        for i in range(2):
+            with HandRecordWriter(self.path) as writer:
+                simulate(10, writer=writer)
+        rounds = [r['round'] for r in iter_records(self.path)]
+        self.assertEqual(list(range(20)), rounds)
+
+    @unittest.skipIf(np is None, "NumPy is not installed")
+    def test_memory_mapped(self):
+        """Records can be mapped as a NumPy structured array"""
+        with HandRecordWriter(self.path) as writer:
+            results = simulate(300, writer=writer)
+        records = read_records(self.path)
+        self.assertEqual(300, len(records))
+        self.assertEqual(results['net'], float(records['payout'].sum()))
+        self.assertEqual(results['player_bust'],
+                         int((records['player_total'] > 21).sum()))
+
+
+if __name__ == "__main__":
+    unittest.main()
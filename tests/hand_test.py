@@ -0,0 +1,59 @@
+import unittest
+import random
+from blackjack import dealer_turn
+from blackjack_cards import CARD_COUNT, ACE, hand_total, is_soft
+from blackjack_hand import Hand
+
+
+class HandTest(unittest.TestCase):
+    def test_value_follows_appended_cards(self):
+        """Maintained value is the same as value counted from scratch"""
+        rng = random.Random(1)
+        for i in range(500):
+            hand = Hand()
+            for card in rng.sample(range(CARD_COUNT), 8):
+                hand.append(card)
+                self.assertEqual(hand_total(hand), hand.value)
+                self.assertEqual(is_soft(hand), hand.soft)
+                self.assertEqual(hand_total(hand) > 21, hand.busted)
+
+    def test_pop_and_clear(self):
+        """Removing cards keeps totals in sync"""
+        hand = Hand([ACE, 5, 8])
+        hand.pop()
+        self.assertEqual(18, hand.value)
+        self.assertTrue(hand.soft)
+        hand.clear()
+        self.assertEqual(0, hand.value)
+        self.assertFalse(hand.soft)
+
+    def test_blackjack(self):
+        """Only Ace and a ten-valued card as first two cards is blackjack"""
+        self.assertTrue(Hand([ACE, 11]).blackjack)
+        self.assertFalse(Hand([ACE, 4, 5]).blackjack)
+        self.assertFalse(Hand([8, 9]).blackjack)
+
+
+class DealerSoft17Test(unittest.TestCase):
+    def test_dealer_stands_on_soft17(self):
+        """By default dealer stands on soft 17"""
+        dealer = {"role": "dealer", "hand": Hand([ACE, 4])}   # Ace + 6
+        dealer_turn(dealer, bytearray([8]))
+        self.assertEqual(2, len(dealer['hand']))
+
+    def test_dealer_draws_on_soft17(self):
+        """With soft17_draw dealer draws on soft 17 but not on hard 17"""
+        dealer = {"role": "dealer", "hand": Hand([ACE, 4])}   # Ace + 6
+        dealer_turn(dealer, bytearray([8]), soft17_draw=True)
+        self.assertEqual(17, dealer['hand'].value)
+        self.assertEqual(3, len(dealer['hand']))
+
+        dealer = {"role": "dealer", "hand": [{"abbr": "K", "values": (10, )},
+                                             {"abbr": "7", "values": (7, )}]}
+        dealer_turn(dealer, [{"abbr": "2", "values": (2, )}],
+                    soft17_draw=True)
+        self.assertEqual(2, len(dealer['hand']))
+
+
+if __name__ == "__main__":
+    unittest.main()
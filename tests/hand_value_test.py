@@ -35,6 +35,10 @@ class HandValueTest(unittest.TestCase):
             (
                 [{"values": (11, 1)}, {"values": (9,)}, {"values": (11, 1)}],
                 21
+            ),
+            (
+                [{"values": (10,)}, {"values": (11, 1)}, {"values": (11, 1)}],
+                12
             )
         ]
 
@@ -0,0 +1,82 @@
+import unittest
+import os
+import tempfile
+from blackjack_cli import (user_input, user_choice, io_session, ScriptedInput,
+                           RecordingInput, BufferedOutput, discard_output,
+                           load_sessions, save_sessions, rule_greater,
+                           INCORRECT_CHOICE, INVALID_INPUT)
+from blackjack_replay import replay_sessions, record_session
+
+
+class InputSourcesTest(unittest.TestCase):
+    def test_user_choice_from_script(self):
+        """Scripted answers are validated like terminal input"""
+        output = BufferedOutput()
+        choice = user_choice(source=ScriptedInput(["maybe", "YES"]),
+                             sink=output)
+        self.assertEqual("y", choice)
+        self.assertEqual([INCORRECT_CHOICE], output.lines)
+
+    def test_user_input_from_script(self):
+        """Rulesets are applied to scripted input"""
+        output = BufferedOutput()
+        value = user_input("Number: ", int, [rule_greater(10)],
+                           source=ScriptedInput(["abc", "5", "42"]),
+                           sink=output)
+        self.assertEqual(42, value)
+        self.assertEqual([INVALID_INPUT, INVALID_INPUT], output.lines)
+
+    def test_io_session(self):
+        """Session replaces input and output and restores them afterwards"""
+        recorder = RecordingInput(ScriptedInput(["n"]))
+        with io_session(recorder, discard_output):
+            self.assertEqual("n", user_choice())
+        self.assertEqual(["n"], recorder.answers)
+        with io_session(ScriptedInput([])):
+            self.assertRaises(EOFError, user_choice)
+
+    def test_replay_session_file(self):
+        """Recorded sessions are replayed from a file"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "sessions.jsonl")
+            record_session(path, source=ScriptedInput(["y", "n", "n"]),
+                           sink=discard_output)
+            save_sessions(path, [["yes", "no", "yes", "no", "no"], ["y"]])
+            self.assertEqual(3, len(load_sessions(path)))
+
+            output = BufferedOutput()
+            result = replay_sessions(path, sink=output, seed=1)
+        self.assertEqual(3, result['sessions'])
+        self.assertEqual(1, result['incomplete'])
+        self.assertIn("** GAME RESULTS **", output.lines)
+
+    def test_replay_recorded_session(self):
+        """Recorded session is replayed with its own shoe"""
+        answers = ["y", "n", "y", "y", "n", "n"]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "sessions.jsonl")
+            recorded = BufferedOutput()
+            record_session(path, source=ScriptedInput(answers),
+                           sink=recorded, seed=4)
+            session = load_sessions(path)[0]
+            self.assertEqual({"seed": 4, "answers": answers}, session)
+
+            replayed = BufferedOutput()
+            result = replay_sessions(path, sink=replayed, seed=3)
+        self.assertEqual(0, result["incomplete"])
+        self.assertIn("** GAME RESULTS **", replayed.lines)
+        self.assertEqual(recorded.lines, replayed.lines)
+
+    def test_replay_is_reproducible(self):
+        """Replay with a seed gives the same output"""
+        sessions = [["y", "y", "n", "y", "n", "n"]] * 20
+        outputs = []
+        for i in range(2):
+            output = BufferedOutput()
+            replay_sessions(sessions, sink=output, seed=7)
+            outputs.append(output.lines)
+        self.assertEqual(outputs[0], outputs[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
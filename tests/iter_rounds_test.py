@@ -0,0 +1,47 @@
+import unittest
+import random
+from itertools import islice
+from blackjack import hand_value
+from blackjack_cards import shuffled_deck
+from blackjack_rules import RuleSet
+from blackjack_shoe import Shoe
+from blackjack_sim import iter_rounds, simulate, RoundRecord
+
+
+class IterRoundsTest(unittest.TestCase):
+    def test_same_rounds_as_simulate(self):
+        """Streamed rounds aggregate to the results of simulate"""
+        results = simulate(1000, all_cards=Shoe(rng=random.Random(1)))
+        records = list(iter_rounds(1000,
+                                   all_cards=Shoe(rng=random.Random(1))))
+        self.assertEqual(1000, len(records))
+        for code in ("PW", "DW", "SO"):
+            self.assertEqual(results[code],
+                             sum(1 for r in records if r.result == code))
+        self.assertEqual(results['net'], sum(r.payout for r in records))
+
+    def test_records(self):
+        """Records are immutable and consistent"""
+        for record in iter_rounds(200, all_cards=shuffled_deck(),
+                                  rules=RuleSet()):
+            self.assertIsInstance(record, RoundRecord)
+            self.assertEqual(hand_value(list(record.player_cards)),
+                             record.player_total)
+            self.assertEqual(hand_value(list(record.dealer_cards)),
+                             record.dealer_total)
+            with self.assertRaises(AttributeError):
+                record.result = "PW"
+
+    def test_lazy_early_stop(self):
+        """Only requested rounds are played"""
+        shoe = Shoe(rng=random.Random(2))
+        rounds = iter_rounds(all_cards=shoe)
+        self.assertEqual(len(shoe.cards), shoe.remaining)
+        first = list(islice(rounds, 5))
+        dealt = sum(len(r.player_cards) + len(r.dealer_cards) for r in first)
+        self.assertEqual([0, 1, 2, 3, 4], [r.number for r in first])
+        self.assertEqual(len(shoe.cards) - dealt, shoe.remaining)
+
+
+if __name__ == "__main__":
+    unittest.main()
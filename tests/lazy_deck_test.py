@@ -0,0 +1,53 @@
+import unittest
+import random
+from collections import Counter
+from blackjack import generate_cards, prepare_deck, draw_card
+from blackjack_cards import new_deck, shuffled_deck
+from blackjack_shoe import LazyDeck
+from blackjack_sim import simulate
+
+
+class LazyDeckTest(unittest.TestCase):
+    def test_same_cards_as_full_shuffle(self):
+        """Lazy deck draws the same cards as a shuffled deck"""
+        for cards in (new_deck(2), generate_cards()):
+            for seed in range(20):
+                full = prepare_deck(cards, random.Random(seed))
+                lazy = prepare_deck(cards, random.Random(seed), lazy=True)
+                self.assertEqual([draw_card(full) for i in range(len(full))],
+                                 [draw_card(lazy) for i in range(len(lazy))])
+
+    def test_source_cards_untouched(self):
+        """Cards given to the deck are copied"""
+        cards = new_deck()
+        deck = LazyDeck(cards)
+        for i in range(30):
+            deck.pop()
+        self.assertEqual(new_deck(), cards)
+
+    def test_empty_deck(self):
+        """Like a list, empty deck raises IndexError"""
+        deck = LazyDeck(bytearray([1, 2]))
+        self.assertEqual({1, 2}, {deck.pop(), deck.pop()})
+        self.assertEqual(0, len(deck))
+        self.assertRaises(IndexError, deck.pop)
+
+    def test_uniform_cards(self):
+        """Every card is drawn first about equally often"""
+        rng = random.Random(1)
+        cards = bytearray(range(13))
+        first = Counter(LazyDeck(cards, rng).pop() for i in range(13000))
+        self.assertEqual(13, len(first))
+        for count in first.values():
+            self.assertTrue(850 < count < 1150)
+
+    def test_simulation_with_lazy_decks(self):
+        """Lazy decks give the same first round as shuffled decks"""
+        deck = shuffled_deck()
+        lazy = simulate(1, all_cards=deck, rng=random.Random(2))
+        full = simulate(1, all_cards=deck, rng=random.Random(2), lazy=False)
+        self.assertEqual(full, lazy)
+
+
+if __name__ == "__main__":
+    unittest.main()
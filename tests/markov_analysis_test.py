@@ -0,0 +1,90 @@
+import unittest
+import math
+import random
+from blackjack_decks import deck_tables
+from blackjack_markov import (analyze, dealer_final, example_hand,
+                              rank_probabilities, HARD_TOTALS, np)
+from blackjack_odds import dealer_distribution
+from blackjack_rules import RuleSet, BUST, BLACKJACK
+from blackjack_shoe import Shoe
+from blackjack_sim import simulate, policy_stand_on, policy_never_draw
+
+
+@unittest.skipIf(np is None, "NumPy is not installed")
+class MarkovAnalysisTest(unittest.TestCase):
+    def test_example_hands(self):
+        """Example hands have the hand key they stand for"""
+        for key in range(2 * HARD_TOTALS):
+            hand = example_hand(key)
+            if hand is None:
+                continue
+            self.assertEqual(key % HARD_TOTALS, hand.hard)
+            self.assertEqual(key >= HARD_TOTALS, hand.aces > 0)
+            self.assertGreaterEqual(len(hand), 2)
+
+    def test_dealer_matches_exact_distribution(self):
+        """Dealer agrees with exact probabilities of a huge shoe"""
+        for hit_soft17 in (False, True):
+            for upcard in range(13):
+                composition = [1000] * 13
+                composition[upcard] -= 1
+                exact = dealer_distribution(upcard, tuple(composition),
+                                            hit_soft17)
+                final = dealer_final(upcard, RuleSet(hit_soft17=hit_soft17))
+                markov = [final[total] for total in range(17, 22)]
+                markov += [final[BLACKJACK], final[BUST]]
+                for a, b in zip(exact, markov):
+                    self.assertAlmostEqual(a, b, delta=0.001)
+
+    def test_probabilities(self):
+        """Results are probabilities of all rounds"""
+        result = analyze()
+        self.assertAlmostEqual(1, result['PW'] + result['DW'] + result['SO'])
+        self.assertAlmostEqual(2 * 4 / 169, result['player_blackjack'])
+        self.assertEqual(13, len(result['by_upcard']))
+        self.assertAlmostEqual(-result['house_edge'],
+                               sum(result['by_upcard']) / 13)
+
+    def test_rule_variants(self):
+        """Worse rules give higher house edge"""
+        base = analyze()['house_edge']
+        self.assertGreater(analyze(rules=RuleSet(hit_soft17=True))
+                           ['house_edge'], base)
+        self.assertGreater(analyze(rules=RuleSet(blackjack_payout=1.2))
+                           ['house_edge'], base)
+
+    def test_agrees_with_monte_carlo(self):
+        """Expected value agrees with simulation within statistical error"""
+        rounds = 20000
+        for policy in (policy_stand_on(17), policy_never_draw):
+            results = simulate(rounds, policy,
+                               Shoe(8, rng=random.Random(1)))
+            error = 1.15 / math.sqrt(rounds)
+            self.assertAlmostEqual(analyze(policy)['expected_value'],
+                                   results['net'] / rounds, delta=4 * error)
+
+
+    def test_deck_of_rules(self):
+        """Ranks are drawn with probabilities of the deck of the rules and
+        the expected value agrees with simulation of that deck"""
+        deck = deck_tables({"remove": ["10", "Jack", "Queen", "King"]},
+                           "no-tens")
+        rules = RuleSet(decks=8, deck=deck)
+        probabilities = rank_probabilities(rules)
+        self.assertAlmostEqual(1 / 9, probabilities[0])
+        self.assertEqual(0, probabilities[8])
+
+        result = analyze(rules=rules)
+        self.assertEqual(0, result['player_blackjack'])
+        self.assertLess(result['house_edge'], analyze()['house_edge'] - 0.01)
+
+        rounds = 20000
+        results = simulate(rounds, all_cards=rules.new_shoe(random.Random(1)),
+                           rules=rules)
+        error = 1.15 / math.sqrt(rounds)
+        self.assertAlmostEqual(result['expected_value'],
+                               results['net'] / rounds, delta=4 * error)
+
+
+if __name__ == "__main__":
+    unittest.main()
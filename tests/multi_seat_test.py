@@ -0,0 +1,77 @@
+import unittest
+import random
+from blackjack import (generate_cards, draw_card, deal_cards, new_table,
+                       resolve_table, play_game, MAX_SEATS)
+from blackjack_cli import io_session, ScriptedInput, discard_output
+from blackjack_cards import shuffled_deck
+from blackjack_count import CountingShoe
+from blackjack_shoe import Shoe
+
+
+class MultiSeatTest(unittest.TestCase):
+    def test_deal_cards_like_draw_card(self):
+        """Cards dealt at once come in the order of repeated draw_card"""
+        deck = shuffled_deck(rng=random.Random(1))
+        copy = deck[:]
+        self.assertEqual([draw_card(copy) for i in range(16)],
+                         list(deal_cards(deck, 16)))
+        self.assertEqual(copy, deck)
+
+        shoe, copy = Shoe(rng=random.Random(2)), Shoe(rng=random.Random(2))
+        self.assertEqual([draw_card(copy) for i in range(16)],
+                         list(deal_cards(shoe, 16)))
+        self.assertEqual(copy.rank_counts, shoe.rank_counts)
+
+    def test_deal_cards_updates_count(self):
+        """Counting shoe counts cards dealt at once"""
+        shoe = CountingShoe(1, rng=random.Random(3))
+        copy = CountingShoe(1, rng=random.Random(3))
+        deal_cards(shoe, 50)
+        for i in range(50):
+            copy.pop()
+        self.assertEqual(copy.running_count, shoe.running_count)
+        deal_cards(shoe, 4)     # past the end of the shoe
+        self.assertEqual(50, shoe.remaining)
+
+    def test_number_of_seats(self):
+        """Table has 1-7 seats and the dealer is the last one"""
+        players = new_table(["Player {}".format(i) for i in range(MAX_SEATS)])
+        self.assertEqual(MAX_SEATS + 1, len(players))
+        self.assertEqual("dealer", players[-1]['role'])
+        self.assertRaises(ValueError, new_table, [])
+        self.assertRaises(ValueError, new_table, ["A"] * (MAX_SEATS + 1))
+
+    def test_every_seat_resolved_against_dealer(self):
+        """Every seat has its own result"""
+        players = new_table(["Ann", "Bob", "Cecil"])
+        players[0]['hand'].extend([8, 7])       # 10 + 9
+        players[1]['hand'].extend([8, 8, 8])    # busted
+        players[2]['hand'].extend([8, 5])       # 10 + 7
+        players[3]['hand'].extend([8, 6])       # dealer 10 + 8
+        results = resolve_table(players)
+        self.assertEqual(["Ann", "Bob", "Cecil"],
+                         [result['name'] for result in results])
+        self.assertEqual(["PW", "DW", "DW"],
+                         [result['result'] for result in results])
+        self.assertEqual([19, 30, 17],
+                         [result['points'] for result in results])
+
+    def test_play_game_with_shared_shoe(self):
+        """Seats share the shoe and results are returned"""
+        shoe = Shoe(2, rng=random.Random(4))
+        with io_session(ScriptedInput(["n"] * 10), discard_output):
+            results = play_game(shoe, ["Ann", "Bob", "Cecil", "Dan"])
+        self.assertEqual(4, len(results))
+        self.assertEqual(1, shoe.shuffles)
+        self.assertGreaterEqual(2 * 52 - shoe.remaining, 10)
+
+    def test_play_game_with_dictionary_cards(self):
+        """Game is still playable with dictionary cards"""
+        with io_session(ScriptedInput(["n"] * 10), discard_output):
+            results = play_game(generate_cards(), ["Ann", "Bob"])
+        self.assertEqual(["Ann", "Bob"],
+                         [result['name'] for result in results])
+
+
+if __name__ == "__main__":
+    unittest.main()
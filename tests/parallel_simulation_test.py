@@ -0,0 +1,35 @@
+import unittest
+from blackjack_parallel import simulate_parallel, split_rounds
+from blackjack_strategy import solve_strategy
+
+
+class ParallelSimulationTest(unittest.TestCase):
+    def test_chunks_cover_all_rounds(self):
+        """Chunks together contain every round exactly once"""
+        chunks = split_rounds(10001, 1000)
+        self.assertEqual(11, len(chunks))
+        self.assertEqual(10001, sum(size for chunk, size in chunks))
+
+    def test_same_totals_regardless_of_workers(self):
+        """Run with a given seed gives identical totals for any worker count"""
+        single = simulate_parallel(2000, seed=3, workers=1, chunk_rounds=250)
+        pooled = simulate_parallel(2000, seed=3, workers=3, chunk_rounds=250)
+        self.assertEqual(single, pooled)
+        self.assertEqual(2000, pooled['rounds'])
+
+    def test_seed_changes_results(self):
+        """Different seeds give different runs"""
+        a = simulate_parallel(2000, seed=1, workers=1, chunk_rounds=500)
+        b = simulate_parallel(2000, seed=2, workers=1, chunk_rounds=500)
+        self.assertNotEqual(a, b)
+
+    def test_strategy_policy_in_workers(self):
+        """Solved strategy can be sent to worker processes"""
+        strategy = solve_strategy(6)
+        results = simulate_parallel(500, strategy, seed=1, workers=2,
+                                    chunk_rounds=100)
+        self.assertEqual(500, results['rounds'])
+
+
+if __name__ == "__main__":
+    unittest.main()
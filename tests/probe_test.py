@@ -0,0 +1,46 @@
+import unittest
+import blackjack_probe
+from blackjack_rules import RuleSet
+from blackjack_sim import simulate
+
+
+class ProbeTest(unittest.TestCase):
+    def setUp(self):
+        blackjack_probe.reset()
+
+    def tearDown(self):
+        blackjack_probe.disable()
+        blackjack_probe.reset()
+
+    def test_disabled_probes_collect_nothing(self):
+        """No statistics are collected when probes are disabled"""
+        simulate(50)
+        for phase_stats in blackjack_probe.stats().values():
+            self.assertEqual(0, phase_stats['calls'])
+
+    def test_enabled_probes_count_phases(self):
+        """Every phase of every round is recorded"""
+        blackjack_probe.enable()
+        simulate(200)
+        stats = blackjack_probe.stats()
+        for phase in blackjack_probe.PHASES:
+            self.assertEqual(200, stats[phase]['calls'])
+            self.assertGreater(stats[phase]['total_s'], 0)
+
+    def test_enabled_probes_with_rules(self):
+        """Rounds played by a rule set are recorded too"""
+        blackjack_probe.enable()
+        simulate(100, rules=RuleSet())
+        stats = blackjack_probe.stats()
+        for phase in blackjack_probe.PHASES:
+            self.assertEqual(100, stats[phase]['calls'])
+
+    def test_profile(self):
+        """Profile of a simulation run is captured"""
+        results, profile = blackjack_probe.profile(simulate, 100)
+        self.assertEqual(100, results['rounds'])
+        self.assertGreater(profile.total_calls, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+import unittest
+import random
+from blackjack import dealer_turn, resolve_game
+from blackjack_cards import shuffled_deck
+from blackjack_hand import Hand
+from blackjack_rules import RuleSet
+from blackjack_sim import (simulate, iter_rounds, play_round_rules,
+                          policy_stand_on)
+
+
+class RuleSetTest(unittest.TestCase):
+    def test_dealer_draw_table(self):
+        """Dealer draws like dealer_turn under both soft 17 rules"""
+        for hit_soft17 in (False, True):
+            rules = RuleSet(hit_soft17=hit_soft17)
+            for seed in range(200):
+                deck = shuffled_deck(rng=random.Random(seed))
+                copy = deck[:]
+                hand = Hand([deck.pop()])
+                rules.dealer_play(hand, deck)
+                dealer = {"role": "dealer", "hand": Hand([copy.pop()])}
+                dealer_turn(dealer, copy, hit_soft17)
+                self.assertEqual(list(dealer['hand']), list(hand))
+
+    def test_settlement_table(self):
+        """Settlement table gives the same codes as resolve_game"""
+        rules = RuleSet()
+        rng = random.Random(1)
+        for i in range(2000):
+            deck = shuffled_deck(rng=rng)
+            player = Hand([deck.pop() for j in range(rng.randint(2, 3))])
+            dealer = Hand([deck.pop() for j in range(rng.randint(2, 3))])
+            code, payout = rules.settle(player, dealer)
+            expected = resolve_game({"hand": player}, {"hand": dealer})[0]
+            self.assertEqual(expected, code)
+            if player.blackjack and not dealer.blackjack:
+                self.assertEqual(1.5, payout)
+
+    def test_blackjack_payout(self):
+        """6:5 blackjack lowers the net result"""
+        results = [simulate(2000, rules=RuleSet(blackjack_payout=payout),
+                            all_cards=RuleSet().new_shoe(random.Random(2)))
+                   for payout in (1.5, 1.2)]
+        self.assertEqual(results[0]['PW'], results[1]['PW'])
+        # every won blackjack pays 0.3 less
+        blackjacks = (results[0]['net'] - results[1]['net']) / 0.3
+        self.assertAlmostEqual(round(blackjacks), blackjacks)
+        self.assertGreater(blackjacks, 0)
+        self.assertLessEqual(round(blackjacks), results[0]['player_blackjack'])
+
+    def test_double_and_split_options(self):
+        """Double and split options are looked up in tables"""
+        rules = RuleSet(double="10-11", double_after_split=False, max_hands=2)
+        self.assertTrue(rules.can_double(Hand([2, 5])))         # 4 + 7
+        self.assertFalse(rules.can_double(Hand([2, 5]), split=True))
+        self.assertFalse(rules.can_double(Hand([12, 5])))       # soft 18
+        self.assertFalse(rules.can_double(Hand([0, 5])))        # 9
+        self.assertTrue(rules.can_split(Hand([8, 9])))          # 10 + J
+        self.assertFalse(rules.can_split(Hand([8, 9]), hands=2))
+        self.assertFalse(rules.can_split(Hand([12, 25]), aces=True))
+        self.assertRaises(ValueError, RuleSet, double="some")
+        self.assertRaises(ValueError, RuleSet, surrender="always")
+
+    def test_surrender_option(self):
+        """Surrender is allowed by the option and pays half of the bet"""
+        late = RuleSet(surrender="late")
+        early = RuleSet(surrender="early")
+        dealer_blackjack = Hand([12, 8])
+        self.assertFalse(RuleSet().can_surrender(Hand([8, 6]), Hand([8, 7])))
+        self.assertTrue(late.can_surrender(Hand([8, 6]), Hand([8, 7])))
+        self.assertFalse(late.can_surrender(Hand([8, 6]), dealer_blackjack))
+        self.assertTrue(early.can_surrender(Hand([8, 6]), dealer_blackjack))
+        self.assertFalse(late.can_surrender(Hand([8, 6]), Hand([8, 7]),
+                                            split=True))
+        self.assertFalse(late.can_surrender(Hand([8, 2, 2]), Hand([8, 7])))
+        self.assertIn("LS", repr(late))
+
+        # 10 + 6 against 10 + 7 (cards are drawn from the end) is
+        # surrendered, nobody draws
+        deck = [8, 5, 4, 8, 8]
+        player, dealer, result = play_round_rules(deck, policy_stand_on(17),
+                                                  late)
+        self.assertEqual(("DW", -0.5), result)
+        self.assertEqual(2, len(player['hand']))
+        self.assertEqual(2, len(dealer['hand']))
+        deck = [8, 5, 4, 8, 8]
+        player, dealer, result = play_round_rules(deck, policy_stand_on(17),
+                                                  late, surrender=None)
+        self.assertEqual(("DW", -1), result)
+
+        surrendered = [record for record in iter_rounds(
+            3000, rules=late, all_cards=late.new_shoe(random.Random(4)))
+            if record.payout == -0.5]
+        self.assertTrue(surrendered)
+        for record in surrendered:
+            self.assertEqual(2, len(record.player_cards))
+            self.assertIn(record.player_total, (15, 16))
+
+    def test_rules_round(self):
+        """Round played by rules has a consistent result"""
+        rules = RuleSet(decks=2, penetration=0.5)
+        shoe = rules.new_shoe(random.Random(3))
+        self.assertEqual(52, shoe.cut_card)
+        self.assertEqual("RuleSet(2D S17 3:2 DA DAS SP4 PEN0.5)", repr(rules))
+        player, dealer, (code, payout) = play_round_rules(
+            shoe, policy_stand_on(17), rules)
+        self.assertEqual(resolve_game(player, dealer)[0], code)
+
+
+if __name__ == "__main__":
+    unittest.main()
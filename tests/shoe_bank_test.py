@@ -0,0 +1,74 @@
+import unittest
+import os
+import tempfile
+from blackjack_bank import write_bank, ShoeBank, BankShoe
+from blackjack_cards import new_deck
+from blackjack_parallel import simulate_parallel
+from blackjack_sim import simulate
+
+
+class ShoeBankTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "bank.bjsb")
+        write_bank(self.path, 40, decks=2, seed=1)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_shoes_are_shuffled_decks(self):
+        """Every shoe holds all cards of its decks"""
+        with ShoeBank(self.path) as bank:
+            self.assertEqual(40, len(bank))
+            for shoe in range(len(bank)):
+                self.assertEqual(sorted(new_deck(2)), sorted(bank[shoe]))
+            self.assertNotEqual(bank[0], bank[1])
+            self.assertRaises(IndexError, bank.__getitem__, 40)
+
+    def test_same_bank_from_same_seed(self):
+        """Bank is given by its seed"""
+        path = os.path.join(self.directory.name, "copy.bjsb")
+        write_bank(path, 40, decks=2, seed=1)
+        with open(self.path, "rb") as a, open(path, "rb") as b:
+            self.assertEqual(a.read(), b.read())
+
+    def test_bank_shoe_deals_bank_shoes(self):
+        """Bank shoe deals shoes of the bank one after another"""
+        with ShoeBank(self.path) as bank:
+            shoe = BankShoe(bank, first=3, step=10, cut_card=80)
+            self.assertEqual(bytes(bank[3][:5]),
+                             bytes(shoe.pop() for i in range(5)))
+            while not shoe.cut_card_reached:
+                shoe.pop()
+            shoe.new_round()
+            self.assertEqual(bank[13][0], shoe.pop())
+            shoe.shuffle()      # shoe 23
+            shoe.shuffle()      # shoe 33
+            self.assertRaises(IndexError, shoe.shuffle)
+
+    def test_reproducible_simulation(self):
+        """Runs from the same bank give the same results"""
+        with ShoeBank(self.path) as bank:
+            a = simulate(300, all_cards=BankShoe(bank))
+        with ShoeBank(self.path) as bank:
+            b = simulate(300, all_cards=BankShoe(bank))
+        self.assertEqual(a, b)
+
+    def test_parallel_simulation_from_bank(self):
+        """Workers deal from the shared bank, results don't depend on them"""
+        single = simulate_parallel(400, workers=1, chunk_rounds=100,
+                                   bank=self.path)
+        pooled = simulate_parallel(400, workers=2, chunk_rounds=100,
+                                   bank=self.path)
+        self.assertEqual(single, pooled)
+
+    def test_not_a_bank(self):
+        """Other files are refused"""
+        path = os.path.join(self.directory.name, "other")
+        with open(path, "wb") as f:
+            f.write(b"something else entirely")
+        self.assertRaises(ValueError, ShoeBank, path)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+import unittest
+import random
+from blackjack import draw_card
+from blackjack_cards import CARD_COUNT, CARD_RANK, RANK_COUNT
+from blackjack_shoe import Shoe
+
+
+class ShoeTest(unittest.TestCase):
+    def test_number_of_decks(self):
+        """Shoe holds 1-8 decks"""
+        for decks in range(1, 9):
+            shoe = Shoe(decks)
+            self.assertEqual(decks * CARD_COUNT, shoe.remaining)
+            self.assertEqual([4 * decks] * RANK_COUNT, shoe.rank_counts)
+        self.assertRaises(ValueError, Shoe, 0)
+        self.assertRaises(ValueError, Shoe, 9)
+
+    def test_rank_counts_follow_dealt_cards(self):
+        """Per-rank counts are updated by every dealt card"""
+        shoe = Shoe(2, rng=random.Random(1))
+        dealt = [draw_card(shoe) for i in range(50)]
+        for rank in range(RANK_COUNT):
+            dealt_rank = sum(1 for card in dealt if CARD_RANK[card] == rank)
+            self.assertEqual(8 - dealt_rank, shoe.rank_counts[rank])
+        self.assertEqual(2 * CARD_COUNT - 50, shoe.remaining)
+
+    def test_reshuffle_at_cut_card(self):
+        """Shoe is reshuffled only when a game starts after the cut card"""
+        shoe = Shoe(1, cut_card=39)
+        for i in range(38):
+            shoe.pop()
+        self.assertFalse(shoe.new_round())
+        shoe.pop()
+        self.assertTrue(shoe.cut_card_reached)
+        self.assertTrue(shoe.new_round())
+        self.assertEqual(CARD_COUNT, shoe.remaining)
+        self.assertEqual(2, shoe.shuffles)
+
+    def test_penetration(self):
+        """Cut card is placed according to penetration"""
+        self.assertEqual(156, Shoe(4, penetration=0.75).cut_card)
+        self.assertRaises(ValueError, Shoe, 1, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+import random
+from blackjack import hand_value
+from blackjack_cards import shuffled_deck
+from blackjack_rules import RuleSet
+from blackjack_shoe import Shoe
+from blackjack_sim import (simulate, play_round, policy_stand_on,
+                           policy_never_draw, policy_table, new_results,
+                           record_round, _stand_on)
+
+
+class SimulateTest(unittest.TestCase):
+    def test_all_rounds_resolved(self):
+        """Every simulated round ends with exactly one result code"""
+        results = simulate(500)
+        self.assertEqual(500, results['rounds'])
+        self.assertEqual(500, results['PW'] + results['DW'] + results['SO'])
+
+    def test_policy_is_respected(self):
+        """Player following a policy stops drawing at its limit"""
+        for i in range(200):
+            deck = shuffled_deck()
+            player, dealer, result = play_round(deck, policy_stand_on(15))
+            if len(player['hand']) > 2:
+                self.assertLess(hand_value(player['hand'][:-1]), 15)
+
+    def test_never_draw(self):
+        """Player never drawing keeps his two initial cards"""
+        player, dealer, result = play_round(shuffled_deck(), policy_never_draw)
+        self.assertEqual(2, len(player['hand']))
+        self.assertGreaterEqual(hand_value(dealer['hand']), 17)
+
+    def test_table_fast_path(self):
+        """Rounds played by lookup tables give exactly the same results and
+        leave the shoe in the same state as rounds of `play_round`"""
+        self.assertIsNone(policy_table(lambda hand, upcard: True))
+        for rules, soft17_draw, limit in ((None, False, 17),
+                                          (None, True, 12),
+                                          (RuleSet(decks=1, penetration=1),
+                                           False, 16),
+                                          (RuleSet(hit_soft17=True,
+                                                   blackjack_payout=1.2),
+                                           False, 0)):
+            shoes = []
+            results = []
+            for policy in (policy_stand_on(limit),
+                           lambda hand, upcard: _stand_on(limit, hand,
+                                                          upcard)):
+                decks = 6 if rules is None else rules.decks
+                shoe = Shoe(decks, cut_card=52 * decks - 10,
+                            rng=random.Random(limit))
+                results.append(simulate(2000, policy, shoe, soft17_draw,
+                                        rules=rules))
+                shoes.append((bytes(shoe.cards), shoe.position,
+                              shoe.rank_counts, shoe.shuffles))
+            self.assertEqual(results[0], results[1])
+            self.assertEqual(shoes[0], shoes[1])
+
+    def test_blackjack_payout(self):
+        """Blackjack pays 3:2, a regular win 1:1"""
+        results = new_results()
+        player = {"hand": [{"values": (11, 1)}, {"values": (10, )}]}
+        dealer = {"hand": [{"values": (10, )}, {"values": (8, )}]}
+        record_round(results, player, dealer, ("PW", ""))
+        self.assertEqual(1.5, results['net'])
+        self.assertEqual(1, results['player_blackjack'])
+
+
+if __name__ == "__main__":
+    unittest.main()